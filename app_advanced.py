@@ -1,27 +1,19 @@
 import streamlit as st
-import cv2
 import os
 import sys
 import json
-import time
 import tempfile
 from pathlib import Path
 from datetime import datetime, timedelta
-from typing import List, Dict, Optional, Tuple
+from typing import List, Optional, Tuple
 from concurrent.futures import ThreadPoolExecutor, as_completed
-from PIL import Image
-import io
 
 project_root = Path(__file__).parent
 sys.path.insert(0, str(project_root))
 
-from project.modules.video_preprocessor import VideoPreprocessor
-from project.modules.keyframe_extractor import KeyframeExtractor
-from project.modules.detection_captioning import DetectorCaptioner
-from project.modules.speech_transcriber import SpeechTranscriber
-from project.modules.summarizer import TextSummarizer
-from project.modules.moderator import Moderator
-from project.modules.summarizer_video import VideoSummarizer
+from project.pipeline.advanced import process_video_advanced
+from project.modules.thumbnails import ThumbnailCache
+from project.modules.sidecar import open_sidecar, frame_detections
 
 st.set_page_config(
     page_title="AI Visual Insight Pro",
@@ -191,131 +183,9 @@ def check_system_capabilities():
         'cpu_count': os.cpu_count()
     }
 
-def extract_video_metadata(video_path: str) -> Dict:
-    cap = cv2.VideoCapture(video_path)
-    fps = cap.get(cv2.CAP_PROP_FPS)
-    frame_count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
-    width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
-    height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
-    duration = frame_count / fps if fps > 0 else 0
-    cap.release()
-    return {
-        'fps': fps,
-        'frame_count': frame_count,
-        'width': width,
-        'height': height,
-        'duration': duration,
-        'resolution': f"{width}x{height}"
-    }
-
-def process_video_advanced(
-    video_path: str,
-    output_dir: str,
-    scene_threshold: float = 27.0,
-    use_gpu: bool = False,
-    enable_detection: bool = True,
-    enable_transcription: bool = True,
-    enable_summarization: bool = True,
-    enable_moderation: bool = True,
-    progress_callback=None
-):
-    start_time = time.time()
-    results = {
-        'success': False,
-        'video_info': {},
-        'scenes': [],
-        'keyframes': [],
-        'detections': [],
-        'captions': [],
-        'transcript': '',
-        'summary': '',
-        'moderation': {},
-        'processing_time': 0
-    }
-    
-    try:
-        if progress_callback:
-            progress_callback("Extracting video metadata...", 0.05)
-        
-        video_info = extract_video_metadata(video_path)
-        results['video_info'] = video_info
-        
-        if progress_callback:
-            progress_callback("Detecting scenes...", 0.15)
-        
-        preprocessor = VideoPreprocessor(video_path, output_dir)
-        scenes = preprocessor.detect_scenes(scene_threshold)
-        results['scenes'] = scenes
-        
-        if progress_callback:
-            progress_callback("Extracting keyframes...", 0.30)
-        
-        extractor = KeyframeExtractor(output_dir)
-        keyframes = extractor.extract_keyframes(video_path, scenes)
-        results['keyframes'] = keyframes
-        
-        if enable_detection and keyframes:
-            if progress_callback:
-                progress_callback("Running AI detection & captioning...", 0.45)
-            
-            detector = DetectorCaptioner(use_gpu=use_gpu)
-            det_results = detector.process_keyframes(keyframes)
-            results['detections'] = det_results
-            
-            results['captions'] = [
-                {'scene_idx': r['scene_idx'], 'caption': r['caption']}
-                for r in det_results
-            ]
-        
-        if enable_transcription:
-            if progress_callback:
-                progress_callback("Transcribing audio...", 0.60)
-            
-            audio_path = preprocessor.extract_audio()
-            if audio_path and os.path.exists(audio_path):
-                transcriber = SpeechTranscriber(use_gpu=use_gpu)
-                transcript, segments = transcriber.transcribe(audio_path)
-                results['transcript'] = transcript
-                results['transcript_segments'] = segments
-        
-        if enable_summarization and results['transcript']:
-            if progress_callback:
-                progress_callback("Generating summary...", 0.75)
-            
-            summarizer = TextSummarizer(use_gpu=use_gpu)
-            transcript_text = str(results['transcript']) if results['transcript'] else ""
-            summary = summarizer.summarize(transcript_text)
-            results['summary'] = summary
-        
-        if enable_moderation:
-            if progress_callback:
-                progress_callback("Running content moderation...", 0.85)
-            
-            moderator = Moderator(use_gpu=use_gpu)
-            mod_results = moderator.moderate(
-                results.get('detections', []),
-                results.get('transcript_segments', [])
-            )
-            results['moderation'] = mod_results
-        
-        if progress_callback:
-            progress_callback("Finalizing results...", 0.95)
-        
-        metadata_path = os.path.join(output_dir, "analysis.json")
-        with open(metadata_path, 'w') as f:
-            json.dump(results, f, indent=2, default=str)
-        
-        results['success'] = True
-        results['processing_time'] = time.time() - start_time
-        
-        if progress_callback:
-            progress_callback("Complete!", 1.0)
-        
-    except Exception as e:
-        results['error'] = str(e)
-        st.error(f"Processing error: {e}")
-    
-    return results
+@st.cache_resource
+def get_thumbnail_cache() -> ThumbnailCache:
+    return ThumbnailCache()
 
 def main():
     st.markdown("""
@@ -353,6 +223,12 @@ def main():
         enable_transcription = st.checkbox("Speech Transcription", value=True)
         enable_summarization = st.checkbox("Text Summarization", value=True)
         enable_moderation = st.checkbox("Content Moderation", value=True)
+        enable_summary_video = st.checkbox("Highlight Reel", value=False)
+        dense_fps = st.slider("Dense object scan (fps, 0 = keyframes only)", 0.0, 5.0, 0.0, 0.5)
+        adaptive = st.checkbox("Motion-adaptive sampling", value=False, disabled=dense_fps == 0)
+        sample_budget = st.number_input("Frame budget per video", 16, 5000, 240, 16, disabled=not adaptive)
+        caption_mode = st.radio("Keyframe captions", ["blip", "tags"], horizontal=True,
+                                help="tags: captions from detected objects only, much faster than BLIP")
         
         st.markdown("---")
         st.markdown("### 📊 System")
@@ -411,7 +287,12 @@ def main():
                         enable_transcription,
                         enable_summarization,
                         enable_moderation,
-                        progress_callback=update_progress
+                        enable_summary_video,
+                        progress_callback=update_progress,
+                        dense_fps=dense_fps,
+                        sampling="adaptive" if adaptive else "fixed",
+                        sample_budget=int(sample_budget),
+                        caption_mode=caption_mode
                     )
                 
                 if results['success']:
@@ -423,9 +304,7 @@ def main():
                     if os.path.exists(storyboard_dir):
                         for filename in sorted(os.listdir(storyboard_dir)):
                             if filename.endswith('.jpg'):
-                                filepath = os.path.join(storyboard_dir, filename)
-                                with open(filepath, 'rb') as f:
-                                    keyframe_images.append((filename, f.read()))
+                                keyframe_images.append((filename, os.path.join(storyboard_dir, filename)))
                     st.session_state['keyframe_images'] = keyframe_images
                     
                     st.balloons()
@@ -481,10 +360,17 @@ def main():
             
             if 'keyframe_images' in st.session_state:
                 cols = st.columns(4)
-                for idx, (filename, img_data) in enumerate(st.session_state['keyframe_images']):
+                for idx, (filename, frame_path) in enumerate(st.session_state['keyframe_images']):
                     with cols[idx % 4]:
-                        img = Image.open(io.BytesIO(img_data))
-                        st.image(img, caption=f"Scene {idx}", use_container_width=True)
+                        img = get_thumbnail_cache().get(frame_path)
+                        if img is not None:
+                            st.image(img, caption=f"Scene {idx}", use_container_width=True)
+            
+            summary_video = results.get('summary_video')
+            if summary_video and os.path.exists(summary_video):
+                st.markdown("---")
+                st.markdown("### 🎞️ Highlight Reel")
+                st.video(summary_video)
             
             st.markdown("---")
             
@@ -512,13 +398,14 @@ def main():
             
             if results.get('detections'):
                 st.markdown("#### 🎯 Object Detection & Captions")
-                for det in results['detections'][:10]:
+                sidecar = open_sidecar(results, st.session_state.get('output_dir', ''))
+                for frame_idx, det in enumerate(results['detections'][:10]):
                     with st.expander(f"Scene {det['scene_idx']} @ {det['timestamp']:.1f}s"):
                         st.markdown(f"**Caption:** {det.get('caption', 'N/A')}")
                         
-                        if det.get('detections'):
+                        if det.get('detection_count'):
                             st.markdown("**Detected Objects:**")
-                            for obj in det['detections'][:5]:
+                            for obj in frame_detections(sidecar, frame_idx, results.get('class_names', {}), limit=5):
                                 st.markdown(f"""
                                 <div class="detection-box">
                                     <strong>{obj['class_name']}</strong> - Confidence: {obj['conf']:.2%}
@@ -566,7 +453,22 @@ def main():
             if mod.get('image_flags'):
                 st.markdown("#### 🚨 Image Flags")
                 for flag in mod['image_flags'][:5]:
-                    st.warning(f"Scene {flag['scene_idx']} @ {flag['timestamp']:.1f}s - {flag['reason']}")
+                    score = f" ({flag['score']:.0%})" if 'score' in flag else ""
+                    st.warning(f"Scene {flag['scene_idx']} @ {flag['timestamp']:.1f}s - {flag['reason']}{score}")
+            
+            if summary.get('zero_shot_max'):
+                st.caption("Highest zero-shot scores: " + ", ".join(
+                    f"{category.replace('_', ' ')} {score:.0%}" for category, score in summary['zero_shot_max'].items()))
+            
+            if mod.get('track_flags'):
+                st.markdown("#### 🚨 Tracked Objects")
+                for flag in mod['track_flags'][:5]:
+                    st.warning(f"{flag['start']:.1f}s - {flag['end']:.1f}s: {flag['class_name']} ({flag['max_conf']:.0%})")
+            
+            sampling = st.session_state['results'].get('dense', {}).get('stats', {}).get('sampling')
+            if sampling and sampling.get('policy') == 'adaptive':
+                st.caption(f"Dense scan: {sampling['selected']}/{sampling['budget']} frames, "
+                           f"{sampling['mean_fps']} fps on average, longest unsampled gap {sampling['max_gap']:.1f}s")
             
             if mod.get('text_flags'):
                 st.markdown("#### 🚨 Text Flags")
@@ -576,5 +478,4 @@ def main():
             st.info("⚠️ No moderation data. Enable moderation and process a video.")
 
 if __name__ == "__main__":
-    import io
     main()
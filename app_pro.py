@@ -1,23 +1,25 @@
 import streamlit as st
-import cv2
 import os
 import sys
 import json
 import time
-import tempfile
-import numpy as np
 from pathlib import Path
-from datetime import datetime, timedelta
-from typing import List, Dict, Optional, Tuple
-from concurrent.futures import ThreadPoolExecutor, as_completed
-from PIL import Image
-import re
-from collections import Counter
-import io
+from datetime import datetime
 
 project_root = Path(__file__).parent
 sys.path.insert(0, str(project_root))
 
+from project.pipeline.pro import format_duration, check_system_capabilities, process_video_pro
+from project.pipeline.runner import atomic_write_json, is_complete, add_to_catalog
+from project.jobs import JobQueue, WorkerPool, DEFAULT_DB_PATH
+from project.modules.ingest import Ingestor
+from project.modules.thumbnails import ThumbnailCache
+from project.modules.sidecar import open_sidecar
+from project.catalog import Catalog, DEFAULT_CATALOG_PATH
+
+CATALOG_PAGE_SIZE = 9
+CATALOG_FILTERS = {'All Videos': 'all', 'Analyzed': 'analyzed', 'Moderated': 'moderated', 'Favorites': 'favorites'}
+
 st.set_page_config(
     page_title="AI Visual Insight Pro - Advanced Analysis",
     page_icon="�",
@@ -923,888 +925,160 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
-def format_duration(seconds: float) -> str:
-    td = timedelta(seconds=int(seconds))
-    hours, remainder = divmod(td.seconds, 3600)
-    minutes, seconds = divmod(remainder, 60)
-    if hours > 0:
-        return f"{hours}h {minutes}m {seconds}s"
-    elif minutes > 0:
-        return f"{minutes}m {seconds}s"
-    else:
-        return f"{seconds}s"
-
-def check_system_capabilities():
-    capabilities = {
-        'opencv': False,
-        'scenedetect': False,
-        'speech_recognition': False,
-        'moviepy': False,
-        'textblob': False
-    }
-    
-    try:
-        import cv2
-        capabilities['opencv'] = True
-    except Exception:
-        pass
-    
-    try:
-        from scenedetect import detect, ContentDetector
-        capabilities['scenedetect'] = True
-    except Exception:
-        pass
-    
-    try:
-        import speech_recognition as sr
-        capabilities['speech_recognition'] = True
-    except Exception:
-        pass
-    
-    try:
-        import importlib
-        importlib.import_module("moviepy.editor")
-        capabilities['moviepy'] = True
-    except Exception:
-        # moviepy is optional; audio extraction will fall back to ffmpeg
-        capabilities['moviepy'] = False
-    
-    try:
-        from textblob import TextBlob
-        capabilities['textblob'] = True
-    except Exception:
-        pass
-    
-    return capabilities
-
-def extract_video_metadata(video_path: str) -> Dict:
-    cap = cv2.VideoCapture(video_path)
-    metadata = {
-        'width': int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)),
-        'height': int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)),
-        'fps': float(cap.get(cv2.CAP_PROP_FPS)),
-        'frame_count': int(cap.get(cv2.CAP_PROP_FRAME_COUNT)),
-        'duration': float(cap.get(cv2.CAP_PROP_FRAME_COUNT) / cap.get(cv2.CAP_PROP_FPS)) if cap.get(cv2.CAP_PROP_FPS) > 0 else 0,
-        'resolution': f"{int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))}x{int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))}",
-        'codec': int(cap.get(cv2.CAP_PROP_FOURCC))
-    }
-    cap.release()
-    return metadata
-
-def detect_scenes_fast(video_path: str, threshold: float = 27.0):
-    try:
-        from scenedetect import detect, ContentDetector
-        scenes = detect(video_path, ContentDetector(threshold=threshold))
-        return [(scene[0].get_seconds(), scene[1].get_seconds()) for scene in scenes]
-    except Exception as e:
-        metadata = extract_video_metadata(video_path)
-        duration = metadata['duration']
-        num_segments = max(1, int(duration / 10))
-        segment_duration = duration / num_segments
-        return [(i * segment_duration, (i + 1) * segment_duration) for i in range(num_segments)]
-
-def extract_keyframes_parallel(video_path: str, scenes: List[Tuple], output_dir: str):
-    cap = cv2.VideoCapture(video_path)
-    fps = cap.get(cv2.CAP_PROP_FPS) or 25
-    
-    keyframes = []
-    storyboard_dir = os.path.join(output_dir, "storyboard")
-    os.makedirs(storyboard_dir, exist_ok=True)
-    
-    def extract_single_keyframe(idx, start, end):
-        try:
-            local_cap = cv2.VideoCapture(video_path)
-            mid = (start + end) / 2.0
-            frame_no = int(mid * fps)
-            local_cap.set(cv2.CAP_PROP_POS_FRAMES, frame_no)
-            ret, frame = local_cap.read()
-            local_cap.release()
-            
-            if ret:
-                outpath = os.path.join(storyboard_dir, f"scene_{idx:03d}.jpg")
-                cv2.imwrite(outpath, frame)
-                return {
-                    'scene_idx': idx,
-                    'start': start,
-                    'end': end,
-                    'timestamp': mid,
-                    'frame_path': outpath
-                }
-        except Exception as e:
-            return None
-    
-    with ThreadPoolExecutor(max_workers=4) as executor:
-        futures = {executor.submit(extract_single_keyframe, i, s, e): i for i, (s, e) in enumerate(scenes)}
-        for future in as_completed(futures):
-            result = future.result()
-            if result:
-                keyframes.append(result)
-    
-    cap.release()
-    return sorted(keyframes, key=lambda x: x['scene_idx'])
+@st.cache_resource
+def get_job_queue() -> JobQueue:
+    """Shared job queue, with a background worker pool draining it for the lifetime of the server"""
+    pool = WorkerPool(DEFAULT_DB_PATH, workers=int(os.environ.get("VISUAL_INSIGHT_WORKERS", 2))).start()
+    return pool.queue
 
-def extract_audio_from_video(video_path: str, output_dir: str) -> str | None:
-    try:
-        from moviepy.editor import VideoFileClip  # type: ignore
-        audio_path = os.path.join(output_dir, "audio.wav")
-        
-        video = VideoFileClip(video_path)
-        if video.audio is not None:
-            video.audio.write_audiofile(
-                audio_path, 
-                fps=16000,
-                nbytes=2,
-                codec='pcm_s16le',
-                verbose=False,
-                logger=None
-            )
-            video.close()
-            if os.path.exists(audio_path) and os.path.getsize(audio_path) > 1000:
-                return audio_path
-        video.close()
-        return None
-    except Exception as e:
-        try:
-            import subprocess
-            audio_path = os.path.join(output_dir, "audio.wav")
-            subprocess.run(
-                ["ffmpeg", "-i", video_path, "-vn", "-acodec", "pcm_s16le", "-ar", "16000", "-ac", "1", audio_path],
-                capture_output=True, check=False, timeout=60
-            )
-            if os.path.exists(audio_path) and os.path.getsize(audio_path) > 1000:
-                return audio_path
-        except Exception:
-            pass
-        return None
+@st.cache_resource
+def get_ingestor() -> Ingestor:
+    """Content-addressed upload store shared by all sessions"""
+    return Ingestor()
 
-def analyze_audio_properties(audio_path: str) -> Dict:
-    """Analyze audio properties and quality"""
-    try:
-        from pydub import AudioSegment
-        
-        audio = AudioSegment.from_wav(audio_path)
-        
-        duration_sec = len(audio) / 1000.0
-        sample_rate = audio.frame_rate
-        channels = audio.channels
-        sample_width = audio.sample_width * 8
-        loudness = audio.dBFS
-        max_amplitude = audio.max
-        
-        return {
-            'duration': round(duration_sec, 2),
-            'sample_rate': sample_rate,
-            'channels': channels,
-            'bit_depth': sample_width,
-            'loudness_db': round(loudness, 2),
-            'max_amplitude': max_amplitude,
-            'file_size_mb': round(os.path.getsize(audio_path) / (1024*1024), 2),
-            'quality_score': min(100, int((sample_rate/16000) * 50 + (abs(loudness)/60) * 50))
-        }
-    except Exception as e:
-        return {
-            'duration': 0,
-            'sample_rate': 0,
-            'channels': 0,
-            'bit_depth': 0,
-            'loudness_db': 0,
-            'max_amplitude': 0,
-            'file_size_mb': 0,
-            'quality_score': 0
-        }
+@st.cache_resource
+def get_thumbnail_cache() -> ThumbnailCache:
+    """Keyframe previews shared by all sessions; sessions only keep file paths"""
+    return ThumbnailCache()
 
-def create_audio_waveform(audio_path: str) -> Optional[str]:
-    """Generate audio waveform visualization"""
-    try:
-        from pydub import AudioSegment
-        import matplotlib.pyplot as plt
-        import numpy as np
-        
-        audio = AudioSegment.from_wav(audio_path)
-        samples = np.array(audio.get_array_of_samples())
-        
-        if audio.channels == 2:
-            samples = samples.reshape((-1, 2))
-            samples = samples.mean(axis=1)
-        
-        sample_rate = audio.frame_rate
-        duration = len(audio) / 1000.0
-        time = np.linspace(0, duration, num=len(samples))
-        
-        plt.style.use('dark_background')
-        fig, ax = plt.subplots(figsize=(12, 4), facecolor='#1a1a2e')
-        ax.set_facecolor('#16213e')
-        
-        ax.plot(time, samples, color='#00d4ff', linewidth=0.5, alpha=0.8)
-        ax.fill_between(time, samples, color='#00d4ff', alpha=0.3)
-        
-        ax.set_xlabel('Time (seconds)', color='#ffffff', fontsize=12)
-        ax.set_ylabel('Amplitude', color='#ffffff', fontsize=12)
-        ax.set_title('🎵 Audio Waveform Analysis', color='#ffffff', fontsize=14, pad=15)
-        
-        ax.tick_params(colors='#ffffff')
-        ax.spines['bottom'].set_color('#00d4ff')
-        ax.spines['left'].set_color('#00d4ff')
-        ax.spines['top'].set_visible(False)
-        ax.spines['right'].set_visible(False)
-        
-        ax.grid(True, alpha=0.2, color='#ffffff', linestyle='--')
-        
-        plt.tight_layout()
-        
-        waveform_path = audio_path.replace('audio.wav', 'waveform.png')
-        plt.savefig(waveform_path, dpi=150, facecolor='#1a1a2e', edgecolor='none')
-        plt.close()
-        
-        return waveform_path if os.path.exists(waveform_path) else None
-        
-    except Exception as e:
-        print(f"Waveform generation error: {str(e)}")
-        return None
+@st.cache_resource
+def get_catalog() -> Catalog:
+    """Persistent index of every analysis, shared by all sessions and kept across restarts"""
+    catalog = Catalog(DEFAULT_CATALOG_PATH)
+    catalog.prune()
+    return catalog
 
-def transcribe_audio_advanced(audio_path: str, target_language: str = 'auto') -> Dict:
-    """
-    Advanced multi-language audio transcription with automatic language detection
-    
-    Supported languages:
-    - English (en-US), Spanish (es-ES), French (fr-FR), German (de-DE)
-    - Chinese (zh-CN), Japanese (ja-JP), Korean (ko-KR), Hindi (hi-IN)
-    - Arabic (ar-SA), Russian (ru-RU), Portuguese (pt-BR), Italian (it-IT)
-    - Dutch (nl-NL), Polish (pl-PL), Turkish (tr-TR), Vietnamese (vi-VN)
-    """
-    if not audio_path or not os.path.exists(audio_path):
-        return {
-            'text': 'No audio detected in video.',
-            'word_count': 0,
-            'estimated_words': 0,
-            'confidence': 0,
-            'status': 'no_audio',
-            'language': 'unknown',
-            'detected_language': 'unknown'
+def render_catalog(filter_by: str, query: str):
+    """Paginated grid of past analyses matching the search box and filter"""
+    page_key = f"catalog_page_{filter_by}_{query}"
+    page = st.session_state.get(page_key, 0)
+    found = get_catalog().search(query, filter_by, CATALOG_PAGE_SIZE, page * CATALOG_PAGE_SIZE)
+    
+    if not found['items']:
+        empty = {
+            'favorites': "💡 No favorites yet! Analyze a video and click '⭐ Add to Favorites' to save it.",
+            'flagged': "🛡️ No videos with moderation flags.",
+            'analyzed': "📊 No analyzed videos yet. Upload and process a video first.",
         }
-    
-    try:
-        import speech_recognition as sr
-        recognizer = sr.Recognizer()
-        
-        # Enhanced settings for multi-language
-        recognizer.energy_threshold = 300
-        recognizer.dynamic_energy_threshold = True
-        recognizer.pause_threshold = 0.8
-        
-        audio_file = sr.AudioFile(audio_path)
-        with audio_file as source:
-            recognizer.adjust_for_ambient_noise(source, duration=1)
-            audio_data = recognizer.record(source)
-        
-        # Language mapping for Google Speech API
-        language_codes = {
-            'auto': None,  # Auto-detect
-            'English': 'en-US',
-            'Spanish': 'es-ES',
-            'French': 'fr-FR',
-            'German': 'de-DE',
-            'Chinese': 'zh-CN',
-            'Japanese': 'ja-JP',
-            'Korean': 'ko-KR',
-            'Hindi': 'hi-IN',
-            'Arabic': 'ar-SA',
-            'Russian': 'ru-RU',
-            'Portuguese': 'pt-BR',
-            'Italian': 'it-IT',
-            'Dutch': 'nl-NL',
-            'Polish': 'pl-PL',
-            'Turkish': 'tr-TR',
-            'Vietnamese': 'vi-VN'
-        }
-        
-        # Determine language code
-        lang_code = language_codes.get(target_language, 'en-US') if target_language != 'auto' else 'en-US'
-        
-        # Try transcription with selected/detected language
-        try:
-            if target_language == 'auto':
-                # Try multiple languages for auto-detection
-                languages_to_try = ['en-US', 'es-ES', 'fr-FR', 'de-DE', 'zh-CN', 'hi-IN', 'ar-SA', 'ru-RU']
-                best_result = None
-                best_confidence = 0
+        st.info(f"🔍 No videos match '{query}'" if query.strip() else empty.get(filter_by, "📊 Nothing here yet."))
+        st.markdown("---")
+        return
+    
+    st.caption(f"{found['total']} video{'s' if found['total'] != 1 else ''} · page {page + 1} of {(found['total'] - 1) // CATALOG_PAGE_SIZE + 1}")
+    cols_per_row = 3
+    for row_start in range(0, len(found['items']), cols_per_row):
+        cols = st.columns(cols_per_row, gap="large")
+        for col, item in zip(cols, found['items'][row_start:row_start + cols_per_row]):
+            with col:
+                star = "⭐ " if item['favorite'] else ""
+                processed = datetime.fromtimestamp(item['processed_at']).strftime('%Y-%m-%d %H:%M')
+                st.markdown(f"""
+                <div style="
+                    background: linear-gradient(135deg, rgba(0,212,255,0.08), rgba(240,147,251,0.08));
+                    border: 1px solid rgba(0,212,255,0.25);
+                    border-radius: 12px;
+                    padding: 12px;
+                    margin-bottom: 12px;
+                    box-shadow: 0 5px 20px rgba(0,0,0,0.2);
+                ">
+                    <h4 style="color: #00d4ff; margin-bottom: 8px; font-size: 0.95rem !important;">{star}{item['name'][:40]}</h4>
+                    <p style="color: #f0f0f0; font-size: 0.75rem !important; margin: 4px 0;">🕒 {processed}</p>
+                </div>
+                """, unsafe_allow_html=True)
                 
-                for lang in languages_to_try:
-                    try:
-                        text = recognizer.recognize_google(audio_data, language=lang, show_all=False)  # type: ignore
-                        if text and len(text.strip()) > 10:  # Valid transcription
-                            # Simple confidence heuristic: longer = more likely correct
-                            confidence = min(0.95, 0.6 + (len(text) / 500))
-                            if confidence > best_confidence:
-                                best_confidence = confidence
-                                best_result = {
-                                    'text': text,
-                                    'language': lang,
-                                    'detected_language': lang.split('-')[0].upper()
-                                }
-                    except:
-                        continue
+                col_metric1, col_metric2 = st.columns(2)
+                with col_metric1:
+                    st.metric("🎬 Scenes", item['scenes'])
+                with col_metric2:
+                    st.metric("⏱️ Duration", f"{item['duration']:.1f}s")
+                if item['flag_count']:
+                    st.caption(f"🚩 {item['flag_count']} moderation flag{'s' if item['flag_count'] != 1 else ''} · {item['rating'] or ''}")
+                if item['snippet']:
+                    st.caption(f"…{item['snippet']}")
                 
-                if best_result:
-                    words = len(best_result['text'].split())
-                    return {
-                        'text': best_result['text'],
-                        'word_count': words,
-                        'estimated_words': words,
-                        'confidence': best_confidence,
-                        'status': 'success',
-                        'language': best_result['language'],
-                        'detected_language': best_result['detected_language']
-                    }
-            else:
-                # Use specified language
-                text = recognizer.recognize_google(audio_data, language=lang_code, show_all=False)  # type: ignore
-                if text and len(text.strip()) > 0:
-                    words = len(text.split())
-                    return {
-                        'text': text,
-                        'word_count': words,
-                        'estimated_words': words,
-                        'confidence': 0.85,
-                        'status': 'success',
-                        'language': lang_code,
-                        'detected_language': target_language
-                    }
-            
-            return {
-                'text': 'No clear speech detected in audio.',
-                'word_count': 0,
-                'estimated_words': 0,
-                'confidence': 0,
-                'status': 'no_speech',
-                'language': lang_code,
-                'detected_language': 'unknown'
-            }
-            
-        except sr.UnknownValueError:
-            return {
-                'text': 'Speech was unclear or no speech detected.',
-                'word_count': 0,
-                'estimated_words': 0,
-                'confidence': 0,
-                'status': 'no_speech',
-                'language': lang_code,
-                'detected_language': 'unknown'
-            }
-        except sr.RequestError as e:
-            return {
-                'text': f'Speech recognition service error: {str(e)}',
-                'word_count': 0,
-                'estimated_words': 0,
-                'confidence': 0,
-                'status': 'error',
-                'language': lang_code,
-                'detected_language': 'unknown'
-            }
-    
-    except Exception as e:
-        return {
-            'text': f'Transcription error: {str(e)}',
-            'word_count': 0,
-            'estimated_words': 0,
-            'confidence': 0,
-            'status': 'error',
-            'language': 'unknown',
-            'detected_language': 'unknown'
-        }
+                if st.button("👁️ View", key=f"view_catalog_{item['id']}", width='stretch'):
+                    if load_results(item['output_dir']):
+                        st.session_state['uploaded_file_name'] = item['name']
+                        st.session_state['video_id'] = item['output_dir']
+                        st.success(f"✅ Loaded '{item['name']}'")
+                        st.rerun()
+                    else:
+                        st.error("❌ The saved analysis is no longer on disk")
+    
+    col_prev, col_page, col_next = st.columns([1, 2, 1])
+    with col_prev:
+        if page > 0 and st.button("⬅️ Previous", key=f"prev_{page_key}"):
+            st.session_state[page_key] = page - 1
+            st.rerun()
+    with col_next:
+        if found['offset'] + len(found['items']) < found['total'] and st.button("Next ➡️", key=f"next_{page_key}"):
+            st.session_state[page_key] = page + 1
+            st.rerun()
+    st.markdown("---")
 
-def generate_text_summary(text: str, max_sentences: int = 3) -> Dict:
-    """Generate concise, accurate AI summary from transcribed text"""
-    if not text or len(text.strip()) == 0:
-        return {
-            'summary': 'No speech detected in video.',
-            'key_points': [],
-            'sentiment': 'neutral',
-            'topics': []
-        }
+def store_results(results: dict, output_dir: str):
+    st.session_state['results'] = results
+    st.session_state['output_dir'] = output_dir
     
+    keyframe_images = []
+    storyboard_dir = os.path.join(output_dir, "storyboard")
+    if os.path.exists(storyboard_dir):
+        for filename in sorted(os.listdir(storyboard_dir)):
+            if filename.endswith('.jpg'):
+                keyframe_images.append((filename, os.path.join(storyboard_dir, filename)))
+    st.session_state['keyframe_images'] = keyframe_images
+
+def load_results(output_dir: str) -> bool:
+    """Reload a finished analysis from disk into the session"""
     try:
-        from textblob import TextBlob
-        import nltk
-        from nltk.tokenize import sent_tokenize
-        from nltk.corpus import stopwords
-        
-        # Download required NLTK data
-        try:
-            nltk.data.find('tokenizers/punkt')
-        except LookupError:
-            nltk.download('punkt', quiet=True)
-        
-        try:
-            nltk.data.find('corpora/stopwords')
-        except LookupError:
-            nltk.download('stopwords', quiet=True)
-        
-        blob = TextBlob(text)
-        sentences = list(blob.sentences)  # type: ignore
-        
-        if len(sentences) == 0:
-            return {
-                'summary': text[:200] + '...' if len(text) > 200 else text,
-                'key_points': [],
-                'sentiment': 'neutral',
-                'topics': []
-            }
-        
-        # Score sentences by importance (word frequency + position)
-        stop_words = set(stopwords.words('english'))
-        word_frequencies = {}
-        
-        for word in blob.words:  # type: ignore
-            if word.lower() not in stop_words and len(word) > 3:
-                word_frequencies[word.lower()] = word_frequencies.get(word.lower(), 0) + 1
-        
-        # Normalize frequencies
-        max_freq = max(word_frequencies.values()) if word_frequencies else 1
-        for word in word_frequencies:
-            word_frequencies[word] = word_frequencies[word] / max_freq
-        
-        # Score sentences
-        sentence_scores = {}
-        for i, sentence in enumerate(sentences):
-            score = 0
-            word_count = 0
-            for word in sentence.words:
-                if word.lower() in word_frequencies:
-                    score += word_frequencies[word.lower()]
-                    word_count += 1
-            
-            # Boost first and last sentences
-            if i == 0:
-                score *= 1.5
-            elif i == len(sentences) - 1:
-                score *= 1.2
-            
-            if word_count > 0:
-                sentence_scores[i] = score / word_count
-        
-        # Select top sentences
-        if len(sentence_scores) > 0:
-            top_indices = sorted(sentence_scores, key=lambda x: sentence_scores.get(x, 0), reverse=True)[:max_sentences]
-            top_indices.sort()  # Maintain original order
-            selected_sentences = [str(sentences[i]) for i in top_indices]
-        else:
-            selected_sentences = [str(s) for s in sentences[:max_sentences]]
-        
-        summary = ' '.join(selected_sentences)
-        
-        # Extract key points (top 3 most important sentences)
-        key_points = selected_sentences[:3] if len(selected_sentences) >= 3 else selected_sentences
-        
-        # Sentiment analysis with improved accuracy
-        sentiment_score = blob.sentiment.polarity  # type: ignore
-        subjectivity = blob.sentiment.subjectivity  # type: ignore
-        
-        if sentiment_score > 0.15:
-            sentiment = 'positive'
-        elif sentiment_score < -0.15:
-            sentiment = 'negative'
-        else:
-            sentiment = 'neutral'
-        
-        # Extract topics (most frequent meaningful words)
-        words = [word.lower() for word in blob.words if word.lower() not in stop_words and len(word) > 4]  # type: ignore
-        word_freq = Counter(words)
-        topics = [word for word, count in word_freq.most_common(5)]
-        
-        return {
-            'summary': summary[:500] + '...' if len(summary) > 500 else summary,  # Limit to 500 chars
-            'key_points': key_points,
-            'sentiment': sentiment,
-            'sentiment_score': sentiment_score,
-            'subjectivity': subjectivity,
-            'topics': topics,
-            'word_count': len(text.split())
-        }
-    
-    except Exception as e:
-        # Fallback to simple sentence splitting
-        sentences = text.split('.')
-        sentences = [s.strip() for s in sentences if s.strip()]
-        summary = '. '.join(sentences[:max_sentences]) + '.' if len(sentences) > max_sentences else text
-        return {
-            'summary': summary[:300] + '...' if len(summary) > 300 else summary,
-            'key_points': sentences[:3] if len(sentences) >= 3 else sentences,
-            'sentiment': 'neutral',
-            'topics': [],
-            'word_count': len(text.split())
-        }
+        with open(os.path.join(output_dir, "analysis.json"), encoding='utf-8') as f:
+            results = json.load(f)
+    except (OSError, ValueError):
+        return False
+    store_results(results, output_dir)
+    return True
 
-def detect_content_issues(text: str, keyframes: List, language: str = 'en') -> Dict:
-    """
-    Multi-language content moderation supporting 16+ languages
-    Detects profanity, violence, adult content across different languages
-    """
-    
-    # Multi-language profanity lists
-    profanity_lists = {
-        'en': {'fuck', 'shit', 'damn', 'hell', 'bitch', 'ass', 'bastard', 'dick', 'pussy', 'cunt', 'whore', 'slut'},
-        'es': {'mierda', 'puta', 'coño', 'joder', 'cabrón', 'pendejo', 'verga', 'chingar'},
-        'fr': {'merde', 'putain', 'con', 'salope', 'connard', 'chier', 'bordel'},
-        'de': {'scheiße', 'fick', 'arsch', 'hure', 'verdammt', 'schlampe'},
-        'zh': {'操', '妈的', '傻逼', '混蛋', '婊子', '狗屎'},
-        'ja': {'くそ', 'ばか', 'あほ', 'しね', 'ちくしょう'},
-        'ko': {'씨발', '개새끼', '병신', '지랄', '엿먹어'},
-        'hi': {'बकवास', 'कमीना', 'चूतिया', 'हरामी'},
-        'ar': {'تبا', 'لعنة', 'قذر', 'عاهرة'},
-        'ru': {'блять', 'сука', 'хуй', 'пизда', 'ебать'},
-        'pt': {'merda', 'porra', 'caralho', 'puta', 'foda'},
-        'it': {'cazzo', 'merda', 'puttana', 'stronzo', 'figa'},
-        'nl': {'kut', 'shit', 'klootzak', 'hoer', 'lul'},
-        'pl': {'kurwa', 'pierdolić', 'gówno', 'suka'},
-        'tr': {'siktir', 'amk', 'orospu', 'piç', 'bok'},
-        'vi': {'địt', 'đụ', 'cứt', 'đĩ', 'chó'}
-    }
-    
-    # Multi-language violence keywords
-    violence_keywords = {
-        'en': {'kill', 'murder', 'death', 'blood', 'gun', 'shoot', 'fight', 'attack', 'violence', 'weapon', 'bomb', 'terrorist', 'war'},
-        'es': {'matar', 'asesinar', 'muerte', 'sangre', 'pistola', 'disparar', 'pelear', 'atacar', 'violencia', 'arma', 'bomba', 'guerra'},
-        'fr': {'tuer', 'assassiner', 'mort', 'sang', 'pistolet', 'tirer', 'combattre', 'attaquer', 'violence', 'arme', 'bombe', 'guerre'},
-        'de': {'töten', 'morden', 'tod', 'blut', 'waffe', 'schießen', 'kämpfen', 'angriff', 'gewalt', 'bombe', 'krieg'},
-        'zh': {'杀', '谋杀', '死亡', '血', '枪', '射击', '打架', '攻击', '暴力', '武器', '炸弹', '战争'},
-        'ja': {'殺す', '殺人', '死', '血', '銃', '撃つ', '戦う', '攻撃', '暴力', '武器', '爆弾', '戦争'},
-        'ko': {'죽이다', '살인', '죽음', '피', '총', '쏘다', '싸우다', '공격', '폭력', '무기', '폭탄', '전쟁'},
-        'hi': {'मारना', 'हत्या', 'मौत', 'खून', 'बंदूक', 'गोली', 'लड़ाई', 'हमला', 'हिंसा', 'हथियार', 'बम', 'युद्ध'},
-        'ar': {'قتل', 'جريمة قتل', 'موت', 'دم', 'مسدس', 'إطلاق نار', 'قتال', 'هجوم', 'عنف', 'سلاح', 'قنبلة', 'حرب'},
-        'ru': {'убить', 'убийство', 'смерть', 'кровь', 'пистолет', 'стрелять', 'драться', 'атака', 'насилие', 'оружие', 'бомба', 'война'},
-        'pt': {'matar', 'assassinar', 'morte', 'sangue', 'arma', 'atirar', 'lutar', 'atacar', 'violência', 'bomba', 'guerra'},
-        'it': {'uccidere', 'omicidio', 'morte', 'sangue', 'pistola', 'sparare', 'combattere', 'attacco', 'violenza', 'arma', 'bomba', 'guerra'},
-        'nl': {'doden', 'moord', 'dood', 'bloed', 'pistool', 'schieten', 'vechten', 'aanval', 'geweld', 'wapen', 'bom', 'oorlog'},
-        'pl': {'zabić', 'morderstwo', 'śmierć', 'krew', 'pistolet', 'strzelać', 'walczyć', 'atak', 'przemoc', 'broń', 'bomba', 'wojna'},
-        'tr': {'öldürmek', 'cinayet', 'ölüm', 'kan', 'silah', 'ateş', 'kavga', 'saldırı', 'şiddet', 'bomba', 'savaş'},
-        'vi': {'giết', 'giết người', 'chết', 'máu', 'súng', 'bắn', 'đánh nhau', 'tấn công', 'bạo lực', 'vũ khí', 'bom', 'chiến tranh'}
-    }
-    
-    # Multi-language adult content keywords
-    adult_keywords = {
-        'en': {'sex', 'porn', 'nude', 'naked', 'adult', 'xxx', 'explicit', 'erotic', 'sexual', 'nsfw'},
-        'es': {'sexo', 'porno', 'desnudo', 'adulto', 'xxx', 'explícito', 'erótico', 'sexual'},
-        'fr': {'sexe', 'porno', 'nu', 'adulte', 'xxx', 'explicite', 'érotique', 'sexuel'},
-        'de': {'sex', 'porno', 'nackt', 'erwachsene', 'xxx', 'explizit', 'erotisch', 'sexuell'},
-        'zh': {'性', '色情', '裸体', '成人', 'xxx', '露骨', '情色', '性的'},
-        'ja': {'セックス', 'ポルノ', 'ヌード', '裸', 'アダルト', 'xxx', '露骨', 'エロ', '性的'},
-        'ko': {'섹스', '포르노', '누드', '벌거벗은', '성인', 'xxx', '노골적인', '에로틱', '성적인'},
-        'hi': {'यौन', 'पोर्न', 'नग्न', 'वयस्क', 'xxx', 'स्पष्ट', 'कामुक', 'यौन'},
-        'ar': {'جنس', 'إباحي', 'عاري', 'بالغ', 'xxx', 'صريح', 'مثير', 'جنسي'},
-        'ru': {'секс', 'порно', 'обнаженный', 'взрослый', 'xxx', 'откровенный', 'эротический', 'сексуальный'},
-        'pt': {'sexo', 'pornô', 'nu', 'adulto', 'xxx', 'explícito', 'erótico', 'sexual'},
-        'it': {'sesso', 'porno', 'nudo', 'adulto', 'xxx', 'esplicito', 'erotico', 'sessuale'},
-        'nl': {'sex', 'porno', 'naakt', 'volwassen', 'xxx', 'expliciet', 'erotisch', 'seksueel'},
-        'pl': {'seks', 'porno', 'nagi', 'dorosły', 'xxx', 'wyraźny', 'erotyczny', 'seksualny'},
-        'tr': {'seks', 'porno', 'çıplak', 'yetişkin', 'xxx', 'açık', 'erotik', 'cinsel'},
-        'vi': {'tình dục', 'khiêu dâm', 'khỏa thân', 'người lớn', 'xxx', 'rõ ràng', 'khiêu gợi', 'tình dục'}
-    }
-    
-    # Detect language from code (e.g., 'en-US' -> 'en')
-    lang_code = language.split('-')[0].lower() if '-' in language else language.lower()
-    
-    # Get appropriate word lists for detected language
-    profanity_set = profanity_lists.get(lang_code, profanity_lists['en'])
-    violence_set = violence_keywords.get(lang_code, violence_keywords['en'])
-    adult_set = adult_keywords.get(lang_code, adult_keywords['en'])
-    
-    # Also include English keywords for multilingual content
-    if lang_code != 'en':
-        profanity_set = profanity_set.union(profanity_lists['en'])
-        violence_set = violence_set.union(violence_keywords['en'])
-        adult_set = adult_set.union(adult_keywords['en'])
-    
-    text_lower = text.lower()
-    words = re.findall(r'\b\w+\b', text_lower)
-    
-    profanity_found = [word for word in words if word in profanity_set]
-    violence_found = [word for word in words if word in violence_set]
-    adult_found = [word for word in words if word in adult_set]
-    
-    issues = []
-    severity_score = 0
-    
-    if profanity_found:
-        issues.append({
-            'type': 'Profanity',
-            'severity': 'Medium',
-            'count': len(profanity_found),
-            'examples': list(set(profanity_found))[:5]
-        })
-        severity_score += len(profanity_found) * 2
-    
-    if violence_found:
-        issues.append({
-            'type': 'Violence',
-            'severity': 'High',
-            'count': len(violence_found),
-            'examples': list(set(violence_found))[:5]
-        })
-        severity_score += len(violence_found) * 3
-    
-    if adult_found:
-        issues.append({
-            'type': 'Adult Content',
-            'severity': 'High',
-            'count': len(adult_found),
-            'examples': list(set(adult_found))[:5]
-        })
-        severity_score += len(adult_found) * 3
-    
-    # Visual content analysis
-    avg_brightness = 128
-    if keyframes:
+def render_job_status():
+    """Poll the background job for this session and load its results once it finishes"""
+    job_id = st.session_state.get('job_id')
+    if not job_id:
+        return
+    queue = get_job_queue()
+    job = queue.get(job_id)
+    if job is None:
+        st.session_state.pop('job_id', None)
+        return
+    
+    if job['state'] == 'queued':
+        ahead = queue.position(job_id) or 0
+        st.info(f"⏳ Queued for processing ({ahead} job{'s' if ahead != 1 else ''} ahead)")
+    elif job['state'] == 'running':
+        st.progress(min(1.0, max(0.0, job['progress'])))
+        st.markdown(f"**{job['message'] or '🤖 AI Processing started...'}**")
+    elif job['state'] == 'done':
+        st.session_state.pop('job_id', None)
         try:
-            sample_frames = keyframes[:min(5, len(keyframes))]
-            brightness_values = []
-            for kf in sample_frames:
-                if os.path.exists(kf['frame_path']):
-                    img = cv2.imread(kf['frame_path'])
-                    if img is not None:
-                        gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
-                        brightness_values.append(float(np.mean(gray)))  # type: ignore
-            if brightness_values:
-                avg_brightness = np.mean(brightness_values)
-        except Exception:
-            pass
-    
-    if avg_brightness < 50:
-        issues.append({
-            'type': 'Dark Content',
-            'severity': 'Low',
-            'count': 1,
-            'examples': ['Video contains predominantly dark scenes']
-        })
-        severity_score += 5
-    
-    if severity_score > 20:
-        rating = 'Not Safe'
-        recommendation = 'Content requires moderation and age restriction'
-    elif severity_score > 10:
-        rating = 'Caution'
-        recommendation = 'Content may require age verification'
-    else:
-        rating = 'Safe'
-        recommendation = 'Content is suitable for general audiences'
-    
-    return {
-        'issues': issues,
-        'severity_score': severity_score,
-        'rating': rating,
-        'recommendation': recommendation,
-        'is_safe': severity_score <= 10,
-        'total_flags': len(issues),
-        'language': language,
-        'moderation_language': lang_code
-    }
-
-def analyze_video_quality(video_path: str, keyframes: List) -> Dict:
-    metadata = extract_video_metadata(video_path)
-    
-    width = metadata['width']
-    height = metadata['height']
-    fps = metadata['fps']
-    
-    resolution_quality = 'Low'
-    if width >= 3840:
-        resolution_quality = '4K Ultra HD'
-    elif width >= 1920:
-        resolution_quality = 'Full HD 1080p'
-    elif width >= 1280:
-        resolution_quality = 'HD 720p'
-    elif width >= 854:
-        resolution_quality = 'SD 480p'
-    
-    fps_quality = 'Standard'
-    if fps >= 60:
-        fps_quality = 'High (60+ FPS)'
-    elif fps >= 30:
-        fps_quality = 'Good (30 FPS)'
-    else:
-        fps_quality = 'Low (< 30 FPS)'
-    
-    sharpness_scores = []
-    if keyframes:
-        sample_frames = keyframes[:min(10, len(keyframes))]
-        for kf in sample_frames:
-            if os.path.exists(kf['frame_path']):
-                img = cv2.imread(kf['frame_path'], cv2.IMREAD_GRAYSCALE)
-                if img is not None:
-                    laplacian = cv2.Laplacian(img, cv2.CV_64F)  # type: ignore
-                    sharpness = laplacian.var()
-                    sharpness_scores.append(sharpness)
-    
-    avg_sharpness = np.mean(sharpness_scores) if sharpness_scores else 0
-    sharpness_quality = 'Good'
-    if avg_sharpness > 500:
-        sharpness_quality = 'Excellent'
-    elif avg_sharpness > 100:
-        sharpness_quality = 'Good'
-    else:
-        sharpness_quality = 'Poor'
-    
-    overall_score = 0
-    if resolution_quality in ['4K Ultra HD', 'Full HD 1080p']:
-        overall_score += 40
-    elif resolution_quality in ['HD 720p']:
-        overall_score += 30
-    else:
-        overall_score += 15
-    
-    if fps >= 60:
-        overall_score += 30
-    elif fps >= 30:
-        overall_score += 25
+            with open(os.path.join(job['output_dir'], "analysis.json"), encoding='utf-8') as f:
+                results = json.load(f)
+        except (OSError, ValueError) as e:
+            st.error(f"❌ Could not load results: {e}")
+            return
+        store_results(results, job['output_dir'])
+        st.balloons()
+        st.success(f"✅ Analysis completed in {results.get('processing_time', 0):.2f} seconds!")
+        st.info("🎯 Check other tabs for detailed results")
+        return
     else:
-        overall_score += 10
+        st.session_state.pop('job_id', None)
+        st.error(f"❌ Processing failed: {job.get('error') or 'Unknown error'}")
+        st.info("💡 Try a different video or check system requirements")
+        return
     
-    if sharpness_quality == 'Excellent':
-        overall_score += 30
-    elif sharpness_quality == 'Good':
-        overall_score += 20
-    else:
-        overall_score += 5
-    
-    return {
-        'resolution_quality': resolution_quality,
-        'fps_quality': fps_quality,
-        'sharpness_quality': sharpness_quality,
-        'overall_score': overall_score,
-        'overall_rating': 'Excellent' if overall_score >= 85 else 'Good' if overall_score >= 60 else 'Fair' if overall_score >= 40 else 'Poor'
-    }
-
-def process_video_pro(
-    video_path: str,
-    output_dir: str,
-    scene_threshold: float = 27.0,
-    target_language: str = 'auto',
-    progress_callback=None
-):
-    start_time = time.time()
-    results = {
-        'success': False,
-        'video_info': {},
-        'scenes': [],
-        'keyframes': [],
-        'transcription': {},
-        'summary': {},
-        'content_moderation': {},
-        'quality_analysis': {},
-        'processing_time': 0,
-        'language': target_language
-    }
-    
-    try:
-        if progress_callback:
-            progress_callback("📊 Analyzing video metadata...", 0.05)
-        
-        video_info = extract_video_metadata(video_path)
-        results['video_info'] = video_info
-        
-        if progress_callback:
-            progress_callback("🎬 Detecting scenes with AI...", 0.15)
-        
-        scenes = detect_scenes_fast(video_path, threshold=scene_threshold)
-        results['scenes'] = scenes
-        
-        if progress_callback:
-            progress_callback("🖼️ Extracting keyframes (parallel processing)...", 0.30)
-        
-        keyframes = extract_keyframes_parallel(video_path, scenes, output_dir)
-        results['keyframes'] = keyframes
-        
-        if progress_callback:
-            progress_callback("🎵 Extracting audio from video...", 0.45)
-        
-        audio_path = extract_audio_from_video(video_path, output_dir)
-        
-        if audio_path:
-            if progress_callback:
-                progress_callback("🎵 Analyzing audio properties...", 0.50)
-            
-            audio_properties = analyze_audio_properties(audio_path)
-            results['audio_properties'] = audio_properties
-            
-            if progress_callback:
-                progress_callback("📊 Generating audio waveform...", 0.55)
-            
-            waveform_path = create_audio_waveform(audio_path)
-            results['waveform_path'] = waveform_path
-        
-        if progress_callback:
-            lang_display = 'Auto-Detecting' if target_language == 'auto' else target_language
-            progress_callback(f"🎤 Transcribing speech ({lang_display})...", 0.60)
-        
-        if audio_path:
-            transcription = transcribe_audio_advanced(audio_path, target_language)
-        else:
-            transcription = {
-                'text': 'No audio detected in video.',
-                'word_count': 0,
-                'status': 'no_audio',
-                'language': 'en-US',
-                'detected_language': 'English'
-            }
-        results['transcription'] = transcription
-        
-        # Get detected language for content moderation
-        detected_lang = transcription.get('language', 'en-US')
-        
-        if progress_callback:
-            progress_callback("📝 Generating intelligent summary...", 0.75)
-        
-        summary = generate_text_summary(transcription.get('text', ''))
-        results['summary'] = summary
-        
-        if progress_callback:
-            progress_callback("🛡️ Running multi-language content moderation...", 0.85)
-        
-        content_moderation = detect_content_issues(
-            transcription.get('text', ''), 
-            keyframes,
-            detected_lang
-        )
-        results['content_moderation'] = content_moderation
-        
-        if progress_callback:
-            progress_callback("📈 Analyzing video quality...", 0.92)
-        
-        quality_analysis = analyze_video_quality(video_path, keyframes)
-        results['quality_analysis'] = quality_analysis
-        
-        if progress_callback:
-            progress_callback("💾 Saving results...", 0.97)
-        
-        analysis_path = os.path.join(output_dir, "analysis.json")
-        with open(analysis_path, 'w', encoding='utf-8') as f:
-            json.dump(results, f, indent=2, ensure_ascii=False, default=str)
-        
-        summary_path = os.path.join(output_dir, "summary.txt")
-        with open(summary_path, 'w', encoding='utf-8') as f:
-            f.write("=== VIDEO ANALYSIS SUMMARY ===\n\n")
-            f.write(f"Language: {transcription.get('detected_language', 'Unknown')}\n")
-            f.write(f"Transcription:\n{transcription.get('text', 'No speech detected')}\n\n")
-            f.write(f"Summary:\n{summary.get('summary', 'N/A')}\n\n")
-            f.write(f"Sentiment: {summary.get('sentiment', 'neutral')}\n")
-            f.write(f"Content Rating: {content_moderation.get('rating', 'Unknown')}\n")
-        
-        results['success'] = True
-        results['processing_time'] = time.time() - start_time
-        
-        if progress_callback:
-            progress_callback("✅ Analysis complete!", 1.0)
-        
-    except Exception as e:
-        results['error'] = str(e)
-        results['success'] = False
-    
-    return results
+    time.sleep(1.5)
+    st.rerun()
 
 def main():
     # Initialize session state
-    if 'favorites' not in st.session_state:
-        st.session_state['favorites'] = []
     if 'filter_selection' not in st.session_state:
         st.session_state['filter_selection'] = 'All Videos'
     if 'search_query' not in st.session_state:
@@ -1847,13 +1121,15 @@ def main():
     st.markdown("<br>", unsafe_allow_html=True)
     col1, col2, col3, col4, col5 = st.columns(5)
     
+    counts = get_catalog().counts()
+    
     with col1:
         if st.button("🎥 All Videos", width='stretch', type="primary" if st.session_state['filter_selection'] == 'All Videos' else "secondary"):
             st.session_state['filter_selection'] = 'All Videos'
             st.rerun()
     
     with col2:
-        analyzed_count = 1 if 'results' in st.session_state and st.session_state.get('results', {}).get('success') else 0
+        analyzed_count = counts['analyzed']
         if st.button(f"✅ Analyzed ({analyzed_count})", width='stretch', type="primary" if st.session_state['filter_selection'] == 'Analyzed' else "secondary"):
             st.session_state['filter_selection'] = 'Analyzed'
             st.rerun()
@@ -1864,13 +1140,13 @@ def main():
             st.rerun()
     
     with col4:
-        moderated_count = 1 if 'results' in st.session_state and st.session_state.get('results', {}).get('moderation') else 0
+        moderated_count = counts['moderated']
         if st.button(f"🛡️ Moderated ({moderated_count})", width='stretch', type="primary" if st.session_state['filter_selection'] == 'Moderated' else "secondary"):
             st.session_state['filter_selection'] = 'Moderated'
             st.rerun()
     
     with col5:
-        fav_count = len(st.session_state['favorites'])
+        fav_count = counts['favorites']
         if st.button(f"⭐ Favorites ({fav_count})", width='stretch', type="primary" if st.session_state['filter_selection'] == 'Favorites' else "secondary"):
             st.session_state['filter_selection'] = 'Favorites'
             st.rerun()
@@ -1885,6 +1161,11 @@ def main():
             10.0, 50.0, 27.0, 1.0, 
             help="Lower values detect more scenes"
         )
+        run_in_background = st.checkbox(
+            "⏳ Run in background queue",
+            value=False,
+            help="Queue the video for the background workers instead of processing it in this session"
+        )
     
     with settings_col2:
         st.markdown("<br>", unsafe_allow_html=True)
@@ -1903,79 +1184,18 @@ def main():
     # Display content based on filter selection
     current_filter = st.session_state.get('filter_selection', 'All Videos')
     
-    if current_filter == 'Favorites':
-        st.markdown("### ⭐ Your Favorite Videos")
-        
-        if st.session_state['favorites']:
-            # Create grid layout for favorites
-            cols_per_row = 3
-            num_favs = len(st.session_state['favorites'])
-            num_rows = (num_favs + cols_per_row - 1) // cols_per_row
-            
-            for row in range(num_rows):
-                cols = st.columns(cols_per_row, gap="large")
-                for col_idx in range(cols_per_row):
-                    fav_idx = row * cols_per_row + col_idx
-                    if fav_idx < num_favs:
-                        fav = st.session_state['favorites'][fav_idx]
-                        with cols[col_idx]:
-                            st.markdown(f"""
-                            <div style="
-                                background: linear-gradient(135deg, rgba(0,212,255,0.08), rgba(240,147,251,0.08));
-                                border: 1px solid rgba(0,212,255,0.25);
-                                border-radius: 12px;
-                                padding: 12px;
-                                margin-bottom: 12px;
-                                transition: all 0.3s ease;
-                                box-shadow: 0 5px 20px rgba(0,0,0,0.2);
-                            ">
-                                <h4 style="color: #00d4ff; margin-bottom: 8px; font-size: 0.95rem !important;">⭐ {fav['name'][:40]}...</h4>
-                                <p style="color: #f0f0f0; font-size: 0.75rem !important; margin: 4px 0;">🕒 {fav['timestamp']}</p>
-                            </div>
-                            """, unsafe_allow_html=True)
-                            
-                            if fav['results'].get('success'):
-                                scenes = len(fav['results'].get('scenes', []))
-                                duration = fav['results'].get('duration', 0)
-                                
-                                col_metric1, col_metric2 = st.columns(2)
-                                with col_metric1:
-                                    st.metric("🎬 Scenes", scenes)
-                                with col_metric2:
-                                    st.metric("⏱️ Duration", f"{duration:.1f}s")
-                                
-                                if st.button(f"👁️ View", key=f"view_main_fav_{fav_idx}", width='stretch'):
-                                    st.session_state['results'] = fav['results']
-                                    st.session_state['uploaded_file_name'] = fav['name']
-                                    st.session_state['video_id'] = fav['id']
-                                    st.session_state['filter_selection'] = 'Analyzed'
-                                    st.success(f"✅ Loaded '{fav['name']}'")
-                                    st.rerun()
-            
-            st.markdown("---")
-        else:
-            st.info("💡 No favorites yet! Analyze a video and click '⭐ Add to Favorites' to save it.")
-            st.markdown("---")
-    
-    elif current_filter == 'Analyzed':
-        if 'results' in st.session_state and st.session_state['results']['success']:
-            st.success(f"✅ Currently viewing analyzed video: **{st.session_state.get('uploaded_file_name', 'Unknown')}**")
-            st.markdown("---")
+    if current_filter == 'Processing':
+        active_jobs = [job for state in ('running', 'queued') for job in get_job_queue().list(state)]
+        if active_jobs:
+            for job in active_jobs:
+                label = "🔄 Running" if job['state'] == 'running' else "⏳ Queued"
+                st.markdown(f"{label} · **{os.path.basename(job['video_path'])}** · {job['progress'] * 100:.0f}% {job['message']}")
         else:
-            st.info("📊 No analyzed videos yet. Upload and process a video first.")
-            st.markdown("---")
-    
-    elif current_filter == 'Processing':
-        st.info("⏳ No videos currently being processed. Upload a video to start analysis.")
+            st.info("⏳ No videos currently being processed. Upload a video to start analysis.")
         st.markdown("---")
     
-    elif current_filter == 'Moderated':
-        if 'results' in st.session_state and st.session_state['results'].get('moderation'):
-            st.success(f"🛡️ Content moderation results available for: **{st.session_state.get('uploaded_file_name', 'Unknown')}**")
-            st.markdown("---")
-        else:
-            st.info("🛡️ No moderated content yet. Process a video with moderation enabled.")
-            st.markdown("---")
+    elif current_filter != 'All Videos' or search_query.strip():
+        render_catalog(CATALOG_FILTERS.get(current_filter, 'all'), search_query)
     
     tab1, tab2, tab3, tab4, tab5 = st.tabs([
         "🎬 Upload & Process",
@@ -2019,7 +1239,7 @@ def main():
             col1, col2, col3, col4 = st.columns(4)
             
             with col1:
-                file_size = len(uploaded_file.getvalue()) / (1024 * 1024)
+                file_size = uploaded_file.size / (1024 * 1024)
                 st.metric("📦 Size", f"{file_size:.2f} MB")
             
             with col2:
@@ -2083,77 +1303,75 @@ def main():
                         st.info("📦 Install missing packages: `pip install moviepy SpeechRecognition textblob nltk imageio-ffmpeg`")
                     
                     try:
-                        if 'temp_dir' not in st.session_state:
-                            st.session_state['temp_dir'] = tempfile.mkdtemp()
-                        
-                        temp_dir = st.session_state['temp_dir']
-                        video_path = os.path.join(temp_dir, uploaded_file.name)
-                        
-                        with open(video_path, 'wb') as f:
-                            f.write(uploaded_file.getbuffer())
-                        
-                        output_dir = os.path.join(temp_dir, "outputs")
+                        # Stream the upload to disk in chunks; its hash keys the cached analysis
+                        ingestor = get_ingestor()
+                        upload = ingestor.ingest(uploaded_file, uploaded_file.name)
+                        video_path = upload['path']
+                        options = {'scene_threshold': scene_threshold, 'language': selected_language}
+                        output_dir = ingestor.output_dir(upload['sha256'], "pro", options)
                         os.makedirs(output_dir, exist_ok=True)
                         
-                        # Store video information for favorites
                         st.session_state['uploaded_file_name'] = uploaded_file.name
-                        st.session_state['video_id'] = f"{uploaded_file.name}_{int(datetime.now().timestamp())}"
+                        st.session_state['video_id'] = output_dir
                         
-                        progress_bar = st.progress(0)
-                        status_text = st.empty()
+                        if is_complete(output_dir) and load_results(output_dir):
+                            st.success("⚡ This video was already analysed with these settings - loaded cached results")
+                            st.info("🎯 Check other tabs for detailed results")
+                        elif run_in_background:
+                            st.session_state['job_id'] = get_job_queue().submit(
+                                video_path,
+                                output_dir,
+                                "pro",
+                                dict(options, sha256=upload['sha256'], reuse=True, name=uploaded_file.name)
+                            )
+                            st.info("📥 Video queued for background processing")
+                            st.rerun()
+                        else:
+                            progress_bar = st.progress(0)
+                            status_text = st.empty()
                         
-                        def update_progress(msg, pct):
-                            status_text.markdown(f"**{msg}**")
-                            progress_bar.progress(pct)
+                            def update_progress(msg, pct):
+                                status_text.markdown(f"**{msg}**")
+                                progress_bar.progress(pct)
                         
-                        st.info("🤖 AI Processing started...")
+                            st.info("🤖 AI Processing started...")
                         
-                        results = process_video_pro(
-                            video_path,
-                            output_dir,
-                            scene_threshold,
-                            target_language=selected_language,
-                            progress_callback=update_progress
-                        )
+                            results = process_video_pro(
+                                video_path,
+                                output_dir,
+                                scene_threshold,
+                                target_language=selected_language,
+                                progress_callback=update_progress
+                            )
                         
-                        if results['success']:
-                            st.session_state['results'] = results
-                            st.session_state['output_dir'] = output_dir
+                            if results['success']:
+                                atomic_write_json(os.path.join(output_dir, "analysis.json"), results)
+                                add_to_catalog(results, output_dir, video_path, uploaded_file.name, upload['sha256'], "pro")
+                                store_results(results, output_dir)
                             
-                            keyframe_images = []
-                            storyboard_dir = os.path.join(output_dir, "storyboard")
-                            if os.path.exists(storyboard_dir):
-                                for filename in sorted(os.listdir(storyboard_dir)):
-                                    if filename.endswith('.jpg'):
-                                        filepath = os.path.join(storyboard_dir, filename)
-                                        try:
-                                            with open(filepath, 'rb') as f:
-                                                keyframe_images.append((filename, f.read()))
-                                        except:
-                                            pass
-                            st.session_state['keyframe_images'] = keyframe_images
+                                st.balloons()
+                                st.success(f"✅ Analysis completed in {results['processing_time']:.2f} seconds!")
+                                st.info("🎯 Check other tabs for detailed results")
                             
-                            st.balloons()
-                            st.success(f"✅ Analysis completed in {results['processing_time']:.2f} seconds!")
-                            st.info("🎯 Check other tabs for detailed results")
-                            
-                            transcription_status = results.get('transcription', {}).get('status', 'unknown')
-                            if transcription_status == 'no_audio':
-                                st.warning("⚠️ No audio detected in video")
-                            elif transcription_status == 'no_speech':
-                                st.warning("⚠️ No clear speech detected in audio")
-                            elif transcription_status == 'error':
-                                st.warning("⚠️ Speech recognition had issues - check internet connection")
-                        else:
-                            error_msg = results.get('error', 'Unknown error')
-                            st.error(f"❌ Processing failed: {error_msg}")
-                            st.info("💡 Try a different video or check system requirements")
+                                transcription_status = results.get('transcription', {}).get('status', 'unknown')
+                                if transcription_status == 'no_audio':
+                                    st.warning("⚠️ No audio detected in video")
+                                elif transcription_status == 'no_speech':
+                                    st.warning("⚠️ No clear speech detected in audio")
+                                elif transcription_status == 'error':
+                                    st.warning("⚠️ Speech recognition had issues - check internet connection")
+                            else:
+                                error_msg = results.get('error', 'Unknown error')
+                                st.error(f"❌ Processing failed: {error_msg}")
+                                st.info("💡 Try a different video or check system requirements")
                     
                     except Exception as e:
                         st.error(f"❌ Error during processing: {str(e)}")
                         st.info("💡 Please try again or check the console for details")
         else:
             st.info("📁 Upload a video file to begin advanced AI analysis")
+        
+        render_job_status()
     
     with tab2:
         if 'results' in st.session_state and st.session_state['results']['success']:
@@ -2219,9 +1437,10 @@ def main():
                     for col_idx in range(4):
                         img_idx = row * 4 + col_idx
                         if img_idx < num_images:
-                            filename, img_data = st.session_state['keyframe_images'][img_idx]
+                            filename, frame_path = st.session_state['keyframe_images'][img_idx]
                             with cols[col_idx]:
-                                img = Image.open(io.BytesIO(img_data))
+                                # Fixed-size preview bytes from the shared cache; no decode per rerun
+                                img = get_thumbnail_cache().get(frame_path)
                                 scene_time = results['keyframes'][img_idx]['timestamp'] if img_idx < len(results['keyframes']) else 0
                                 
                                 # Create card for each keyframe with proper padding
@@ -2244,7 +1463,8 @@ def main():
                                     ">Scene {img_idx + 1}</div>
                                 </div>
                                 """, unsafe_allow_html=True)
-                                st.image(img, width='stretch')
+                                if img is not None:
+                                    st.image(img, width='stretch')
                                 st.caption(f"⏱️ {scene_time:.1f}s", unsafe_allow_html=False)
             
             st.markdown("---")
@@ -2286,25 +1506,22 @@ def main():
             
             with col_fav2:
                 video_name = st.session_state.get('uploaded_file_name', 'Unknown Video')
-                video_id = st.session_state.get('video_id', str(datetime.now().timestamp()))
+                output_dir = st.session_state.get('output_dir')
                 
-                # Check if video is already in favorites
-                is_favorite = any(fav['id'] == video_id for fav in st.session_state['favorites'])
+                # Favorites live in the catalog, keyed by the analysis folder
+                catalog = get_catalog()
+                entry = catalog.get(output_dir) if output_dir else None
                 
-                if is_favorite:
+                if entry and entry['favorite']:
                     if st.button("💔 Remove from Favorites", key="remove_fav"):
-                        st.session_state['favorites'] = [fav for fav in st.session_state['favorites'] if fav['id'] != video_id]
+                        catalog.set_favorite(output_dir, False)
                         st.success("Removed from favorites!")
                         st.rerun()
-                else:
+                elif output_dir:
                     if st.button("⭐ Add to Favorites", key="add_fav"):
-                        favorite_data = {
-                            'id': video_id,
-                            'name': video_name,
-                            'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
-                            'results': results
-                        }
-                        st.session_state['favorites'].append(favorite_data)
+                        if entry is None:
+                            catalog.add(results, output_dir, name=video_name)
+                        catalog.set_favorite(output_dir, True)
                         st.success("Added to favorites! ⭐")
                         st.rerun()
         
@@ -2398,8 +1615,12 @@ def main():
                     st.metric("✨ Quality", f"{quality}%")
                 
                 waveform_path = results.get('waveform_path')
+                sidecar = open_sidecar(results, st.session_state.get('output_dir', ''))
                 if waveform_path and os.path.exists(waveform_path):
                     st.image(waveform_path, width='stretch')
+                elif 'audio_envelope' in sidecar:
+                    # Only the envelope column is mapped; it is a few KB even for long videos
+                    st.area_chart(sidecar['audio_envelope'][::max(1, len(sidecar['audio_envelope']) // 2000)])
                 else:
                     st.info("🎵 Waveform visualization not available")
             else:
@@ -2572,9 +1793,19 @@ def main():
                 st.markdown(f"<div class='info-chip'>Resolution: {resolution}</div>", unsafe_allow_html=True)
                 st.markdown(f"<div class='info-chip'>Frame Rate: {fps_quality}</div>", unsafe_allow_html=True)
                 st.markdown(f"<div class='info-chip'>Sharpness: {sharpness}</div>", unsafe_allow_html=True)
-            
+                st.markdown(f"<div class='info-chip'>Noise: {quality.get('avg_noise', 0):.2f} | Blockiness: {quality.get('avg_blockiness', 0):.2f}</div>", unsafe_allow_html=True)
+
+            timeline = quality.get('timeline', [])
+            if timeline:
+                st.markdown("#### 📉 Quality Over Time")
+                st.caption(f"{quality.get('frames_sampled', 0)} frames sampled across the whole video")
+                st.line_chart({
+                    metric: [seg[metric] for seg in timeline]
+                    for metric in ('sharpness', 'brightness', 'noise', 'blockiness')
+                })
+
             st.markdown("---")
-            
+
             st.markdown("### 📋 Technical Specifications")
             
             col1, col2, col3 = st.columns(3)
@@ -0,0 +1 @@
+"""Benchmarks for the video summarization pipeline."""
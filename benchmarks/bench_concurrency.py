@@ -0,0 +1,89 @@
+"""Batch throughput at 1/2/4/8 concurrent videos, with and without the thread budget.
+
+    python -m benchmarks.bench_concurrency --tier medium --concurrency 1 2 4 8 --output concurrency.json
+    python -m benchmarks.bench_concurrency --pipeline advanced --skip transcription summarization
+
+"managed" gives each worker `cpus // jobs` threads, which its stages then
+share out (project/pipeline/resources.py). "oversubscribed" lets every worker
+use all cores, as the library defaults do. Every video is a hard link to one
+synthetic clip, so runs differ only in scheduling.
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from benchmarks.synthetic import TIERS, make_tier
+from project.cli import run_batch
+from project.pipeline.resources import plan_threads
+
+def copies(source: str, count: int, directory: Path) -> list:
+    paths = []
+    for i in range(count):
+        path = directory / f"video_{i:03d}{Path(source).suffix}"
+        if not path.exists():
+            try:
+                os.link(source, path)
+            except OSError:
+                shutil.copyfile(source, path)
+        paths.append(str(path))
+    return paths
+
+def run(args) -> dict:
+    work = Path(tempfile.mkdtemp(prefix="bench_concurrency_"))
+    try:
+        source = make_tier(args.tier, str(work), seed=args.seed)["path"]
+        inputs = work / "inputs"
+        inputs.mkdir()
+        options = {"skip": set(args.skip)}
+        results = {"pipeline": args.pipeline, "tier": args.tier, "cpus": args.cpus, "runs": []}
+        for mode in args.modes:
+            base = None
+            for jobs in args.concurrency:
+                videos = copies(source, max(jobs * args.videos_per_job, args.min_videos), inputs)
+                threads = plan_threads(args.cpus, jobs) if mode == "managed" else args.cpus
+                out_root = work / f"out_{mode}_{jobs}"
+                start = time.perf_counter()
+                report = run_batch(videos, str(out_root), args.pipeline, options, jobs, threads, force=True)
+                seconds = time.perf_counter() - start
+                shutil.rmtree(out_root, ignore_errors=True)
+                per_minute = 60.0 * len(report["done"]) / seconds
+                base = base or per_minute
+                results["runs"].append({"mode": mode, "jobs": jobs, "threads_per_job": threads, "videos": len(videos),
+                                        "failed": len(report["failed"]), "seconds": round(seconds, 2),
+                                        "videos_per_min": round(per_minute, 2),
+                                        "scaling": round(per_minute / base, 3)})
+                print(f"{mode:15} jobs={jobs:<2} threads={threads:<3} {per_minute:8.2f} videos/min  "
+                      f"x{per_minute / base:.2f}", file=sys.stderr)
+        return results
+    finally:
+        shutil.rmtree(work, ignore_errors=True)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pipeline", choices=("pro", "advanced"), default="pro")
+    parser.add_argument("--skip", nargs="*", default=[], choices=("detection", "transcription", "summarization", "moderation"),
+                        help="Advanced pipeline stages to disable")
+    parser.add_argument("--tier", choices=tuple(TIERS), default="small")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--modes", nargs="+", choices=("managed", "oversubscribed"), default=["managed", "oversubscribed"])
+    parser.add_argument("--cpus", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--videos-per-job", type=int, default=2)
+    parser.add_argument("--min-videos", type=int, default=4)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Write JSON results to this file")
+    args = parser.parse_args()
+    results = run(args)
+    text = json.dumps(results, indent=2)
+    if args.output:
+        Path(args.output).write_text(text, encoding="utf-8")
+    print(text)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""Measure pipeline import cost with `python -X importtime` in a fresh interpreter.
+
+    python -m benchmarks.bench_import --budget 1.0 --output import.json
+
+Exits with status 1 when a module takes longer than --budget seconds to import.
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import subprocess
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+MODULES = ("project.pipeline", "project.pipeline.pro", "project.pipeline.advanced", "project.cli")
+HEAVY = ("torch", "transformers", "ultralytics", "whisper", "moviepy", "streamlit")
+
+def parse_importtime(stderr: str) -> dict:
+    # Lines look like: "import time:   self [us] | cumulative | imported package"
+    modules = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = (part.strip() for part in line[len("import time:"):].split("|", 2))
+        modules[name] = {"self_us": int(self_us), "cumulative_us": int(cumulative_us)}
+    return modules
+
+def measure(module: str, top: int) -> dict:
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [str(ROOT), os.environ.get("PYTHONPATH")])))
+    start = time.perf_counter()
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                          capture_output=True, text=True, cwd=ROOT, env=env)
+    wall = time.perf_counter() - start
+    if proc.returncode != 0:
+        return {"error": proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else "import failed"}
+    modules = parse_importtime(proc.stderr)
+    total = modules.get(module, {}).get("cumulative_us", 0)
+    slowest = sorted(modules.items(), key=lambda kv: kv[1]["self_us"], reverse=True)[:top]
+    return {
+        "import_seconds": round(total / 1e6, 4),
+        "process_seconds": round(wall, 4),
+        "modules_loaded": len(modules),
+        "heavy_loaded": sorted(h for h in HEAVY if h in modules),
+        "slowest": [{"module": name, **times} for name, times in slowest],
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--modules", nargs="+", default=list(MODULES))
+    parser.add_argument("--budget", type=float, default=1.0, help="Import time budget per module in seconds")
+    parser.add_argument("--top", type=int, default=10, help="Slowest modules to report")
+    parser.add_argument("--output", help="Write JSON results to this file")
+    args = parser.parse_args()
+
+    results = {"python": sys.version.split()[0], "budget_seconds": args.budget, "modules": {}}
+    over_budget = False
+    for module in args.modules:
+        result = measure(module, args.top)
+        results["modules"][module] = result
+        if "error" in result:
+            print(f"{module:<28} {result['error']}", file=sys.stderr)
+            over_budget = True
+            continue
+        over = result["import_seconds"] > args.budget
+        over_budget = over_budget or over
+        heavy = ", ".join(result["heavy_loaded"]) or "none"
+        print(f"{module:<28} {result['import_seconds']:7.3f}s  heavy: {heavy}{'  OVER BUDGET' if over else ''}",
+              file=sys.stderr)
+
+    text = json.dumps(results, indent=2)
+    if args.output:
+        Path(args.output).write_text(text, encoding="utf-8")
+    print(text)
+    sys.exit(1 if over_budget else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+"""Torch vs ONNX Runtime for the DetectorCaptioner vision models: parity and throughput.
+
+    python -m benchmarks.bench_onnx --video clip.mp4 --frames 32 --threads 4 --output onnx.json
+
+Keyframes are taken evenly from the video (a synthetic one when none is
+given). The first ONNX pass exports any model missing from the cache; its time
+is reported separately from the timed runs. Needs torch, transformers,
+ultralytics and onnxruntime, and downloads the models on first use.
+"""
+import sys
+import json
+import time
+import shutil
+import argparse
+import tempfile
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from benchmarks.synthetic import make_video
+from project.modules.detection_captioning import DetectorCaptioner
+from project.modules.onnx_backend import DEFAULT_ONNX_DIR, OnnxBackend
+from project.modules.dense import box_iou
+
+def sample_keyframes(video_path: str, count: int, work: Path) -> list:
+    cap = cv2.VideoCapture(video_path)
+    total = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+    fps = cap.get(cv2.CAP_PROP_FPS) or 25.0
+    keyframes = []
+    for i, index in enumerate(np.linspace(0, max(total - 1, 0), count).astype(int)):
+        cap.set(cv2.CAP_PROP_POS_FRAMES, int(index))
+        ok, frame = cap.read()
+        if not ok:
+            continue
+        path = str(work / f"kf_{i:04d}.jpg")
+        cv2.imwrite(path, frame)
+        keyframes.append({"scene_idx": i, "frame_path": path, "timestamp": index / fps})
+    cap.release()
+    return keyframes
+
+def box_parity(a: np.ndarray, b: np.ndarray, n_frames: int) -> dict:
+    """Greedy same-class matching per frame at IoU >= 0.5."""
+    matched, ious, conf_diff = 0, [], []
+    for frame in range(n_frames):
+        fa, fb = a[a["frame_idx"] == frame], b[b["frame_idx"] == frame]
+        if not len(fa) or not len(fb):
+            continue
+        iou = box_iou(fa["xyxyn"], fb["xyxyn"])
+        iou[fa["cls"][:, None] != fb["cls"][None, :]] = 0.0
+        while iou.size and iou.max() >= 0.5:
+            i, j = np.unravel_index(np.argmax(iou), iou.shape)
+            matched += 1
+            ious.append(float(iou[i, j]))
+            conf_diff.append(abs(float(fa["conf"][i]) - float(fb["conf"][j])))
+            iou[i, :] = 0.0
+            iou[:, j] = 0.0
+    return {"torch_boxes": int(len(a)), "onnx_boxes": int(len(b)), "matched": matched,
+            "recall": round(matched / len(a), 4) if len(a) else 1.0,
+            "mean_iou": round(float(np.mean(ious)), 4) if ious else None,
+            "max_conf_diff": round(float(np.max(conf_diff)), 4) if conf_diff else None}
+
+def run_backend(detector: DetectorCaptioner, keyframes: list, batch: int, repeats: int):
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        results, boxes = detector.process_keyframes([dict(k) for k in keyframes], batch_size=batch)
+        times.append(time.perf_counter() - start)
+    seconds = float(np.median(times))
+    return results, boxes, {"seconds": round(seconds, 3), "frames_per_s": round(len(keyframes) / seconds, 2)}
+
+def run(args) -> dict:
+    work = Path(tempfile.mkdtemp(prefix="bench_onnx_"))
+    try:
+        video = args.video or make_video(str(work / "synthetic.mp4"), duration=20.0, audio=False)["path"]
+        keyframes = sample_keyframes(video, args.frames, work)
+        detector = DetectorCaptioner(backend="torch")
+        detector._load_models()
+        torch_results, torch_boxes, torch_stats = run_backend(detector, keyframes, args.batch, args.repeats)
+
+        # Same loaded weights, vision models swapped for ONNX Runtime sessions
+        detector.onnx = OnnxBackend(args.cache_dir, args.threads, args.inter_threads)
+        start = time.perf_counter()
+        run_backend(detector, keyframes[:1], 1, 1)
+        warmup_s = time.perf_counter() - start
+        onnx_results, onnx_boxes, onnx_stats = run_backend(detector, keyframes, args.batch, args.repeats)
+
+        a = np.array([r["clip_embedding"] for r in torch_results], dtype=np.float32)
+        b = np.array([r["clip_embedding"] for r in onnx_results], dtype=np.float32)
+        cosine = np.sum(a * b, axis=1) / (np.linalg.norm(a, axis=1) * np.linalg.norm(b, axis=1))
+        same_caption = np.mean([x["caption"] == y["caption"] for x, y in zip(torch_results, onnx_results)])
+        parity = {
+            "clip_max_abs_diff": round(float(np.abs(a - b).max()), 6),
+            "clip_min_cosine": round(float(cosine.min()), 6),
+            "caption_match": round(float(same_caption), 4),
+            "boxes": box_parity(torch_boxes, onnx_boxes, len(keyframes)),
+        }
+        parity["ok"] = bool(parity["clip_min_cosine"] >= args.min_cosine and parity["boxes"]["recall"] >= args.min_recall
+                            and parity["caption_match"] >= args.min_caption_match)
+        return {"video": video, "frames": len(keyframes), "batch": args.batch, "threads": args.threads,
+                "inter_threads": args.inter_threads, "onnx_export_and_warmup_s": round(warmup_s, 2),
+                "torch": torch_stats, "onnx": onnx_stats,
+                "speedup": round(torch_stats["seconds"] / onnx_stats["seconds"], 3), "parity": parity}
+    finally:
+        shutil.rmtree(work, ignore_errors=True)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--video", help="Video to take keyframes from (default: synthetic)")
+    parser.add_argument("--frames", type=int, default=32)
+    parser.add_argument("--batch", type=int, default=8)
+    parser.add_argument("--threads", type=int, default=0, help="ONNX intra-op threads (0 = one per core)")
+    parser.add_argument("--inter-threads", type=int, default=1)
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--cache-dir", default=DEFAULT_ONNX_DIR, help="Where exported models are kept")
+    parser.add_argument("--min-cosine", type=float, default=0.999)
+    parser.add_argument("--min-recall", type=float, default=0.95)
+    parser.add_argument("--min-caption-match", type=float, default=0.9)
+    parser.add_argument("--output", help="Write JSON results to this file")
+    args = parser.parse_args()
+    results = run(args)
+    text = json.dumps(results, indent=2)
+    if args.output:
+        Path(args.output).write_text(text, encoding="utf-8")
+    print(text)
+    return 0 if results["parity"]["ok"] else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
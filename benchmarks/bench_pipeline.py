@@ -0,0 +1,177 @@
+"""End-to-end stage timings on synthetic videos, emitted as JSON for regression comparison.
+
+    python -m benchmarks.bench_pipeline --tiers small medium --repeat 3 --output bench.json
+    python -m benchmarks.compare baseline.json bench.json
+
+Everything runs on CPU from locally generated inputs; no model downloads are needed.
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import platform
+import statistics
+import subprocess
+import tempfile
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from benchmarks.synthetic import TIERS, make_tier, make_transcript
+from project.modules.tracing import Tracer, span
+from project.modules.video_probe import clear_probe_cache
+
+STAGES = ("detect_scenes_fast", "extract_keyframes_parallel", "KeyframeExtractor", "extract_audio",
+          "summarize", "detect_content_issues")
+# Stages that consume another stage's output
+REQUIRES = {
+    "extract_keyframes_parallel": "detect_scenes_fast",
+    "KeyframeExtractor": "detect_scenes_fast",
+    "detect_content_issues": "extract_keyframes_parallel",
+}
+
+def with_prerequisites(stages: list) -> list:
+    needed = set(stages)
+    for name in stages:
+        while name in REQUIRES:
+            name = REQUIRES[name]
+            needed.add(name)
+    return [name for name in STAGES if name in needed]
+
+def git_revision() -> str:
+    try:
+        proc = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, check=True,
+                              cwd=Path(__file__).resolve().parent.parent)
+        return proc.stdout.decode().strip()
+    except Exception:
+        return ""
+
+def environment() -> dict:
+    return {
+        "revision": git_revision(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "opencv": cv2.__version__,
+        "numpy": np.__version__,
+    }
+
+def stage_runners(video: dict, work_dir: str, state: dict) -> dict:
+    # The pipeline is imported here so the synthetic generator stays usable on its own
+    from project.pipeline import pro
+    from project.modules.keyframe_extractor import KeyframeExtractor
+
+    def detect():
+        state["scenes"] = pro.detect_scenes_fast(video["path"])
+        return {"segments": len(state["scenes"])}
+
+    def keyframes_parallel():
+        state["keyframes"] = pro.extract_keyframes_parallel(video["path"], state["scenes"], work_dir)
+        return {"frames": len(state["keyframes"])}
+
+    def keyframes_serial():
+        return {"frames": len(KeyframeExtractor(work_dir).extract_keyframes(video["path"], state["scenes"]))}
+
+    def audio():
+        audio_path = pro.extract_audio_from_video(video["path"], work_dir)
+        return {"bytes": os.path.getsize(audio_path) if audio_path else 0}
+
+    def summarize():
+        summary = pro.generate_text_summary(state["text"])
+        return {"tokens": len(state["text"].split()), "summary_words": summary.get("word_count", 0)}
+
+    def moderate():
+        result = pro.detect_content_issues(state["text"], state["keyframes"], "en")
+        return {"tokens": len(state["text"].split()), "flags": len(result.get("issues", []))}
+
+    return {
+        "detect_scenes_fast": detect,
+        "extract_keyframes_parallel": keyframes_parallel,
+        "KeyframeExtractor": keyframes_serial,
+        "extract_audio": audio,
+        "summarize": summarize,
+        "detect_content_issues": moderate,
+    }
+
+def run_tier(tier: str, stages: list, repeat: int, root: str) -> dict:
+    video = make_tier(tier, root)
+    state = {"text": make_transcript(video["duration"]), "scenes": [], "keyframes": []}
+    timings = {name: [] for name in stages}
+    errors = {}
+    for r in range(repeat):
+        work_dir = os.path.join(root, f"{tier}_run{r}")
+        os.makedirs(work_dir, exist_ok=True)
+        clear_probe_cache()
+        runners = stage_runners(video, work_dir, state)
+        tracer = Tracer(tier)
+        with tracer.activate():
+            for name in with_prerequisites(stages):
+                with span(name) as stage:
+                    try:
+                        stage.count(**runners[name]())
+                    except Exception as e:
+                        errors[name] = {"error": f"{type(e).__name__}: {e}"}
+                        continue
+                if name in timings:
+                    timings[name].append(stage)
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    results = {}
+    for name, spans in timings.items():
+        if not spans:
+            results[name] = errors.get(name, {"error": "not run"})
+            continue
+        seconds = [s.duration_ns / 1e9 for s in spans]
+        results[name] = {
+            "seconds": round(statistics.median(seconds), 4),
+            "min_seconds": round(min(seconds), 4),
+            "max_seconds": round(max(seconds), 4),
+            "cpu_seconds": round(statistics.median(s.cpu_ns / 1e9 for s in spans), 4),
+            "rss_peak_delta_kb": max(s.rss_peak_delta_kb for s in spans),
+            "counts": spans[-1].counts,
+            "runs": len(spans),
+        }
+    video = {k: v for k, v in video.items() if k != "path"}
+    video["cuts"] = len(video["cuts"])
+    return {"video": video, "stages": results}
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tiers", nargs="+", default=["small", "medium"], choices=list(TIERS))
+    parser.add_argument("--stages", nargs="+", default=list(STAGES), choices=STAGES)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--keep", action="store_true", help="Keep the generated videos")
+    parser.add_argument("--output", help="Write JSON results to this file")
+    args = parser.parse_args()
+
+    root = tempfile.mkdtemp(prefix="bench_pipeline_")
+    report = {"created": time.strftime("%Y-%m-%dT%H:%M:%S"), "environment": environment(),
+              "repeat": args.repeat, "tiers": {}}
+    try:
+        for tier in args.tiers:
+            start = time.perf_counter()
+            report["tiers"][tier] = run_tier(tier, args.stages, args.repeat, root)
+            print(f"{tier:>8} done in {time.perf_counter() - start:.1f}s", file=sys.stderr)
+            for name, result in report["tiers"][tier]["stages"].items():
+                if "error" in result:
+                    print(f"{'':>8} {name:<28} {result['error']}", file=sys.stderr)
+                else:
+                    print(f"{'':>8} {name:<28} {result['seconds']:8.3f}s", file=sys.stderr)
+    finally:
+        if args.keep:
+            print(f"Videos kept in {root}", file=sys.stderr)
+        else:
+            shutil.rmtree(root, ignore_errors=True)
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        Path(args.output).write_text(text, encoding="utf-8")
+    print(text)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+"""fp32 vs dynamic int8 for the text models: quality, latency and memory.
+
+    python -m benchmarks.bench_quantize --output quantize.json
+    python -m benchmarks.bench_quantize --audio reading.wav --reference benchmarks/fixtures/transcript.txt
+
+BART summarises the fixture transcript in both modes. The int8 summary is
+scored with ROUGE-1/2/L against the fp32 one. With `--audio`, Whisper
+transcribes it in both modes and the int8 word error rate is reported against
+the fp32 transcript. When `--reference` is also given, both modes are scored
+against that text too. Every run happens in a fresh process, so the peak
+RSS belongs to one model in one mode. Needs torch, transformers and
+openai-whisper, and downloads the models on first use.
+"""
+import os
+import re
+import sys
+import json
+import time
+import resource
+import argparse
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+FIXTURE_TRANSCRIPT = Path(__file__).resolve().parent / "fixtures" / "transcript.txt"
+
+def words(text: str) -> list:
+    return re.findall(r"[a-z0-9']+", text.lower())
+
+def _ngrams(tokens: list, n: int) -> dict:
+    counts = {}
+    for i in range(len(tokens) - n + 1):
+        gram = tuple(tokens[i:i + n])
+        counts[gram] = counts.get(gram, 0) + 1
+    return counts
+
+def _f1(overlap: int, ref_total: int, hyp_total: int) -> float:
+    if not overlap:
+        return 0.0
+    precision, recall = overlap / hyp_total, overlap / ref_total
+    return 2 * precision * recall / (precision + recall)
+
+def _lcs(a: list, b: list) -> int:
+    row = [0] * (len(b) + 1)
+    for x in a:
+        prev = 0
+        for j, y in enumerate(b, 1):
+            prev, row[j] = row[j], prev + 1 if x == y else max(row[j], row[j - 1])
+    return row[-1]
+
+def rouge(reference: str, hypothesis: str) -> dict:
+    """ROUGE-1, ROUGE-2 and ROUGE-L F1 on lower-cased word tokens."""
+    ref, hyp = words(reference), words(hypothesis)
+    scores = {}
+    for n in (1, 2):
+        r, h = _ngrams(ref, n), _ngrams(hyp, n)
+        overlap = sum(min(count, h.get(gram, 0)) for gram, count in r.items())
+        scores[f"rouge{n}"] = round(_f1(overlap, sum(r.values()), sum(h.values())), 4)
+    scores["rougeL"] = round(_f1(_lcs(ref, hyp), len(ref), len(hyp)), 4)
+    return scores
+
+def wer(reference: str, hypothesis: str) -> float:
+    ref, hyp = words(reference), words(hypothesis)
+    row = list(range(len(hyp) + 1))
+    for i, x in enumerate(ref, 1):
+        prev, row[0] = row[0], i
+        for j, y in enumerate(hyp, 1):
+            prev, row[j] = row[j], min(row[j] + 1, row[j - 1] + 1, prev + (x != y))
+    return round(row[-1] / max(len(ref), 1), 4)
+
+def _rss_mb() -> float:
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 1024 ** 2
+
+def measure(component: str, int8: bool, payload: str, repeats: int) -> dict:
+    """Runs in a child process: load once, run `repeats` times, report timings and memory."""
+    from project.modules.quantize import cached_path
+    rss_before = _rss_mb()
+    start = time.perf_counter()
+    if component == "summarizer":
+        from project.modules.summarizer import TextSummarizer
+        model = TextSummarizer(quantize=int8)
+        cached = os.path.exists(cached_path("bart-large-cnn"))
+        model._load_model()
+        run = lambda: model.summarize(payload)
+    else:
+        from project.modules.speech_transcriber import SpeechTranscriber
+        model = SpeechTranscriber(quantize=int8)
+        cached = os.path.exists(cached_path(f"whisper-{model.model_name}"))
+        model._load()
+        run = lambda: model.transcribe(payload)[0]
+    load_s = time.perf_counter() - start
+    rss_loaded = _rss_mb()
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        output = run()
+        times.append(time.perf_counter() - start)
+    times.sort()
+    return {"mode": "int8" if int8 else "fp32", "load_s": round(load_s, 2), "from_cache": int8 and cached,
+            "latency_s": round(times[len(times) // 2], 3), "model_rss_mb": round(rss_loaded - rss_before, 1),
+            # ru_maxrss is in KiB on Linux
+            "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+            "output": output}
+
+def in_child(*args) -> dict:
+    ctx = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=1, mp_context=ctx) as executor:
+        return executor.submit(measure, *args).result()
+
+def compare(component: str, payload: str, repeats: int) -> dict:
+    fp32 = in_child(component, False, payload, repeats)
+    int8 = in_child(component, True, payload, repeats)
+    if not int8["from_cache"]:
+        # The first int8 load also quantized and wrote the cache; time the cached load as well
+        int8 = dict(in_child(component, True, payload, repeats), first_load_s=int8["load_s"])
+    return {"fp32": fp32, "int8": int8, "speedup": round(fp32["latency_s"] / max(int8["latency_s"], 1e-9), 3),
+            "rss_saved_mb": round(fp32["peak_rss_mb"] - int8["peak_rss_mb"], 1)}
+
+def run(args) -> dict:
+    transcript = Path(args.transcript).read_text(encoding="utf-8")
+    results = {"repeats": args.repeats}
+    summary = compare("summarizer", transcript, args.repeats)
+    summary["rouge_int8_vs_fp32"] = rouge(summary["fp32"]["output"], summary["int8"]["output"])
+    results["summarizer"] = summary
+    print(f"summarizer: {summary['speedup']}x faster, {summary['rss_saved_mb']} MB less, "
+          f"ROUGE {summary['rouge_int8_vs_fp32']}", file=sys.stderr)
+    if args.audio:
+        speech = compare("transcriber", os.path.abspath(args.audio), args.repeats)
+        speech["wer_int8_vs_fp32"] = wer(speech["fp32"]["output"], speech["int8"]["output"])
+        if args.reference:
+            reference = Path(args.reference).read_text(encoding="utf-8")
+            speech["wer_fp32"] = wer(reference, speech["fp32"]["output"])
+            speech["wer_int8"] = wer(reference, speech["int8"]["output"])
+        results["transcriber"] = speech
+        print(f"transcriber: {speech['speedup']}x faster, {speech['rss_saved_mb']} MB less, "
+              f"WER vs fp32 {speech['wer_int8_vs_fp32']}", file=sys.stderr)
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--transcript", default=str(FIXTURE_TRANSCRIPT), help="Text to summarise")
+    parser.add_argument("--audio", help="Speech recording to transcribe (transcription is skipped without it)")
+    parser.add_argument("--reference", help="Ground-truth text of --audio for absolute WER")
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--output", help="Write JSON results to this file")
+    args = parser.parse_args()
+    results = run(args)
+    text = json.dumps(results, indent=2)
+    if args.output:
+        Path(args.output).write_text(text, encoding="utf-8")
+    print(text)
+
+if __name__ == "__main__":
+    main()
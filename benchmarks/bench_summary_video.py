@@ -0,0 +1,91 @@
+"""Compare summary-video assembly modes: serial moviepy vs parallel ffmpeg jobs.
+
+    python -m benchmarks.bench_summary_video --duration 120 --scenes 12
+
+Each run records the assembly path that actually ran. Runs that fell back
+to another path (for example the single-clip copy when moviepy is missing)
+or wrote nothing get no timing or size, so they cannot pass for the mode
+they were meant to measure.
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import importlib.util
+import tempfile
+import subprocess
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from project.modules.utils import find_executable
+from project.modules.summarizer_video import VideoSummarizer, ASSEMBLY_MODES
+from project.modules.video_probe import decode_errors
+
+def make_source(path: str, duration: float, size: str = "1280x720", fps: int = 25, gop: int = 50):
+    ffmpeg = find_executable("ffmpeg")
+    cmd = [ffmpeg, "-y", "-v", "error",
+           "-f", "lavfi", "-i", f"testsrc2=size={size}:rate={fps}",
+           "-f", "lavfi", "-i", "sine=frequency=440:sample_rate=44100",
+           "-t", str(duration), "-c:v", "libx264", "-preset", "veryfast", "-g", str(gop),
+           "-pix_fmt", "yuv420p", "-c:a", "aac", path]
+    subprocess.run(cmd, check=True)
+
+def run(args) -> dict:
+    work = tempfile.mkdtemp(prefix="bench_summary_")
+    source = os.path.join(work, "source.mp4")
+    make_source(source, args.duration, args.size)
+    step = args.duration / args.scenes
+    # Offset cuts so they never land on a keyframe and smart mode has work to do
+    scenes = [(i * step + 0.37, (i + 1) * step) for i in range(args.scenes)]
+    results = {"duration": args.duration, "scenes": args.scenes, "size": args.size,
+               "cpu_count": os.cpu_count(), "runs": []}
+    for mode in args.modes:
+        if mode == "moviepy" and importlib.util.find_spec("moviepy") is None:
+            print("moviepy not installed; skipping moviepy mode", file=sys.stderr)
+            continue
+        for workers in ([1, None] if mode == "reencode" else [None]):
+            outdir = os.path.join(work, f"{mode}_{workers or 'auto'}")
+            os.makedirs(outdir, exist_ok=True)
+            summarizer = VideoSummarizer(outdir, mode=mode, max_workers=workers)
+            start = time.perf_counter()
+            out = summarizer.create_summary_video(source, scenes, [], target_duration=args.duration * args.ratio)
+            elapsed = time.perf_counter() - start
+            assembly = summarizer.last_assembly
+            ok = assembly.get("method") == mode and bool(out) and os.path.exists(out)
+            results["runs"].append({
+                "mode": mode,
+                "workers": summarizer.max_workers,
+                "assembled_by": assembly.get("method"),
+                "fallback": not ok,
+                "parts": assembly.get("parts"),
+                "reencoded_parts": assembly.get("reencoded"),
+                "seconds": round(elapsed, 3) if ok else None,
+                "output_bytes": os.path.getsize(out) if ok else None,
+                "decode_errors": len(decode_errors(out)) if ok else None,
+            })
+            if ok:
+                print(f"{mode:>9} workers={summarizer.max_workers:<3} {elapsed:8.2f}s", file=sys.stderr)
+            else:
+                print(f"{mode:>9} workers={summarizer.max_workers:<3} fell back to {assembly.get('method') or 'nothing'}; "
+                      "not timed", file=sys.stderr)
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--duration", type=float, default=60.0)
+    parser.add_argument("--scenes", type=int, default=12)
+    parser.add_argument("--size", default="1280x720")
+    parser.add_argument("--ratio", type=float, default=0.5, help="Target summary length as a fraction of the source")
+    parser.add_argument("--modes", nargs="+", default=list(ASSEMBLY_MODES), choices=ASSEMBLY_MODES)
+    parser.add_argument("--output", help="Write JSON results to this file")
+    args = parser.parse_args()
+    results = run(args)
+    text = json.dumps(results, indent=2)
+    if args.output:
+        Path(args.output).write_text(text, encoding="utf-8")
+    print(text)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""Scene-index latency at library scale: exact batched matmul vs IVF.
+
+    python -m benchmarks.bench_vector_search --count 1000000 --nlist 1024 --output vectors.json
+
+Vectors are random unit-norm float16 rows written straight to a memmap, so
+the benchmark needs no models and roughly count * dim * 2 bytes of disk (twice,
+while the index is built).
+"""
+import sys
+import json
+import time
+import shutil
+import argparse
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from project.search.index import EmbeddingIndex, BLOCK_ROWS
+
+def random_vectors(path: str, count: int, dim: int, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    out = np.lib.format.open_memmap(path, mode="w+", dtype=np.float16, shape=(count, dim))
+    # A few hundred "topics" so clusters exist, like embeddings of real footage
+    centers = rng.standard_normal((256, dim)).astype(np.float32)
+    for start in range(0, count, BLOCK_ROWS):
+        n = min(BLOCK_ROWS, count - start)
+        block = centers[rng.integers(0, len(centers), n)] + 0.6 * rng.standard_normal((n, dim)).astype(np.float32)
+        out[start:start + n] = block / np.linalg.norm(block, axis=1, keepdims=True)
+    out.flush()
+    return out
+
+def timed(fn, repeats: int):
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = fn()
+        times.append(time.perf_counter() - start)
+    return result, round(1000 * float(np.median(times)), 2)
+
+def run(args) -> dict:
+    work = Path(tempfile.mkdtemp(prefix="bench_vectors_"))
+    try:
+        start = time.perf_counter()
+        vectors = random_vectors(str(work / "source.npy"), args.count, args.dim, args.seed)
+        generate_s = time.perf_counter() - start
+        owners = np.zeros(args.count, dtype=np.int32)
+        rows = np.arange(args.count, dtype=np.int32)
+        rng = np.random.default_rng(args.seed + 1)
+        queries = vectors[rng.choice(args.count, args.queries, replace=False)].astype(np.float32)
+        queries += 0.3 * rng.standard_normal(queries.shape).astype(np.float32) / np.sqrt(args.dim)
+
+        index = EmbeddingIndex(str(work / "index"))
+        start = time.perf_counter()
+        index.build_arrays(vectors, owners, rows, ["bench"], nlist=0)
+        exact_build_s = time.perf_counter() - start
+        results = {"count": args.count, "dim": args.dim, "k": args.k, "generate_s": round(generate_s, 2),
+                   "exact_build_s": round(exact_build_s, 2), "runs": []}
+
+        truth = {}
+        for batch in args.batches:
+            (_, ids), ms = timed(lambda: index.search(queries[:batch], args.k), args.repeats)
+            truth[batch] = ids
+            results["runs"].append({"mode": "exact", "batch": batch, "ms": ms, "ms_per_query": round(ms / batch, 3),
+                                    "recall": 1.0})
+            print(f"exact  batch={batch:<3}           {ms:9.1f} ms  ({ms / batch:.2f} ms/query)", file=sys.stderr)
+
+        # Row ids change when IVF reorders the matrix; compare through the stored source row
+        truth_rows = {b: np.asarray(index.rows)[ids] for b, ids in truth.items()}
+        if args.nlist:
+            start = time.perf_counter()
+            index.build_arrays(vectors, owners, rows, ["bench"], nlist=args.nlist)
+            results["ivf_build_s"] = round(time.perf_counter() - start, 2)
+            results["nlist"] = args.nlist
+            for nprobe in args.nprobe:
+                for batch in args.batches:
+                    (_, ids), ms = timed(lambda: index.search(queries[:batch], args.k, nprobe), args.repeats)
+                    found = np.asarray(index.rows)[ids]
+                    recall = np.mean([len(set(f) & set(t)) / args.k for f, t in zip(found, truth_rows[batch])])
+                    results["runs"].append({"mode": "ivf", "nprobe": nprobe, "batch": batch, "ms": ms,
+                                            "ms_per_query": round(ms / batch, 3), "recall": round(float(recall), 4)})
+                    print(f"ivf    batch={batch:<3} nprobe={nprobe:<4} {ms:9.1f} ms  "
+                          f"({ms / batch:.2f} ms/query)  recall@{args.k}={recall:.3f}", file=sys.stderr)
+        del vectors
+        return results
+    finally:
+        shutil.rmtree(work, ignore_errors=True)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--count", type=int, default=1_000_000)
+    parser.add_argument("--dim", type=int, default=512)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--queries", type=int, default=32)
+    parser.add_argument("--batches", type=int, nargs="+", default=[1, 32])
+    parser.add_argument("--nlist", type=int, default=1024, help="0 to skip the IVF runs")
+    parser.add_argument("--nprobe", type=int, nargs="+", default=[8, 32])
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Write JSON results to this file")
+    args = parser.parse_args()
+    results = run(args)
+    text = json.dumps(results, indent=2)
+    if args.output:
+        Path(args.output).write_text(text, encoding="utf-8")
+    print(text)
+
+if __name__ == "__main__":
+    main()
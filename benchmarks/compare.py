@@ -0,0 +1,56 @@
+"""Compare two bench_pipeline JSON reports and flag stages that got slower.
+
+    python -m benchmarks.compare baseline.json candidate.json --threshold 0.15
+
+Exits with status 1 when any stage regressed by more than the threshold.
+"""
+import sys
+import json
+import argparse
+from pathlib import Path
+
+def load(path: str) -> dict:
+    return json.loads(Path(path).read_text(encoding="utf-8"))
+
+def compare(baseline: dict, candidate: dict, threshold: float, min_seconds: float) -> list:
+    rows = []
+    for tier, data in candidate.get("tiers", {}).items():
+        base_stages = baseline.get("tiers", {}).get(tier, {}).get("stages", {})
+        for name, result in data.get("stages", {}).items():
+            base = base_stages.get(name, {})
+            if "seconds" not in result or "seconds" not in base:
+                rows.append((tier, name, base.get("seconds"), result.get("seconds"), None, "n/a"))
+                continue
+            ratio = result["seconds"] / base["seconds"] if base["seconds"] > 0 else float("inf")
+            # Tiny stages are dominated by timer noise, so they never count as regressions
+            noisy = max(base["seconds"], result["seconds"]) < min_seconds
+            if ratio > 1.0 + threshold and not noisy:
+                status = "SLOWER"
+            elif ratio < 1.0 - threshold and not noisy:
+                status = "faster"
+            else:
+                status = "ok"
+            rows.append((tier, name, base["seconds"], result["seconds"], ratio, status))
+    return rows
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("baseline")
+    parser.add_argument("candidate")
+    parser.add_argument("--threshold", type=float, default=0.2, help="Relative change treated as significant")
+    parser.add_argument("--min-seconds", type=float, default=0.01, help="Ignore stages faster than this")
+    args = parser.parse_args()
+
+    baseline, candidate = load(args.baseline), load(args.candidate)
+    print(f"baseline  {baseline.get('environment', {}).get('revision', '?')}  "
+          f"candidate {candidate.get('environment', {}).get('revision', '?')}")
+    rows = compare(baseline, candidate, args.threshold, args.min_seconds)
+    for tier, name, base, cand, ratio, status in rows:
+        base_s = f"{base:8.3f}s" if base is not None else f"{'-':>9}"
+        cand_s = f"{cand:8.3f}s" if cand is not None else f"{'-':>9}"
+        ratio_s = f"{ratio:6.2f}x" if ratio is not None else f"{'-':>7}"
+        print(f"{tier:>8} {name:<28} {base_s} {cand_s} {ratio_s}  {status}")
+    sys.exit(1 if any(row[-1] == "SLOWER" for row in rows) else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""Deterministic synthetic test videos for the benchmarks.
+
+Frames are drawn with OpenCV: every shot gets its own background colour and a
+moving shape, so hard cuts land exactly on the shot boundaries. A sine tone is
+written as 16-bit PCM and muxed in with ffmpeg when it is available.
+"""
+import os
+import sys
+import math
+import wave
+import subprocess
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from project.modules.utils import find_executable
+
+TIERS = {
+    "small": {"width": 320, "height": 240, "duration": 10.0, "cut_every": 2.0},
+    "medium": {"width": 640, "height": 360, "duration": 30.0, "cut_every": 3.0},
+    "large": {"width": 1280, "height": 720, "duration": 60.0, "cut_every": 4.0},
+}
+
+WORDS = ("video", "scene", "camera", "people", "city", "river", "music", "story", "light", "night",
+         "morning", "team", "game", "match", "crowd", "street", "market", "voice", "speaker", "audience",
+         "weather", "mountain", "forest", "road", "car", "train", "station", "kitchen", "recipe", "lesson")
+
+def write_tone(path: str, duration: float, sample_rate: int = 16000, frequency: float = 440.0):
+    t = np.arange(int(duration * sample_rate)) / float(sample_rate)
+    # Alternate loud and quiet seconds so loudness features have something to find
+    envelope = np.where(np.floor(t) % 2 == 0, 0.6, 0.15)
+    samples = (envelope * np.sin(2 * np.pi * frequency * t) * 32767).astype(np.int16)
+    with wave.open(path, "wb") as wf:
+        wf.setnchannels(1)
+        wf.setsampwidth(2)
+        wf.setframerate(sample_rate)
+        wf.writeframes(samples.tobytes())
+    return path
+
+def write_frames(path: str, width: int, height: int, duration: float, fps: int = 25,
+                 cut_every: float = 5.0, seed: int = 0) -> list:
+    rng = np.random.default_rng(seed)
+    total = int(round(duration * fps))
+    shot_len = max(1, int(round(cut_every * fps)))
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"mp4v"), fps, (width, height))
+    if not writer.isOpened():
+        raise RuntimeError(f"OpenCV could not open a writer for {path}")
+    noise = rng.integers(0, 24, size=(height, width, 3), dtype=np.uint8)
+    cuts = []
+    color = shape = None
+    for n in range(total):
+        if n % shot_len == 0:
+            color = tuple(int(c) for c in rng.integers(0, 256, size=3))
+            shape = rng.integers(0, 2)
+            if n:
+                cuts.append(n / float(fps))
+        frame = np.empty((height, width, 3), dtype=np.uint8)
+        frame[:] = color
+        frame = cv2.add(frame, noise)
+        phase = (n % shot_len) / float(shot_len)
+        cx = int(width * (0.2 + 0.6 * phase))
+        cy = int(height * (0.5 + 0.25 * math.sin(2 * math.pi * phase)))
+        r = max(4, min(width, height) // 8)
+        inverse = tuple(255 - c for c in color)
+        if shape:
+            cv2.circle(frame, (cx, cy), r, inverse, -1)
+        else:
+            cv2.rectangle(frame, (cx - r, cy - r), (cx + r, cy + r), inverse, -1)
+        cv2.putText(frame, f"{n / fps:6.2f}s", (8, height - 12), cv2.FONT_HERSHEY_SIMPLEX,
+                    max(0.4, height / 720.0), (255, 255, 255), 1, cv2.LINE_AA)
+        writer.write(frame)
+    writer.release()
+    return cuts
+
+def make_video(path: str, width: int = 640, height: int = 360, duration: float = 30.0, fps: int = 25,
+               cut_every: float = 5.0, audio: bool = True, frequency: float = 440.0, seed: int = 0) -> dict:
+    """Write a synthetic video to `path` and return its spec plus the true cut times."""
+    base, _ = os.path.splitext(path)
+    silent_path = base + "_silent.mp4"
+    cuts = write_frames(silent_path, width, height, duration, fps, cut_every, seed)
+    ffmpeg = find_executable("ffmpeg") if audio else None
+    has_audio = False
+    if ffmpeg:
+        tone_path = write_tone(base + "_tone.wav", duration, frequency=frequency)
+        cmd = [ffmpeg, "-y", "-v", "error", "-i", silent_path, "-i", tone_path,
+               "-map", "0:v:0", "-map", "1:a:0", "-c:v", "copy", "-c:a", "aac", "-shortest", path]
+        has_audio = subprocess.run(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL).returncode == 0
+        os.remove(tone_path)
+    if has_audio:
+        os.remove(silent_path)
+    else:
+        if audio:
+            print("ffmpeg unavailable; synthetic video has no audio track", file=sys.stderr)
+        os.replace(silent_path, path)
+    return {"path": path, "width": width, "height": height, "duration": duration, "fps": fps,
+            "cut_every": cut_every, "cuts": cuts, "has_audio": has_audio, "seed": seed}
+
+def make_transcript(duration: float, words_per_second: float = 2.5, seed: int = 0) -> str:
+    """Deterministic pseudo-speech of roughly the length a real transcript would have."""
+    rng = np.random.default_rng(seed)
+    n = max(12, int(duration * words_per_second))
+    words = [WORDS[i] for i in rng.integers(0, len(WORDS), size=n)]
+    sentences = []
+    for i in range(0, n, 12):
+        chunk = words[i:i + 12]
+        sentences.append(" ".join([chunk[0].capitalize()] + chunk[1:]) + ".")
+    return " ".join(sentences)
+
+def make_tier(tier: str, directory: str, seed: int = 0) -> dict:
+    spec = TIERS[tier]
+    return make_video(os.path.join(directory, f"{tier}.mp4"), spec["width"], spec["height"], spec["duration"],
+                      cut_every=spec["cut_every"], seed=seed)
@@ -0,0 +1,5 @@
+"""Asyncio HTTP API for submitting videos to the job queue and fetching results."""
+from project.api.server import ApiServer
+from project.api.client import ApiClient
+
+__all__ = ["ApiServer", "ApiClient"]
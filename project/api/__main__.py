@@ -0,0 +1,33 @@
+"""Serve the analysis API.
+
+    python -m project.api --port 8000 --data-dir api_data --workers 2
+"""
+import asyncio
+import argparse
+from project.jobs.queue import DEFAULT_DB_PATH
+from project.jobs.worker import WorkerPool
+from project.api.server import ApiServer
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Async HTTP API for the video analysis pipeline.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--data-dir", default="api_data", help="Where uploads and job outputs are stored")
+    parser.add_argument("--db", default=DEFAULT_DB_PATH, help="SQLite job queue database")
+    parser.add_argument("--workers", type=int, default=2, help="Worker processes; 0 to rely on an external pool")
+    parser.add_argument("--max-uploads", type=int, default=4, help="Concurrent uploads before answering 429")
+    parser.add_argument("--max-queued", type=int, default=32, help="Queued jobs before answering 429")
+    args = parser.parse_args(argv)
+
+    pool = WorkerPool(args.db, workers=args.workers).start() if args.workers > 0 else None
+    server = ApiServer(args.data_dir, args.db, max_uploads=args.max_uploads, max_queued=args.max_queued)
+    try:
+        asyncio.run(server.serve_forever(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if pool is not None:
+            pool.stop()
+
+if __name__ == "__main__":
+    main()
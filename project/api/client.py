@@ -0,0 +1,116 @@
+import os
+import json
+import time
+import uuid
+import http.client
+from urllib.parse import urlsplit, urlencode
+
+CHUNK_SIZE = 256 * 1024
+
+class ApiError(Exception):
+    def __init__(self, status: int, message: str):
+        super().__init__(f"{status}: {message}")
+        self.status = status
+
+class ApiClient:
+    """Small stdlib client for the analysis API; uploads stream from disk."""
+
+    def __init__(self, base_url: str = "http://127.0.0.1:8000", timeout: float = 60.0):
+        parts = urlsplit(base_url)
+        self.host = parts.hostname or "127.0.0.1"
+        self.port = parts.port or 80
+        self.timeout = timeout
+
+    def _connection(self):
+        return http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+
+    def _request(self, method: str, path: str, headers: dict = None):
+        conn = self._connection()
+        try:
+            conn.request(method, path, headers=headers or {})
+            resp = conn.getresponse()
+            body = resp.read()
+        finally:
+            conn.close()
+        if resp.status >= 400:
+            try:
+                message = json.loads(body).get("error", "")
+            except ValueError:
+                message = body.decode(errors="replace")
+            raise ApiError(resp.status, message)
+        return resp, body
+
+    def _json(self, method: str, path: str):
+        return json.loads(self._request(method, path)[1])
+
+    def submit(self, video_path: str, pipeline: str = "pro", priority: int = 0, **fields) -> dict:
+        boundary = uuid.uuid4().hex
+        form = dict(fields, pipeline=pipeline, priority=priority)
+        head = b"".join(
+            f'--{boundary}\r\nContent-Disposition: form-data; name="{k}"\r\n\r\n{v}\r\n'.encode("utf-8")
+            for k, v in form.items())
+        head += (f'--{boundary}\r\nContent-Disposition: form-data; name="video"; '
+                 f'filename="{os.path.basename(video_path)}"\r\n'
+                 f'Content-Type: application/octet-stream\r\n\r\n').encode("utf-8")
+        tail = f"\r\n--{boundary}--\r\n".encode("utf-8")
+        length = len(head) + os.path.getsize(video_path) + len(tail)
+
+        conn = self._connection()
+        try:
+            conn.putrequest("POST", "/jobs")
+            conn.putheader("Content-Type", f"multipart/form-data; boundary={boundary}")
+            conn.putheader("Content-Length", str(length))
+            conn.endheaders()
+            conn.send(head)
+            with open(video_path, "rb") as f:
+                while True:
+                    chunk = f.read(CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    conn.send(chunk)
+            conn.send(tail)
+            resp = conn.getresponse()
+            body = resp.read()
+        finally:
+            conn.close()
+        if resp.status >= 400:
+            raise ApiError(resp.status, json.loads(body or b"{}").get("error", ""))
+        return json.loads(body)
+
+    def health(self) -> dict:
+        return self._json("GET", "/health")
+
+    def status(self, job_id: str) -> dict:
+        return self._json("GET", f"/jobs/{job_id}")
+
+    def jobs(self, state: str = None, limit: int = 50, offset: int = 0) -> dict:
+        query = {k: v for k, v in {"state": state, "limit": limit, "offset": offset}.items() if v is not None}
+        return self._json("GET", f"/jobs?{urlencode(query)}")
+
+    def cancel(self, job_id: str) -> dict:
+        return self._json("DELETE", f"/jobs/{job_id}")
+
+    def wait(self, job_id: str, poll: float = 1.0, timeout: float = None) -> dict:
+        deadline = time.monotonic() + timeout if timeout else None
+        while True:
+            job = self.status(job_id)
+            if job["state"] in ("done", "failed"):
+                return job
+            if deadline and time.monotonic() > deadline:
+                raise TimeoutError(f"job {job_id} still {job['state']}")
+            time.sleep(poll)
+
+    def analysis(self, job_id: str) -> dict:
+        return self._json("GET", f"/jobs/{job_id}/analysis")
+
+    def keyframes(self, job_id: str) -> list:
+        return self._json("GET", f"/jobs/{job_id}/keyframes")["keyframes"]
+
+    def download(self, path: str, dest: str = None, byte_range: tuple = None) -> bytes:
+        """GET a file endpoint, optionally a (start, end) inclusive byte range."""
+        headers = {"Range": f"bytes={byte_range[0]}-{'' if byte_range[1] is None else byte_range[1]}"} if byte_range else {}
+        _, body = self._request("GET", path, headers)
+        if dest:
+            with open(dest, "wb") as f:
+                f.write(body)
+        return body
@@ -0,0 +1,117 @@
+import re
+import inspect
+
+CHUNK_SIZE = 256 * 1024
+MAX_FIELD_BYTES = 64 * 1024
+MAX_HEADER_BYTES = 16 * 1024
+
+class MultipartError(ValueError):
+    pass
+
+def parse_boundary(content_type: str) -> bytes:
+    match = re.search(r'boundary="?([^";]+)"?', content_type or "")
+    if not content_type.lower().startswith("multipart/form-data") or not match:
+        raise MultipartError("expected multipart/form-data with a boundary")
+    return match.group(1).encode("latin-1")
+
+def parse_part_headers(raw: bytes) -> dict:
+    headers = {}
+    for line in raw.decode("utf-8", errors="replace").split("\r\n"):
+        key, _, value = line.partition(":")
+        if key:
+            headers[key.strip().lower()] = value.strip()
+    disposition = headers.get("content-disposition", "")
+    params = dict(re.findall(r'(\w+)="([^"]*)"', disposition))
+    return {"name": params.get("name"), "filename": params.get("filename"),
+            "content_type": headers.get("content-type", "text/plain")}
+
+async def _maybe_await(result):
+    if inspect.isawaitable(result):
+        await result
+
+async def read_multipart(reader, boundary: bytes, content_length: int, open_part):
+    """Stream a multipart/form-data body part by part without buffering whole parts.
+
+    `open_part(info)` is called with each part's name/filename/content_type and
+    returns a sink with `write(bytes)` and `close()`, either of which may be a
+    coroutine (file sinks do their disk I/O off the event loop). Data is handed
+    over in chunks as it arrives; only a delimiter-sized tail is held back between reads.
+    """
+    delimiter = b"\r\n--" + boundary
+    remaining = content_length
+    # A leading CRLF lets the first delimiter match the same pattern as the rest
+    buf = b"\r\n"
+    sink = None
+    in_headers = False
+    finished = False
+
+    async def fill():
+        nonlocal buf, remaining
+        if remaining <= 0:
+            raise MultipartError("body ended before the closing boundary")
+        data = await reader.read(min(CHUNK_SIZE, remaining))
+        if not data:
+            raise MultipartError("connection closed mid-upload")
+        remaining -= len(data)
+        buf += data
+
+    try:
+        while not finished:
+            if in_headers:
+                end = buf.find(b"\r\n\r\n")
+                if end < 0:
+                    if len(buf) > MAX_HEADER_BYTES:
+                        raise MultipartError("part headers too large")
+                    await fill()
+                    continue
+                sink = open_part(parse_part_headers(buf[:end]))
+                buf = buf[end + 4:]
+                in_headers = False
+                continue
+            idx = buf.find(delimiter)
+            if idx < 0:
+                keep = len(delimiter) + 1
+                if len(buf) > keep:
+                    if sink is not None:
+                        await _maybe_await(sink.write(buf[:-keep]))
+                    buf = buf[-keep:]
+                await fill()
+                continue
+            if sink is not None:
+                await _maybe_await(sink.write(buf[:idx]))
+                await _maybe_await(sink.close())
+                sink = None
+            buf = buf[idx + len(delimiter):]
+            while len(buf) < 2:
+                await fill()
+            if buf[:2] == b"--":
+                finished = True
+            elif buf[:2] == b"\r\n":
+                buf = buf[2:]
+                in_headers = True
+            else:
+                raise MultipartError("malformed boundary line")
+        # Drain the epilogue so the connection can be reused
+        while remaining > 0:
+            data = await reader.read(min(CHUNK_SIZE, remaining))
+            if not data:
+                break
+            remaining -= len(data)
+    finally:
+        if sink is not None:
+            # Part cut off by an error: let file sinks discard what they wrote
+            getattr(sink, "abort", sink.close)()
+
+class FieldSink:
+    def __init__(self, fields: dict, name: str):
+        self.fields = fields
+        self.name = name
+        self.data = bytearray()
+
+    def write(self, data: bytes):
+        self.data.extend(data)
+        if len(self.data) > MAX_FIELD_BYTES:
+            raise MultipartError(f"form field '{self.name}' is too large")
+
+    def close(self):
+        self.fields[self.name] = self.data.decode("utf-8", errors="replace")
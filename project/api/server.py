@@ -0,0 +1,450 @@
+import os
+import re
+import json
+import asyncio
+import mimetypes
+from email.utils import formatdate
+from http import HTTPStatus
+from urllib.parse import urlsplit, parse_qs, unquote
+from project.modules.utils import setup_logger, generate_id
+from project.modules.ingest import Ingestor
+from project.modules.thumbnails import ensure_thumbnail
+from project.jobs.queue import JobQueue, DEFAULT_DB_PATH
+from project.api.multipart import MultipartError, FieldSink, parse_boundary, read_multipart, CHUNK_SIZE
+
+logger = setup_logger(__name__)
+
+VIDEO_EXTENSIONS = {".mp4", ".avi", ".mov", ".mkv", ".webm", ".m4v", ".mpg", ".mpeg", ".ts"}
+MAX_REQUEST_HEADERS = 100
+SAFE_NAME = re.compile(r"[^A-Za-z0-9._-]+")
+
+class HttpError(Exception):
+    def __init__(self, status: int, message: str = "", headers: dict = None):
+        super().__init__(message or HTTPStatus(status).phrase)
+        self.status = status
+        self.headers = headers or {}
+
+class Request:
+    def __init__(self, method: str, target: str, headers: dict, reader):
+        parts = urlsplit(target)
+        self.method = method
+        self.path = unquote(parts.path)
+        self.query = {k: v[-1] for k, v in parse_qs(parts.query).items()}
+        self.headers = headers
+        self.reader = reader
+        self.content_length = int(headers.get("content-length") or 0)
+        self.body_consumed = self.content_length == 0
+        self.keep_alive = headers.get("connection", "").lower() != "close"
+
+class UploadSink:
+    """Multipart sink over an IngestWriter: chunks go straight to disk and into the hash.
+
+    Writing and hashing run in a worker thread so a large upload does not stall
+    the event loop (and with it every other connection).
+    """
+
+    def __init__(self, writer):
+        self.writer = writer
+        self.result = None
+
+    async def write(self, data: bytes):
+        await asyncio.to_thread(self.writer.write, data)
+
+    async def close(self):
+        self.result = await asyncio.to_thread(self.writer.close)
+
+    def abort(self):
+        self.writer.abort()
+
+def parse_range(header: str, size: int):
+    """Resolve a single `bytes=` range to inclusive offsets; None means the whole file."""
+    if not header:
+        return None
+    match = re.fullmatch(r"\s*bytes=(\d*)-(\d*)\s*", header)
+    if not match or not (match.group(1) or match.group(2)):
+        # Multi-range and other units are allowed to fall back to a full response
+        return None
+    start, end = match.group(1), match.group(2)
+    if start:
+        start = int(start)
+        end = min(int(end), size - 1) if end else size - 1
+    else:
+        length = int(end)
+        if length == 0:
+            raise HttpError(416, headers={"Content-Range": f"bytes */{size}"})
+        start, end = max(0, size - length), size - 1
+    if start >= size or start > end:
+        raise HttpError(416, headers={"Content-Range": f"bytes */{size}"})
+    return start, end
+
+class ApiServer:
+    def __init__(self, data_dir: str, db_path: str = DEFAULT_DB_PATH, max_uploads: int = 4,
+                 max_queued: int = 32, max_connections: int = 256, max_upload_bytes: int = 4 * 1024 ** 3):
+        self.data_dir = os.path.abspath(data_dir)
+        # Uploads and outputs are keyed by content hash, so a re-upload reuses its analysis
+        self.ingestor = Ingestor(os.path.join(self.data_dir, "uploads"))
+        self.queue = JobQueue(db_path)
+        self.max_uploads = max_uploads
+        self.max_queued = max_queued
+        self.max_connections = max_connections
+        self.max_upload_bytes = max_upload_bytes
+        self._uploads = 0
+        self._connections = 0
+        self._server = None
+        self._scene_search = None
+        self.routes = [
+            ("GET", re.compile(r"/health"), self.health),
+            ("GET", re.compile(r"/search"), self.search_scenes),
+            ("GET", re.compile(r"/jobs"), self.list_jobs),
+            ("POST", re.compile(r"/jobs"), self.create_job),
+            ("GET", re.compile(r"/jobs/(?P<job_id>\w+)"), self.job_status),
+            ("DELETE", re.compile(r"/jobs/(?P<job_id>\w+)"), self.cancel_job),
+            ("GET", re.compile(r"/jobs/(?P<job_id>\w+)/analysis"), self.job_analysis),
+            ("GET", re.compile(r"/jobs/(?P<job_id>\w+)/keyframes"), self.list_keyframes),
+            ("GET", re.compile(r"/jobs/(?P<job_id>\w+)/keyframes/(?P<name>[\w.-]+)"), self.keyframe),
+            ("GET", re.compile(r"/jobs/(?P<job_id>\w+)/thumbnails/(?P<name>[\w.-]+)"), self.thumbnail),
+            ("GET", re.compile(r"/jobs/(?P<job_id>\w+)/summary"), self.summary_video),
+        ]
+
+    # -- HTTP plumbing -----------------------------------------------------
+
+    async def start(self, host: str = "127.0.0.1", port: int = 8000):
+        self._server = await asyncio.start_server(self._handle_connection, host, port, limit=64 * 1024)
+        sockets = self._server.sockets or []
+        if sockets:
+            host, port = sockets[0].getsockname()[:2]
+        logger.info("API listening on http://%s:%d", host, port)
+        return host, port
+
+    async def serve_forever(self, host: str = "127.0.0.1", port: int = 8000):
+        await self.start(host, port)
+        async with self._server:
+            await self._server.serve_forever()
+
+    async def close(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+
+    async def _read_request(self, reader):
+        line = await reader.readline()
+        if not line:
+            return None
+        try:
+            method, target, _ = line.decode("latin-1").rstrip("\r\n").split(" ", 2)
+        except ValueError:
+            raise HttpError(400, "malformed request line")
+        headers = {}
+        while True:
+            raw = await reader.readline()
+            if raw in (b"\r\n", b"\n", b""):
+                break
+            if len(headers) >= MAX_REQUEST_HEADERS:
+                raise HttpError(431)
+            key, _, value = raw.decode("latin-1").partition(":")
+            headers[key.strip().lower()] = value.strip()
+        if "chunked" in headers.get("transfer-encoding", "").lower():
+            raise HttpError(411, "chunked bodies are not supported; send Content-Length")
+        return Request(method.upper(), target, headers, reader)
+
+    async def _send(self, writer, status: int, body=b"", content_type: str = "application/json",
+                    headers: dict = None, keep_alive: bool = True):
+        if isinstance(body, (dict, list)):
+            body = json.dumps(body, indent=2, default=str).encode("utf-8")
+        lines = [f"HTTP/1.1 {status} {HTTPStatus(status).phrase}",
+                 f"Date: {formatdate(usegmt=True)}",
+                 f"Content-Type: {content_type}",
+                 f"Content-Length: {len(body)}",
+                 f"Connection: {'keep-alive' if keep_alive else 'close'}"]
+        lines += [f"{k}: {v}" for k, v in (headers or {}).items()]
+        writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1") + body)
+        await writer.drain()
+
+    async def _handle_connection(self, reader, writer):
+        self._connections += 1
+        try:
+            if self._connections > self.max_connections:
+                await self._send(writer, 429, {"error": "server busy"}, headers={"Retry-After": "5"}, keep_alive=False)
+                return
+            while True:
+                request = None
+                try:
+                    request = await self._read_request(reader)
+                    if request is None:
+                        break
+                    keep_alive = await self._dispatch(request, writer)
+                except HttpError as e:
+                    keep_alive = request is not None and request.body_consumed and request.keep_alive
+                    await self._send(writer, e.status, {"error": str(e)}, headers=e.headers, keep_alive=keep_alive)
+                except MultipartError as e:
+                    keep_alive = False
+                    await self._send(writer, 400, {"error": str(e)}, keep_alive=False)
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        except Exception:
+            logger.exception("Unhandled error while serving a request")
+        finally:
+            self._connections -= 1
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except Exception:
+                pass
+
+    async def _dispatch(self, request: Request, writer) -> bool:
+        allowed = []
+        for method, pattern, handler in self.routes:
+            match = pattern.fullmatch(request.path.rstrip("/") or "/")
+            if not match:
+                continue
+            if method != request.method:
+                allowed.append(method)
+                continue
+            return await handler(request, writer, **match.groupdict())
+        if allowed:
+            raise HttpError(405, headers={"Allow": ", ".join(allowed)})
+        raise HttpError(404)
+
+    async def _send_file(self, request: Request, writer, path: str, content_type: str = None) -> bool:
+        # Checked before any header goes out; a directory would only fail on open()
+        if not os.path.isfile(path):
+            raise HttpError(404)
+        try:
+            size = os.path.getsize(path)
+        except OSError:
+            raise HttpError(404)
+        content_type = content_type or mimetypes.guess_type(path)[0] or "application/octet-stream"
+        byte_range = parse_range(request.headers.get("range"), size)
+        start, end = byte_range or (0, size - 1)
+        length = end - start + 1 if size else 0
+        status = 206 if byte_range else 200
+        lines = [f"HTTP/1.1 {status} {HTTPStatus(status).phrase}",
+                 f"Date: {formatdate(usegmt=True)}",
+                 f"Content-Type: {content_type}",
+                 f"Content-Length: {length}",
+                 "Accept-Ranges: bytes",
+                 f"Connection: {'keep-alive' if request.keep_alive else 'close'}"]
+        if byte_range:
+            lines.append(f"Content-Range: bytes {start}-{end}/{size}")
+        writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1"))
+        # Disk reads go through a worker thread so one download does not block other connections
+        f = await asyncio.to_thread(open, path, "rb")
+        try:
+            f.seek(start)
+            left = length
+            while left > 0:
+                chunk = await asyncio.to_thread(f.read, min(CHUNK_SIZE, left))
+                if not chunk:
+                    break
+                writer.write(chunk)
+                left -= len(chunk)
+                await writer.drain()
+        finally:
+            f.close()
+        await writer.drain()
+        return request.keep_alive
+
+    async def _job(self, job_id: str) -> dict:
+        job = await asyncio.to_thread(self.queue.get, job_id)
+        if job is None:
+            raise HttpError(404, f"unknown job {job_id}")
+        return job
+
+    def _job_options(self, fields: dict):
+        pipeline = fields.get("pipeline", "pro")
+        if pipeline not in ("pro", "advanced", "live"):
+            raise HttpError(400, "pipeline must be 'pro', 'advanced' or 'live'")
+        try:
+            options = {"language": fields.get("language", "auto"),
+                       "scene_threshold": float(fields.get("scene_threshold", 27.0)),
+                       "use_gpu": fields.get("use_gpu", "").lower() in ("1", "true", "yes"),
+                       "summary_video": fields.get("summary_video", "").lower() in ("1", "true", "yes"),
+                       "dense_fps": float(fields.get("dense_fps", 0.0)),
+                       "sampling": fields.get("sampling", "fixed"),
+                       "sample_budget": int(fields.get("sample_budget", 240)),
+                       "captions": fields.get("captions", "blip")}
+            if fields.get("caption_budget"):
+                options["caption_budget"] = float(fields["caption_budget"])
+            if options["captions"] not in ("blip", "tags"):
+                raise HttpError(400, "captions must be 'blip' or 'tags'")
+            if options["sampling"] not in ("fixed", "adaptive"):
+                raise HttpError(400, "sampling must be 'fixed' or 'adaptive'")
+            priority = int(fields.get("priority", 0))
+        except ValueError as e:
+            raise HttpError(400, f"invalid form field: {e}")
+        return pipeline, options, priority
+
+    def _job_view(self, job: dict) -> dict:
+        view = {k: job[k] for k in ("id", "state", "progress", "message", "error", "pipeline", "priority",
+                                    "created_at", "started_at", "finished_at")}
+        view["links"] = {"self": f"/jobs/{job['id']}", "analysis": f"/jobs/{job['id']}/analysis",
+                         "keyframes": f"/jobs/{job['id']}/keyframes", "summary": f"/jobs/{job['id']}/summary"}
+        return view
+
+    # -- Handlers ----------------------------------------------------------
+
+    async def health(self, request, writer) -> bool:
+        counts = await asyncio.to_thread(self.queue.counts)
+        await self._send(writer, 200, {"status": "ok", "jobs": counts, "uploads_in_progress": self._uploads})
+        return request.keep_alive
+
+    async def search_scenes(self, request, writer) -> bool:
+        query = request.query.get("q", "").strip()
+        if not query:
+            raise HttpError(400, "missing q")
+        try:
+            k = min(100, int(request.query.get("k", 10)))
+            nprobe = int(request.query["nprobe"]) if "nprobe" in request.query else None
+        except ValueError as e:
+            raise HttpError(400, f"invalid query parameter: {e}")
+        if self._scene_search is None:
+            from project.search.scenes import SceneSearch
+            self._scene_search = SceneSearch()
+        # CLIP's text tower loads on first use and encoding blocks, so keep it off the loop
+        hits = await asyncio.to_thread(self._scene_search.search, query, k, nprobe)
+        await self._send(writer, 200, {"query": query, "hits": hits})
+        return request.keep_alive
+
+    async def list_jobs(self, request, writer) -> bool:
+        try:
+            limit = min(200, int(request.query.get("limit", 50)))
+            offset = int(request.query.get("offset", 0))
+        except ValueError as e:
+            raise HttpError(400, f"invalid query parameter: {e}")
+        jobs = await asyncio.to_thread(self.queue.list, request.query.get("state"), limit, offset)
+        await self._send(writer, 200, {"jobs": [self._job_view(j) for j in jobs], "limit": limit, "offset": offset})
+        return request.keep_alive
+
+    async def create_job(self, request, writer) -> bool:
+        # Admission control happens before any of the body is read. The slot is
+        # taken before the first await, so concurrent requests cannot all pass
+        # the check, and it is held until the job is submitted.
+        if self._uploads >= self.max_uploads:
+            raise HttpError(429, "too many uploads in progress", {"Retry-After": "5"})
+        self._uploads += 1
+        try:
+            return await self._create_job(request, writer)
+        finally:
+            self._uploads -= 1
+
+    async def _create_job(self, request, writer) -> bool:
+        counts = await asyncio.to_thread(self.queue.counts)
+        # Every upload in progress (this one included) will add a job
+        if counts["queued"] + self._uploads > self.max_queued:
+            raise HttpError(429, "job queue is full", {"Retry-After": "30"})
+        if request.content_length <= 0:
+            raise HttpError(411, "Content-Length required")
+        if request.content_length > self.max_upload_bytes:
+            raise HttpError(413, "upload too large")
+        boundary = parse_boundary(request.headers.get("content-type", ""))
+
+        fields, files, live = {}, [], {}
+
+        def start_live(partial_path, size):
+            # Streamable container and enough bytes on disk: a live job tails the
+            # partial file while the rest of the upload is still arriving. Called
+            # from the upload's writer thread, so the queue can be used directly.
+            pipeline, options, priority = self._job_options(fields)
+            output_dir = os.path.join(self.ingestor.root, "live", generate_id())
+            live["job"] = self.queue.submit(partial_path, output_dir, pipeline,
+                                            dict(options, discard_source=True, name=live["name"]), priority)
+
+        def open_part(info):
+            if info["filename"] is None:
+                return FieldSink(fields, info["name"] or "")
+            name = SAFE_NAME.sub("_", os.path.basename(info["filename"])) or "upload"
+            if os.path.splitext(name)[1].lower() not in VIDEO_EXTENSIONS or files:
+                raise MultipartError("expected exactly one video file part")
+            # Form fields precede the file part, so the pipeline is known here
+            tail = fields.get("pipeline") == "live"
+            live["name"] = name
+            sink = UploadSink(self.ingestor.writer(name, on_prefix=start_live if tail else None))
+            files.append(sink)
+            return sink
+
+        try:
+            await read_multipart(request.reader, boundary, request.content_length, open_part)
+            request.body_consumed = True
+            if not files or files[0].result is None:
+                raise HttpError(400, "no video file in upload")
+        except BaseException:
+            if "job" in live:
+                # The tail-mode job was queued from the prefix, but the partial file is
+                # gone with the failed upload; a worker would only fail on it later
+                await asyncio.to_thread(self.queue.cancel, live["job"])
+                logger.info("Cancelled live job %s after its upload failed", live["job"])
+            raise
+
+        upload = files[0].result
+        if "job" in live:
+            job_id = live["job"]
+        else:
+            pipeline, options, priority = self._job_options(fields)
+            output_dir = self.ingestor.output_dir(upload["sha256"], pipeline, options)
+            options.update(sha256=upload["sha256"], reuse=True, name=upload["name"])
+            if pipeline == "live":
+                # The file is already complete, so there is nothing to wait for
+                options["idle_timeout"] = 0.0
+            job_id = await asyncio.to_thread(self.queue.submit, upload["path"], output_dir, pipeline, options, priority)
+        await self._send(writer, 202, {"id": job_id, "state": "queued", "bytes": upload["size"],
+                                       "sha256": upload["sha256"], "links": {"self": f"/jobs/{job_id}"}},
+                         headers={"Location": f"/jobs/{job_id}"}, keep_alive=request.keep_alive)
+        return request.keep_alive
+
+    async def job_status(self, request, writer, job_id: str) -> bool:
+        job = await self._job(job_id)
+        view = self._job_view(job)
+        if job["state"] == "queued":
+            view["position"] = await asyncio.to_thread(self.queue.position, job_id)
+        await self._send(writer, 200, view)
+        return request.keep_alive
+
+    async def cancel_job(self, request, writer, job_id: str) -> bool:
+        await self._job(job_id)
+        if not await asyncio.to_thread(self.queue.cancel, job_id):
+            raise HttpError(409, "only queued jobs can be cancelled")
+        await self._send(writer, 200, {"id": job_id, "state": "failed", "error": "cancelled"})
+        return request.keep_alive
+
+    async def job_analysis(self, request, writer, job_id: str) -> bool:
+        job = await self._job(job_id)
+        # Live jobs rewrite analysis.json as they go, so partial results can be polled
+        if job["state"] != "done" and not (job["pipeline"] == "live" and job["state"] == "running"):
+            raise HttpError(409, f"job is {job['state']}")
+        return await self._send_file(request, writer, os.path.join(job["output_dir"], "analysis.json"),
+                                     "application/json")
+
+    async def list_keyframes(self, request, writer, job_id: str) -> bool:
+        job = await self._job(job_id)
+        storyboard = os.path.join(job["output_dir"], "storyboard")
+        names = sorted(n for n in os.listdir(storyboard) if n.endswith(".jpg")) if os.path.isdir(storyboard) else []
+        await self._send(writer, 200, {"keyframes": [{"name": n, "url": f"/jobs/{job_id}/keyframes/{n}",
+                                                      "thumbnail": f"/jobs/{job_id}/thumbnails/{n}"} for n in names]})
+        return request.keep_alive
+
+    @staticmethod
+    def _storyboard_file(job: dict, name: str) -> str:
+        name = os.path.basename(name)
+        path = os.path.join(job["output_dir"], "storyboard", name)
+        if name in ("", ".", "..") or not os.path.isfile(path):
+            raise HttpError(404)
+        return path
+
+    async def keyframe(self, request, writer, job_id: str, name: str) -> bool:
+        job = await self._job(job_id)
+        return await self._send_file(request, writer, self._storyboard_file(job, name))
+
+    async def thumbnail(self, request, writer, job_id: str, name: str) -> bool:
+        job = await self._job(job_id)
+        frame_path = self._storyboard_file(job, name)
+        # Made at extraction time; older outputs get theirs on first request
+        path = await asyncio.to_thread(ensure_thumbnail, frame_path)
+        if path is None:
+            raise HttpError(404)
+        return await self._send_file(request, writer, path)
+
+    async def summary_video(self, request, writer, job_id: str) -> bool:
+        job = await self._job(job_id)
+        return await self._send_file(request, writer, os.path.join(job["output_dir"], "summary.mp4"), "video/mp4")
@@ -0,0 +1,4 @@
+"""Persistent SQLite/FTS5 catalog of finished analyses for search, filters and favorites."""
+from project.catalog.store import Catalog, DEFAULT_CATALOG_PATH, FILTERS
+
+__all__ = ["Catalog", "DEFAULT_CATALOG_PATH", "FILTERS"]
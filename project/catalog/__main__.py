@@ -0,0 +1,49 @@
+"""Index and search past analyses.
+
+    python -m project.catalog index outputs/ api_data/
+    python -m project.catalog search "street market" --filter moderated --page 2
+    python -m project.catalog prune
+"""
+import sys
+import json
+import argparse
+from project.catalog.store import Catalog, DEFAULT_CATALOG_PATH, FILTERS
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Searchable catalog of processed videos.")
+    parser.add_argument("--db", default=DEFAULT_CATALOG_PATH, help="SQLite catalog database")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    index = sub.add_parser("index", help="Add every analysis.json found under the given folders")
+    index.add_argument("roots", nargs="+")
+
+    search = sub.add_parser("search", help="Full-text search with optional filter")
+    search.add_argument("query", nargs="?", default="")
+    search.add_argument("--filter", choices=FILTERS, default="all")
+    search.add_argument("--page", type=int, default=1)
+    search.add_argument("--per-page", type=int, default=20)
+
+    sub.add_parser("prune", help="Drop entries whose output folder no longer exists")
+    sub.add_parser("stats", help="Counts per filter")
+    args = parser.parse_args(argv)
+
+    catalog = Catalog(args.db)
+    if args.command == "index":
+        added = sum(catalog.index_tree(root) for root in args.roots)
+        print(f"indexed {added} analyses")
+    elif args.command == "search":
+        page = catalog.search(args.query, args.filter, args.per_page, (max(1, args.page) - 1) * args.per_page)
+        for item in page["items"]:
+            print(f"{item['name'][:40]:40} {item['duration']:7.1f}s {item['scenes']:4d} scenes "
+                  f"{item['flag_count']:3d} flags  {item['output_dir']}")
+            if item["snippet"]:
+                print(f"    {item['snippet']}")
+        print(f"{page['total']} match(es)")
+    elif args.command == "prune":
+        print(f"removed {catalog.prune()} entries")
+    else:
+        print(json.dumps(catalog.counts(), indent=2))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
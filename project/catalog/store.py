@@ -0,0 +1,250 @@
+import os
+import re
+import json
+import time
+import sqlite3
+import tempfile
+from contextlib import contextmanager
+from project.modules.utils import setup_logger
+
+logger = setup_logger(__name__)
+
+DEFAULT_CATALOG_PATH = os.environ.get("VISUAL_INSIGHT_CATALOG",
+                                      os.path.join(tempfile.gettempdir(), "visual_insight", "catalog.db"))
+FILTERS = ("all", "analyzed", "moderated", "flagged", "favorites")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS videos (
+    id INTEGER PRIMARY KEY,
+    output_dir TEXT NOT NULL UNIQUE,
+    video_path TEXT,
+    name TEXT NOT NULL,
+    sha256 TEXT,
+    pipeline TEXT,
+    success INTEGER NOT NULL DEFAULT 0,
+    duration REAL NOT NULL DEFAULT 0,
+    scenes INTEGER NOT NULL DEFAULT 0,
+    language TEXT,
+    summary TEXT NOT NULL DEFAULT '',
+    moderated INTEGER NOT NULL DEFAULT 0,
+    flag_count INTEGER NOT NULL DEFAULT 0,
+    rating TEXT,
+    favorite INTEGER NOT NULL DEFAULT 0,
+    processing_time REAL,
+    processed_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS videos_recent ON videos (processed_at DESC);
+CREATE INDEX IF NOT EXISTS videos_moderated ON videos (moderated, processed_at DESC);
+CREATE INDEX IF NOT EXISTS videos_flagged ON videos (flag_count, processed_at DESC);
+CREATE INDEX IF NOT EXISTS videos_favorite ON videos (favorite, processed_at DESC);
+CREATE INDEX IF NOT EXISTS videos_sha ON videos (sha256);
+CREATE VIRTUAL TABLE IF NOT EXISTS videos_fts USING fts5(
+    name, transcript, summary, topics, captions, flags,
+    tokenize = 'unicode61 remove_diacritics 2'
+);
+"""
+
+FILTER_SQL = {
+    "all": "1",
+    "analyzed": "v.success = 1",
+    "moderated": "v.moderated = 1",
+    "flagged": "v.flag_count > 0",
+    "favorites": "v.favorite = 1",
+}
+
+def _text(value) -> str:
+    if isinstance(value, dict):
+        return str(value.get("summary") or value.get("text") or "")
+    return str(value or "")
+
+def document_from_results(results: dict) -> dict:
+    """Flatten pro, advanced and live results into the fields the catalog indexes."""
+    video_info = results.get("video_info") or {}
+    transcription = results.get("transcription") or {}
+    summary = results.get("summary")
+    topics = summary.get("topics", []) if isinstance(summary, dict) else []
+    transcript = transcription.get("text", "") if transcription.get("status") == "success" else ""
+    transcript = transcript or _text(results.get("transcript"))
+
+    flags, flag_count, moderated, rating = [], 0, False, None
+    safety = results.get("content_moderation") or {}
+    if safety:
+        moderated = True
+        rating = safety.get("rating")
+        flag_count += int(safety.get("total_flags") or 0)
+        for issue in safety.get("issues", []):
+            flags.append(str(issue.get("type", "")))
+            flags.extend(str(e) for e in issue.get("examples", []))
+    report = results.get("moderation") or {}
+    if report:
+        moderated = True
+        for flag in report.get("image_flags", []):
+            flags.append(str(flag.get("reason", "")))
+        for flag in report.get("text_flags", []):
+            flags.extend(flag.get("words", []))
+        for flag in report.get("track_flags", []):
+            flags.append(str(flag.get("class_name", "")))
+        flag_count += len(report.get("image_flags", [])) + len(report.get("text_flags", [])) \
+            + len(report.get("track_flags", []))
+
+    captions = [c.get("caption", "") for c in results.get("captions", []) if isinstance(c, dict)]
+    return {
+        "success": bool(results.get("success")),
+        "duration": float(video_info.get("duration") or results.get("duration") or 0),
+        "scenes": len(results.get("scenes") or []),
+        "language": transcription.get("detected_language") or transcription.get("language") or results.get("language"),
+        "summary": _text(summary),
+        "transcript": transcript,
+        "topics": " ".join(str(t) for t in topics),
+        "captions": " ".join(captions),
+        "flags": " ".join(flags),
+        "moderated": moderated,
+        "flag_count": flag_count,
+        "rating": rating,
+        "processing_time": results.get("processing_time"),
+    }
+
+def fts_query(text: str) -> str:
+    """Turn free text from a search box into a safe FTS5 query: every word, prefix-matched."""
+    words = re.findall(r"\w+", text or "", flags=re.UNICODE)
+    return " ".join(f'"{w}"*' for w in words)
+
+class Catalog:
+    """Persistent, searchable index of every finished analysis (SQLite + FTS5)."""
+
+    def __init__(self, db_path: str = DEFAULT_CATALOG_PATH):
+        self.db_path = db_path
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(SCHEMA)
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    def add(self, results: dict, output_dir: str, video_path: str = None, name: str = None,
+            sha256: str = None, pipeline: str = None) -> int:
+        """Insert or refresh one analysis; the favorite flag survives re-indexing."""
+        output_dir = os.path.abspath(output_dir)
+        video_path = video_path or results.get("source_path")
+        name = name or os.path.basename(video_path or output_dir)
+        doc = document_from_results(results)
+        processed_at = os.path.getmtime(os.path.join(output_dir, "analysis.json")) \
+            if os.path.exists(os.path.join(output_dir, "analysis.json")) else time.time()
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                conn.execute(
+                    "INSERT INTO videos (output_dir, video_path, name, sha256, pipeline, success, duration, scenes, "
+                    "language, summary, moderated, flag_count, rating, processing_time, processed_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?) "
+                    "ON CONFLICT(output_dir) DO UPDATE SET video_path=excluded.video_path, name=excluded.name, "
+                    "sha256=COALESCE(excluded.sha256, sha256), pipeline=COALESCE(excluded.pipeline, pipeline), "
+                    "success=excluded.success, duration=excluded.duration, scenes=excluded.scenes, "
+                    "language=excluded.language, summary=excluded.summary, moderated=excluded.moderated, "
+                    "flag_count=excluded.flag_count, rating=excluded.rating, "
+                    "processing_time=excluded.processing_time, processed_at=excluded.processed_at",
+                    (output_dir, video_path, name, sha256, pipeline, int(doc["success"]), doc["duration"],
+                     doc["scenes"], doc["language"], doc["summary"], int(doc["moderated"]), doc["flag_count"],
+                     doc["rating"], doc["processing_time"], processed_at))
+                video_id = conn.execute("SELECT id FROM videos WHERE output_dir = ?", (output_dir,)).fetchone()[0]
+                conn.execute("DELETE FROM videos_fts WHERE rowid = ?", (video_id,))
+                conn.execute(
+                    "INSERT INTO videos_fts (rowid, name, transcript, summary, topics, captions, flags) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (video_id, name, doc["transcript"], doc["summary"], doc["topics"], doc["captions"], doc["flags"]))
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+        return video_id
+
+    def add_output_dir(self, output_dir: str, **kwargs) -> int:
+        with open(os.path.join(output_dir, "analysis.json"), encoding="utf-8") as f:
+            return self.add(json.load(f), output_dir, **kwargs)
+
+    def index_tree(self, root: str) -> int:
+        """Backfill every analysis.json under `root` (e.g. old CLI output folders)."""
+        added = 0
+        for folder, _, files in os.walk(root):
+            if "analysis.json" not in files:
+                continue
+            try:
+                self.add_output_dir(folder)
+                added += 1
+            except (OSError, ValueError) as e:
+                logger.warning("Skipping %s: %s", folder, e)
+        return added
+
+    def search(self, query: str = "", filter_by: str = "all", limit: int = 20, offset: int = 0) -> dict:
+        """One page of matches, best first for text queries and newest first otherwise."""
+        if filter_by not in FILTER_SQL:
+            raise ValueError(f"filter must be one of {FILTERS}")
+        match = fts_query(query)
+        where = FILTER_SQL[filter_by]
+        with self._connect() as conn:
+            if match:
+                base = f"FROM videos_fts JOIN videos v ON v.id = videos_fts.rowid WHERE videos_fts MATCH ? AND {where}"
+                total = conn.execute(f"SELECT COUNT(*) {base}", (match,)).fetchone()[0]
+                rows = conn.execute(
+                    f"SELECT v.*, snippet(videos_fts, -1, '**', '**', '…', 12) AS snippet {base} "
+                    "ORDER BY bm25(videos_fts, 5.0, 1.0, 2.0, 3.0, 1.0, 2.0), v.processed_at DESC LIMIT ? OFFSET ?",
+                    (match, limit, offset)).fetchall()
+            else:
+                total = conn.execute(f"SELECT COUNT(*) FROM videos v WHERE {where}").fetchone()[0]
+                rows = conn.execute(
+                    f"SELECT v.*, '' AS snippet FROM videos v WHERE {where} "
+                    "ORDER BY v.processed_at DESC LIMIT ? OFFSET ?", (limit, offset)).fetchall()
+        return {"items": [dict(r) for r in rows], "total": total, "limit": limit, "offset": offset}
+
+    def counts(self) -> dict:
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT COUNT(*) AS all_, SUM(success) AS analyzed, SUM(moderated) AS moderated, "
+                "SUM(flag_count > 0) AS flagged, SUM(favorite) AS favorites FROM videos").fetchone()
+        return {"all": row["all_"], "analyzed": row["analyzed"] or 0, "moderated": row["moderated"] or 0,
+                "flagged": row["flagged"] or 0, "favorites": row["favorites"] or 0}
+
+    def get(self, output_dir: str) -> dict:
+        with self._connect() as conn:
+            row = conn.execute("SELECT * FROM videos WHERE output_dir = ?",
+                               (os.path.abspath(output_dir),)).fetchone()
+        return dict(row) if row else None
+
+    def output_dirs(self) -> list:
+        with self._connect() as conn:
+            return [r[0] for r in conn.execute("SELECT output_dir FROM videos WHERE success = 1")]
+
+    def set_favorite(self, output_dir: str, favorite: bool = True) -> bool:
+        with self._connect() as conn:
+            cur = conn.execute("UPDATE videos SET favorite = ? WHERE output_dir = ?",
+                               (int(favorite), os.path.abspath(output_dir)))
+        return cur.rowcount > 0
+
+    def remove(self, output_dir: str) -> bool:
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute("SELECT id FROM videos WHERE output_dir = ?",
+                               (os.path.abspath(output_dir),)).fetchone()
+            if row:
+                conn.execute("DELETE FROM videos_fts WHERE rowid = ?", (row[0],))
+                conn.execute("DELETE FROM videos WHERE id = ?", (row[0],))
+            conn.execute("COMMIT")
+        return row is not None
+
+    def prune(self) -> int:
+        """Drop entries whose output folder has been deleted (e.g. a cleared temp dir)."""
+        with self._connect() as conn:
+            dirs = [r[0] for r in conn.execute("SELECT output_dir FROM videos")]
+        missing = [d for d in dirs if not os.path.exists(os.path.join(d, "analysis.json"))]
+        for d in missing:
+            self.remove(d)
+        if missing:
+            logger.info("Pruned %d catalog entries with missing outputs", len(missing))
+        return len(missing)
@@ -0,0 +1,187 @@
+"""Headless batch runner for the analysis pipelines.
+
+    python -m project.cli "videos/**/*.mp4" --out results --jobs 2
+    python -m project.cli clip.mov --pipeline advanced --memory 12 --job-memory 4
+    python -m project.cli recording.mkv --pipeline live --idle-timeout 30
+
+Each video gets its own directory under --out holding analysis.json and the stage
+artifacts. Videos whose analysis.json already reports success are skipped, so an
+interrupted batch can be resumed by running the same command again. The live
+pipeline tails files that are still being written and finishes once they stop
+growing.
+"""
+import os
+import sys
+import json
+import glob
+import time
+import hashlib
+import argparse
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+
+from project.modules.utils import setup_logger
+from project.pipeline.resources import plan_threads
+from project.pipeline.runner import limit_threads, atomic_write_json, is_complete, run_video
+
+logger = setup_logger("project.cli")
+
+VIDEO_EXTENSIONS = {".mp4", ".avi", ".mov", ".mkv", ".webm", ".m4v", ".mpg", ".mpeg", ".ts"}
+
+def expand_inputs(patterns: list) -> list:
+    videos = []
+    for pattern in patterns:
+        if os.path.isdir(pattern):
+            matches = [os.path.join(root, name) for root, _, names in os.walk(pattern) for name in names]
+        else:
+            matches = glob.glob(pattern, recursive=True) or ([pattern] if os.path.isfile(pattern) else [])
+        if not matches:
+            logger.warning("No files match %s", pattern)
+        videos.extend(m for m in matches if os.path.isfile(m) and os.path.splitext(m)[1].lower() in VIDEO_EXTENSIONS)
+    seen, unique = set(), []
+    for path in videos:
+        key = os.path.abspath(path)
+        if key not in seen:
+            seen.add(key)
+            unique.append(path)
+    return sorted(unique)
+
+def output_dir_for(video_path: str, out_root: str) -> str:
+    # Stem plus a path hash keeps same-named videos from different folders apart
+    stem = os.path.splitext(os.path.basename(video_path))[0]
+    digest = hashlib.sha1(os.path.abspath(video_path).encode("utf-8")).hexdigest()[:8]
+    return os.path.join(out_root, f"{stem}_{digest}")
+
+def available_memory_gb():
+    try:
+        import psutil
+        return psutil.virtual_memory().available / 1024 ** 3
+    except Exception:
+        pass
+    try:
+        return os.sysconf("SC_AVPHYS_PAGES") * os.sysconf("SC_PAGE_SIZE") / 1024 ** 3
+    except (AttributeError, ValueError, OSError):
+        return None
+
+def plan_concurrency(jobs: int, cpus: int, memory_gb: float, job_memory_gb: float):
+    workers = max(1, min(jobs, cpus))
+    if memory_gb and job_memory_gb:
+        workers = max(1, min(workers, int(memory_gb // job_memory_gb)))
+    return workers, plan_threads(cpus, workers)
+
+def _run_logged(pipeline: str, video_path: str, out_dir: str, options: dict) -> dict:
+    name = os.path.basename(video_path)
+
+    def progress(msg, pct):
+        logger.info("[%s] %3d%% %s", name, int(pct * 100), msg)
+
+    return run_video(pipeline, video_path, out_dir, options, progress)
+
+def run_batch(videos: list, out_root: str, pipeline: str, options: dict, workers: int, threads: int,
+              job_memory_gb: float = 0.0, force: bool = False) -> dict:
+    report = {"pipeline": pipeline, "workers": workers, "threads_per_job": threads,
+              "done": [], "failed": [], "skipped": []}
+    queue = []
+    for video in videos:
+        out_dir = output_dir_for(video, out_root)
+        if not force and is_complete(out_dir):
+            report["skipped"].append({"video": video, "output_dir": out_dir})
+        else:
+            queue.append((video, out_dir))
+    logger.info("%d videos to process, %d already complete; %d workers x %d threads",
+                len(queue), len(report["skipped"]), workers, threads)
+    if not queue:
+        return report
+
+    ctx = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=workers, mp_context=ctx, initializer=limit_threads,
+                             initargs=(threads,)) as executor:
+        running = {}
+        while queue or running:
+            while queue and len(running) < workers:
+                free = available_memory_gb()
+                if running and job_memory_gb and free is not None and free < job_memory_gb:
+                    # Hold back new work until a running job releases memory
+                    break
+                video, out_dir = queue.pop(0)
+                running[executor.submit(_run_logged, pipeline, video, out_dir, options)] = (video, out_dir)
+            done, _ = wait(running, timeout=5.0, return_when=FIRST_COMPLETED)
+            for future in done:
+                video, out_dir = running.pop(future)
+                try:
+                    outcome = future.result()
+                except Exception as e:
+                    outcome = {"video": video, "output_dir": out_dir, "success": False, "error": f"{type(e).__name__}: {e}"}
+                if outcome["success"]:
+                    report["done"].append(outcome)
+                    logger.info("Finished %s in %.1fs", video, outcome["seconds"])
+                else:
+                    report["failed"].append(outcome)
+                    logger.error("Failed %s: %s", video, outcome.get("error"))
+    return report
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the video analysis pipeline over files, folders or globs.")
+    parser.add_argument("inputs", nargs="+", help="Video files, directories or glob patterns (quote ** globs)")
+    parser.add_argument("--out", default="outputs", help="Root directory for per-video results")
+    parser.add_argument("--pipeline", choices=("pro", "advanced", "live"), default="pro")
+    parser.add_argument("--jobs", type=int, default=2, help="Videos processed concurrently")
+    parser.add_argument("--cpus", type=int, default=os.cpu_count() or 1, help="Total CPU threads shared by all jobs")
+    parser.add_argument("--memory", type=float, default=None, help="Memory budget in GB (default: available memory)")
+    parser.add_argument("--job-memory", type=float, default=2.0, help="Estimated peak GB per job")
+    parser.add_argument("--scene-threshold", type=float, default=27.0)
+    parser.add_argument("--language", default="auto", help="Transcription language for the pro pipeline")
+    parser.add_argument("--use-gpu", action="store_true")
+    parser.add_argument("--skip", nargs="*", default=[], choices=("detection", "transcription", "summarization", "moderation"),
+                        help="Advanced pipeline stages to disable")
+    parser.add_argument("--summary-video", action="store_true", help="Render a highlight reel (advanced pipeline)")
+    parser.add_argument("--dense-fps", type=float, default=0.0,
+                        help="Also run YOLO on frames sampled at this rate and track objects (advanced pipeline)")
+    parser.add_argument("--sampling", choices=("fixed", "adaptive"), default="fixed",
+                        help="Dense scan frame selection; adaptive follows motion, up to --dense-fps")
+    parser.add_argument("--sample-budget", type=int, default=240,
+                        help="Adaptive sampling: most frames the dense scan may analyse per video")
+    parser.add_argument("--backend", choices=("torch", "onnx"), default=None,
+                        help="Vision models on PyTorch or ONNX Runtime CPU (advanced pipeline; "
+                             "default: $VISUAL_INSIGHT_BACKEND or torch)")
+    parser.add_argument("--quantize", nargs="*", choices=("summarizer", "transcriber"), default=None,
+                        help="Run these text models with int8 Linear layers on CPU "
+                             "(default: $VISUAL_INSIGHT_QUANTIZE)")
+    parser.add_argument("--captions", choices=("blip", "tags"), default="blip",
+                        help="Keyframe captions from BLIP (cached by perceptual hash) or from YOLO classes only")
+    parser.add_argument("--caption-budget", type=float, default=None,
+                        help="Seconds for keyframe analysis; later batches fall back to YOLO-class captions")
+    parser.add_argument("--idle-timeout", type=float, default=15.0,
+                        help="Live pipeline: seconds without growth before a recording counts as finished")
+    parser.add_argument("--force", action="store_true", help="Reprocess videos that already have results")
+    parser.add_argument("--dry-run", action="store_true", help="List what would run and exit")
+    args = parser.parse_args(argv)
+
+    videos = expand_inputs(args.inputs)
+    if not videos:
+        parser.error("no video files found")
+    memory = args.memory if args.memory is not None else available_memory_gb()
+    workers, threads = plan_concurrency(args.jobs, args.cpus, memory, args.job_memory)
+    if args.dry_run:
+        for video in videos:
+            out_dir = output_dir_for(video, args.out)
+            print(f"{'skip' if not args.force and is_complete(out_dir) else 'run ':4} {video} -> {out_dir}")
+        print(f"{workers} workers x {threads} threads")
+        return 0
+
+    options = {"scene_threshold": args.scene_threshold, "language": args.language, "use_gpu": args.use_gpu,
+               "skip": set(args.skip), "summary_video": args.summary_video,
+               "idle_timeout": args.idle_timeout, "dense_fps": args.dense_fps,
+               "sampling": args.sampling, "sample_budget": args.sample_budget,
+               "backend": args.backend, "quantize": args.quantize,
+               "captions": args.captions, "caption_budget": args.caption_budget}
+    os.makedirs(args.out, exist_ok=True)
+    start = time.time()
+    report = run_batch(videos, args.out, args.pipeline, options, workers, threads, args.job_memory, args.force)
+    report["seconds"] = round(time.time() - start, 2)
+    atomic_write_json(os.path.join(args.out, "batch_report.json"), report)
+    print(json.dumps({k: len(v) if isinstance(v, list) else v for k, v in report.items()}))
+    return 1 if report["failed"] else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
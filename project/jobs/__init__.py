@@ -0,0 +1,5 @@
+"""Local job queue (SQLite) and worker pool for running the pipelines in the background."""
+from project.jobs.queue import JobQueue, JOB_STATES, DEFAULT_DB_PATH
+from project.jobs.worker import WorkerPool
+
+__all__ = ["JobQueue", "JOB_STATES", "DEFAULT_DB_PATH", "WorkerPool"]
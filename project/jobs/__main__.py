@@ -0,0 +1,68 @@
+"""Run the job worker pool, or submit and inspect jobs.
+
+    python -m project.jobs serve --workers 2 --preload
+    python -m project.jobs submit clip.mp4 --out results/clip --priority 5
+    python -m project.jobs status [JOB_ID]
+"""
+import os
+import sys
+import json
+import argparse
+from project.jobs.queue import JobQueue, DEFAULT_DB_PATH
+from project.jobs.worker import WorkerPool
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Local video analysis job queue.")
+    parser.add_argument("--db", default=DEFAULT_DB_PATH, help="SQLite queue database")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    serve = sub.add_parser("serve", help="Run worker processes until interrupted")
+    serve.add_argument("--workers", type=int, default=2, help="Maximum jobs running at once")
+    serve.add_argument("--threads", type=int, default=None, help="CPU threads per worker")
+    serve.add_argument("--preload", action="store_true", help="Load the advanced pipeline models at startup")
+
+    submit = sub.add_parser("submit", help="Queue a video")
+    submit.add_argument("video")
+    submit.add_argument("--out", required=True, help="Output directory for this job")
+    submit.add_argument("--pipeline", choices=("pro", "advanced"), default="pro")
+    submit.add_argument("--priority", type=int, default=0, help="Higher runs first")
+    submit.add_argument("--language", default="auto")
+    submit.add_argument("--scene-threshold", type=float, default=27.0)
+    submit.add_argument("--use-gpu", action="store_true")
+
+    status = sub.add_parser("status", help="Show one job or the most recent jobs")
+    status.add_argument("job_id", nargs="?")
+    status.add_argument("--state", choices=("queued", "running", "done", "failed"))
+    status.add_argument("--limit", type=int, default=20)
+
+    cancel = sub.add_parser("cancel", help="Cancel a queued job")
+    cancel.add_argument("job_id")
+
+    args = parser.parse_args(argv)
+    queue = JobQueue(args.db)
+
+    if args.command == "serve":
+        WorkerPool(args.db, workers=args.workers, threads=args.threads, preload=args.preload).start().serve_forever()
+    elif args.command == "submit":
+        options = {"language": args.language, "scene_threshold": args.scene_threshold, "use_gpu": args.use_gpu}
+        print(queue.submit(os.path.abspath(args.video), os.path.abspath(args.out), args.pipeline, options, args.priority))
+    elif args.command == "status":
+        if args.job_id:
+            job = queue.get(args.job_id)
+            if job is None:
+                print(f"unknown job {args.job_id}", file=sys.stderr)
+                return 1
+            print(json.dumps(job, indent=2))
+        else:
+            print(json.dumps(queue.counts()))
+            for job in queue.list(args.state, args.limit):
+                print(f"{job['id']}  {job['state']:<8} {job['progress'] * 100:5.1f}%  p{job['priority']:<3} "
+                      f"{os.path.basename(job['video_path'])}  {job['error'] or job['message']}")
+    elif args.command == "cancel":
+        if not queue.cancel(args.job_id):
+            print("job is not queued", file=sys.stderr)
+            return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,189 @@
+import os
+import json
+import time
+import sqlite3
+import tempfile
+from contextlib import contextmanager
+from project.modules.utils import setup_logger, generate_id
+
+logger = setup_logger(__name__)
+
+JOB_STATES = ("queued", "running", "done", "failed")
+DEFAULT_DB_PATH = os.environ.get("VISUAL_INSIGHT_JOBS_DB",
+                                 os.path.join(tempfile.gettempdir(), "visual_insight", "jobs.db"))
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    video_path TEXT NOT NULL,
+    output_dir TEXT NOT NULL,
+    pipeline TEXT NOT NULL DEFAULT 'pro',
+    options TEXT NOT NULL DEFAULT '{}',
+    priority INTEGER NOT NULL DEFAULT 0,
+    state TEXT NOT NULL DEFAULT 'queued',
+    progress REAL NOT NULL DEFAULT 0,
+    message TEXT NOT NULL DEFAULT '',
+    error TEXT,
+    worker TEXT,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    created_at REAL NOT NULL,
+    started_at REAL,
+    finished_at REAL,
+    heartbeat_at REAL
+);
+CREATE INDEX IF NOT EXISTS jobs_pending ON jobs (state, priority DESC, created_at);
+"""
+
+class JobQueue:
+    def __init__(self, db_path: str = DEFAULT_DB_PATH, max_attempts: int = 2):
+        self.db_path = db_path
+        self.max_attempts = max_attempts
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(SCHEMA)
+
+    @contextmanager
+    def _connect(self):
+        # One short-lived connection per call keeps the queue safe to share between
+        # threads and processes; WAL lets readers poll while a worker writes.
+        conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    @staticmethod
+    def _row(row) -> dict:
+        if row is None:
+            return None
+        job = dict(row)
+        job["options"] = json.loads(job["options"] or "{}")
+        return job
+
+    def submit(self, video_path: str, output_dir: str, pipeline: str = "pro", options: dict = None,
+               priority: int = 0) -> str:
+        job_id = generate_id()
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT INTO jobs (id, video_path, output_dir, pipeline, options, priority, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (job_id, video_path, output_dir, pipeline, json.dumps(options or {}, default=list), int(priority), time.time()))
+        logger.info("Queued job %s (%s, priority %d) for %s", job_id, pipeline, priority, video_path)
+        return job_id
+
+    def claim(self, worker: str, max_running: int = None):
+        """Atomically move the best queued job to running, honouring the concurrency cap."""
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                if max_running is not None:
+                    running = conn.execute("SELECT COUNT(*) FROM jobs WHERE state = 'running'").fetchone()[0]
+                    if running >= max_running:
+                        conn.execute("COMMIT")
+                        return None
+                row = conn.execute("SELECT * FROM jobs WHERE state = 'queued' "
+                                   "ORDER BY priority DESC, created_at LIMIT 1").fetchone()
+                if row is None:
+                    conn.execute("COMMIT")
+                    return None
+                now = time.time()
+                conn.execute("UPDATE jobs SET state = 'running', worker = ?, attempts = attempts + 1, progress = 0, "
+                             "started_at = ?, heartbeat_at = ?, error = NULL WHERE id = ?",
+                             (worker, now, now, row["id"]))
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+        job = self._row(row)
+        job.update(state="running", worker=worker, attempts=job["attempts"] + 1)
+        return job
+
+    # Updates from a running job only apply while `worker` still owns it: once a
+    # stale job has been requeued, a slow original worker must not touch the new run.
+
+    def update_progress(self, job_id: str, worker: str, progress: float, message: str = "") -> bool:
+        with self._connect() as conn:
+            cur = conn.execute("UPDATE jobs SET progress = ?, message = ?, heartbeat_at = ? "
+                               "WHERE id = ? AND worker = ? AND state = 'running'",
+                               (float(progress), message, time.time(), job_id, worker))
+            return cur.rowcount > 0
+
+    def heartbeat(self, job_id: str, worker: str) -> bool:
+        with self._connect() as conn:
+            cur = conn.execute("UPDATE jobs SET heartbeat_at = ? WHERE id = ? AND worker = ? AND state = 'running'",
+                               (time.time(), job_id, worker))
+            return cur.rowcount > 0
+
+    def finish(self, job_id: str, worker: str, message: str = "") -> bool:
+        return self._close(job_id, worker, "done", message=message)
+
+    def fail(self, job_id: str, worker: str, error: str) -> bool:
+        return self._close(job_id, worker, "failed", error=error)
+
+    def _close(self, job_id: str, worker: str, state: str, message: str = "", error: str = None) -> bool:
+        now = time.time()
+        with self._connect() as conn:
+            cur = conn.execute("UPDATE jobs SET state = ?, progress = CASE WHEN ? = 'done' THEN 1 ELSE progress END, "
+                               "message = ?, error = ?, finished_at = ?, heartbeat_at = ? "
+                               "WHERE id = ? AND worker = ? AND state = 'running'",
+                               (state, state, message, error, now, now, job_id, worker))
+        if cur.rowcount == 0:
+            logger.warning("Job %s is no longer held by worker %s; not marking it %s", job_id, worker, state)
+        return cur.rowcount > 0
+
+    def cancel(self, job_id: str) -> bool:
+        with self._connect() as conn:
+            cur = conn.execute("UPDATE jobs SET state = 'failed', error = 'cancelled', finished_at = ? "
+                               "WHERE id = ? AND state = 'queued'", (time.time(), job_id))
+            return cur.rowcount > 0
+
+    def release_worker(self, worker: str, reason: str = "worker exited") -> int:
+        """Requeue (or fail, once out of attempts) the jobs a dead worker was holding."""
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            conn.execute("UPDATE jobs SET state = 'failed', error = ?, finished_at = ? "
+                         "WHERE worker = ? AND state = 'running' AND attempts >= ?",
+                         (reason, time.time(), worker, self.max_attempts))
+            cur = conn.execute("UPDATE jobs SET state = 'queued', worker = NULL, message = ? "
+                               "WHERE worker = ? AND state = 'running'", (f"requeued: {reason}", worker))
+            conn.execute("COMMIT")
+            return cur.rowcount
+
+    def requeue_stale(self, older_than: float) -> int:
+        cutoff = time.time() - older_than
+        with self._connect() as conn:
+            workers = [r[0] for r in conn.execute(
+                "SELECT DISTINCT worker FROM jobs WHERE state = 'running' AND heartbeat_at < ?", (cutoff,))]
+        return sum(self.release_worker(w, "heartbeat timed out") for w in workers)
+
+    def get(self, job_id: str):
+        with self._connect() as conn:
+            return self._row(conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone())
+
+    def list(self, state: str = None, limit: int = 50, offset: int = 0) -> list:
+        query, params = "SELECT * FROM jobs", []
+        if state:
+            query += " WHERE state = ?"
+            params.append(state)
+        query += " ORDER BY created_at DESC LIMIT ? OFFSET ?"
+        with self._connect() as conn:
+            return [self._row(r) for r in conn.execute(query, params + [limit, offset])]
+
+    def counts(self) -> dict:
+        with self._connect() as conn:
+            rows = conn.execute("SELECT state, COUNT(*) FROM jobs GROUP BY state").fetchall()
+        counts = dict.fromkeys(JOB_STATES, 0)
+        counts.update({state: n for state, n in rows})
+        return counts
+
+    def position(self, job_id: str):
+        """Number of queued jobs that will be picked before this one, or None if it is not queued."""
+        with self._connect() as conn:
+            row = conn.execute("SELECT priority, created_at FROM jobs WHERE id = ? AND state = 'queued'", (job_id,)).fetchone()
+            if row is None:
+                return None
+            return conn.execute("SELECT COUNT(*) FROM jobs WHERE state = 'queued' AND "
+                                "(priority > ? OR (priority = ? AND created_at < ?))",
+                                (row["priority"], row["priority"], row["created_at"])).fetchone()[0]
@@ -0,0 +1,141 @@
+import os
+import time
+import signal
+import threading
+import multiprocessing
+from project.modules.utils import setup_logger
+from project.jobs.queue import JobQueue, DEFAULT_DB_PATH
+from project.pipeline.resources import plan_threads
+
+logger = setup_logger(__name__)
+
+HEARTBEAT_SECONDS = 30.0
+
+def _heartbeat(queue: JobQueue, job_id: str, worker_id: str, done: threading.Event):
+    # Long stages (e.g. Whisper on a long video) report no progress for minutes;
+    # the heartbeat tells the supervisor the job is still alive.
+    while not done.wait(HEARTBEAT_SECONDS):
+        queue.heartbeat(job_id, worker_id)
+
+def _worker_main(db_path: str, worker_id: str, max_running: int, threads: int, poll_interval: float,
+                 preload: bool, stop_event):
+    from project.pipeline.runner import limit_threads, run_video
+    limit_threads(threads)
+    queue = JobQueue(db_path)
+    # Model wrappers live for the whole process, so weights load once per worker
+    # rather than once per video.
+    components = {}
+    if preload:
+        from project.pipeline.advanced import load_components
+        components[False] = load_components(use_gpu=False, preload=True)
+    logger.info("Worker %s ready (pid %d, %d threads)", worker_id, os.getpid(), threads)
+
+    while not stop_event.is_set():
+        job = queue.claim(worker_id, max_running)
+        if job is None:
+            stop_event.wait(poll_interval)
+            continue
+        options = job["options"]
+        last_update = [0.0]
+
+        def progress(msg, pct):
+            now = time.monotonic()
+            if now - last_update[0] >= 0.5 or pct >= 1.0:
+                last_update[0] = now
+                queue.update_progress(job["id"], worker_id, pct, msg)
+
+        done = threading.Event()
+        threading.Thread(target=_heartbeat, args=(queue, job["id"], worker_id, done), daemon=True).start()
+        try:
+            warm = None
+            if job["pipeline"] in ("advanced", "live"):
+                use_gpu = bool(options.get("use_gpu"))
+                if use_gpu not in components:
+                    from project.pipeline.advanced import load_components
+                    components[use_gpu] = load_components(use_gpu=use_gpu)
+                warm = components[use_gpu]
+            outcome = run_video(job["pipeline"], job["video_path"], job["output_dir"], options, progress, warm)
+        except Exception as e:
+            logger.exception("Job %s crashed", job["id"])
+            queue.fail(job["id"], worker_id, f"{type(e).__name__}: {e}")
+            continue
+        finally:
+            done.set()
+        if outcome["success"]:
+            queue.finish(job["id"], worker_id, "reused cached analysis" if outcome.get("cached")
+                         else f"completed in {outcome['seconds']:.1f}s")
+        else:
+            queue.fail(job["id"], worker_id, outcome.get("error") or "processing failed")
+
+class WorkerPool:
+    def __init__(self, db_path: str = DEFAULT_DB_PATH, workers: int = 2, threads: int = None,
+                 poll_interval: float = 1.0, preload: bool = False, stale_after: float = 180.0):
+        self.db_path = db_path
+        self.workers = max(1, workers)
+        self.threads = threads or plan_threads(os.cpu_count() or 1, self.workers)
+        self.poll_interval = poll_interval
+        self.preload = preload
+        self.stale_after = stale_after
+        self.queue = JobQueue(db_path)
+        self._ctx = multiprocessing.get_context("spawn")
+        self._stop = self._ctx.Event()
+        self._procs = {}
+        self._supervisor = None
+
+    def _spawn(self, slot: int):
+        worker_id = f"{os.getpid()}-{slot}-{int(time.time() * 1000) % 100000}"
+        proc = self._ctx.Process(target=_worker_main, name=f"job-worker-{slot}", daemon=True,
+                                 args=(self.db_path, worker_id, self.workers, self.threads, self.poll_interval,
+                                       self.preload, self._stop))
+        proc.start()
+        self._procs[slot] = (worker_id, proc)
+
+    def _supervise(self):
+        while not self._stop.is_set():
+            for slot, (worker_id, proc) in list(self._procs.items()):
+                if not proc.is_alive() and not self._stop.is_set():
+                    requeued = self.queue.release_worker(worker_id, f"worker exited with code {proc.exitcode}")
+                    logger.warning("Worker %s exited (%s); requeued %d job(s), restarting",
+                                   worker_id, proc.exitcode, requeued)
+                    self._spawn(slot)
+            self.queue.requeue_stale(self.stale_after)
+            self._stop.wait(2.0)
+
+    def start(self):
+        # Jobs left running by a previous pool that died with its host process
+        self.queue.requeue_stale(self.stale_after)
+        for slot in range(self.workers):
+            self._spawn(slot)
+        self._supervisor = threading.Thread(target=self._supervise, name="job-supervisor", daemon=True)
+        self._supervisor.start()
+        logger.info("Started %d job workers on %s", self.workers, self.db_path)
+        return self
+
+    def stop(self, timeout: float = 10.0):
+        self._stop.set()
+        for worker_id, proc in self._procs.values():
+            proc.join(timeout)
+            if proc.is_alive():
+                proc.terminate()
+                proc.join()
+                self.queue.release_worker(worker_id, "pool stopped")
+        if self._supervisor is not None:
+            self._supervisor.join(timeout)
+
+    def serve_forever(self):
+        signal.signal(signal.SIGTERM, lambda *_: self._stop.set())
+        try:
+            while not self._stop.wait(1.0):
+                pass
+        except KeyboardInterrupt:
+            pass
+        self.stop()
+
+    def alive(self) -> int:
+        return sum(1 for _, proc in self._procs.values() if proc.is_alive())
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
@@ -0,0 +1,94 @@
+"""On-disk caption cache keyed by a 64-bit perceptual hash of the frame.
+
+Frames within `max_distance` bits (Hamming) of a cached hash reuse its
+caption, so repeated shots, intros and static scenes are captioned once.
+Entries are kept per `variant` (model and generation settings), because a
+caption is only valid for the settings that produced it.
+"""
+import os
+import time
+import sqlite3
+from contextlib import contextmanager
+import cv2
+import numpy as np
+from project.modules.utils import setup_logger, user_cache_dir
+
+logger = setup_logger(__name__)
+
+# Per user: anyone who can write the cache decides the captions
+DEFAULT_CAPTION_CACHE = os.environ.get("VISUAL_INSIGHT_CAPTIONS", user_cache_dir("captions.db"))
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS captions (
+    variant TEXT NOT NULL,
+    hash INTEGER NOT NULL,
+    caption TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    PRIMARY KEY (variant, hash)
+);
+"""
+
+_POPCOUNT = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+def dhash(image) -> int:
+    """Difference hash: sign of horizontal gradients on a 9x8 grey thumbnail (PIL or RGB array)."""
+    grey = cv2.cvtColor(np.asarray(image.convert("RGB") if hasattr(image, "convert") else image), cv2.COLOR_RGB2GRAY)
+    small = cv2.resize(grey, (9, 8), interpolation=cv2.INTER_AREA)
+    bits = (small[:, 1:] > small[:, :-1]).ravel()
+    return int(np.packbits(bits).view(">u8")[0])
+
+def hamming(hashes: np.ndarray, query: int) -> np.ndarray:
+    diff = np.bitwise_xor(hashes, np.uint64(query))
+    return _POPCOUNT[diff.view(np.uint8)].reshape(len(hashes), 8).sum(axis=1)
+
+class CaptionCache:
+    def __init__(self, db_path: str = DEFAULT_CAPTION_CACHE, max_distance: int = 4):
+        self.db_path = db_path
+        self.max_distance = max_distance
+        # Per variant: (hashes as uint64, captions), loaded on first lookup
+        self._loaded = {}
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), mode=0o700, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(SCHEMA)
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    def _entries(self, variant: str):
+        if variant not in self._loaded:
+            with self._connect() as conn:
+                rows = conn.execute("SELECT hash, caption FROM captions WHERE variant = ?", (variant,)).fetchall()
+            # SQLite integers are signed; the bit pattern is what matters
+            hashes = np.array([h for h, _ in rows], dtype=np.int64).view(np.uint64)
+            self._loaded[variant] = (hashes, [c for _, c in rows])
+        return self._loaded[variant]
+
+    def get_many(self, variant: str, hashes: list) -> list:
+        """The cached caption closest to each hash, or None when none is within `max_distance`."""
+        known, captions = self._entries(variant)
+        found = []
+        for h in hashes:
+            if not len(known):
+                found.append(None)
+                continue
+            distance = hamming(known, h)
+            best = int(np.argmin(distance))
+            found.append(captions[best] if distance[best] <= self.max_distance else None)
+        return found
+
+    def put_many(self, variant: str, hashes: list, captions: list):
+        if not hashes:
+            return
+        known, cached = self._entries(variant)
+        signed = np.array(hashes, dtype=np.uint64).view(np.int64).tolist()
+        now = time.time()
+        with self._connect() as conn:
+            conn.executemany("INSERT OR REPLACE INTO captions (variant, hash, caption, created_at) VALUES (?, ?, ?, ?)",
+                             [(variant, h, c, now) for h, c in zip(signed, captions)])
+        self._loaded[variant] = (np.concatenate([known, np.array(hashes, dtype=np.uint64)]), cached + list(captions))
@@ -0,0 +1,179 @@
+"""Dense detection: YOLO over frames sampled through the whole video, linked into tracks.
+
+Keyframe detection sees one midpoint frame per scene. The scanner decodes the
+whole video once; a sampler (fixed rate minus near-identical frames by default,
+or motion-gated under a budget) picks frames, which are batched through a fixed
+ring buffer; boxes are linked across frames with a greedy IoU tracker, so each object gets a start and end time.
+"""
+import os
+import cv2
+import numpy as np
+from project.modules.detections import concat
+from project.modules.sampler import FixedRateSampler, motion_thumb
+from project.modules.tracing import current_span
+from project.modules.utils import setup_logger, timeit
+
+logger = setup_logger(__name__)
+
+def box_iou(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """Pairwise IoU between (N, 4) and (M, 4) xyxy boxes."""
+    tl = np.maximum(a[:, None, :2], b[None, :, :2])
+    br = np.minimum(a[:, None, 2:], b[None, :, 2:])
+    inter = np.prod(np.clip(br - tl, 0, None), axis=2)
+    area_a = np.prod(a[:, 2:] - a[:, :2], axis=1)
+    area_b = np.prod(b[:, 2:] - b[:, :2], axis=1)
+    return inter / np.maximum(area_a[:, None] + area_b[None, :] - inter, 1e-9)
+
+class IoUTracker:
+    """Greedy IoU association of per-frame boxes into same-class tracks.
+
+    `hits` counts the sampled frames an object was seen on, including skipped
+    frames that repeat an analysed frame it was matched on, so an object in a
+    static shot reaches `min_hits` even though it was analysed only once.
+    """
+
+    def __init__(self, iou_threshold: float = 0.3, max_gap: float = 1.0, min_hits: int = 2):
+        self.iou_threshold = iou_threshold
+        self.max_gap = max_gap
+        self.min_hits = min_hits
+        self.active = []
+        self.finished = []
+        self.next_id = 0
+        # Time of the last analysed frame; only tracks matched on it are extended
+        self.last_t = None
+
+    def _retire(self, t: float):
+        keep = []
+        for track in self.active:
+            (keep if t - track["end"] <= self.max_gap else self.finished).append(track)
+        self.active = keep
+
+    def update(self, t: float, rows: np.ndarray):
+        """Feed the boxes of one analysed frame (rows of DETECTION_DTYPE)."""
+        self._retire(t)
+        self.last_t = t
+        unmatched = set(range(len(rows)))
+        if self.active and len(rows):
+            boxes = np.array([track["box"] for track in self.active], dtype=np.float32)
+            classes = np.array([track["cls"] for track in self.active])
+            iou = box_iou(boxes, rows["xyxyn"])
+            iou[classes[:, None] != rows["cls"][None, :]] = 0.0
+            while True:
+                ti, di = np.unravel_index(np.argmax(iou), iou.shape)
+                if iou[ti, di] < self.iou_threshold:
+                    break
+                track, row = self.active[ti], rows[di]
+                track.update(end=t, seen=t, box=row["xyxyn"].copy(), hits=track["hits"] + 1,
+                             max_conf=max(track["max_conf"], float(row["conf"])))
+                iou[ti, :] = 0.0
+                iou[:, di] = 0.0
+                unmatched.discard(di)
+        for di in sorted(unmatched):
+            row = rows[di]
+            self.active.append({"track_id": self.next_id, "cls": int(row["cls"]), "start": t, "end": t, "seen": t,
+                                "box": row["xyxyn"].copy(), "hits": 1, "max_conf": float(row["conf"])})
+            self.next_id += 1
+
+    def extend(self, t: float):
+        """A skipped frame: whatever was on the last analysed frame is taken to still be visible."""
+        for track in self.active:
+            if track["seen"] == self.last_t and t - track["end"] <= self.max_gap:
+                track["end"] = t
+                track["hits"] += 1
+
+    def finish(self, class_names: dict = None) -> list:
+        self.finished.extend(self.active)
+        self.active = []
+        names = {int(k): v for k, v in (class_names or {}).items()}
+        tracks = [t for t in self.finished if t["hits"] >= self.min_hits]
+        return [{"track_id": t["track_id"], "class_id": t["cls"], "class_name": names.get(t["cls"], str(t["cls"])),
+                 "start": round(t["start"], 3), "end": round(t["end"], 3), "hits": t["hits"],
+                 "max_conf": round(t["max_conf"], 4)} for t in sorted(tracks, key=lambda t: t["start"])]
+
+class DenseScanner:
+    def __init__(self, detector, sample_fps: float = 2.0, batch_size: int = 16, diff_threshold: float = 2.0,
+                 tracker: IoUTracker = None, sampler=None, frames_dir: str = None):
+        self.detector = detector
+        self.batch_size = batch_size
+        self.tracker = tracker or IoUTracker()
+        self.sampler = sampler or FixedRateSampler(sample_fps, diff_threshold)
+        # When set, analysed frames are also saved so image-level checks (NudeNet) can read them
+        self.frames_dir = frames_dir
+
+    @timeit
+    def scan(self, video_path: str, progress_callback=None) -> dict:
+        """Returns the boxes (frame_idx indexes `frame_times`), the tracks and sampling stats."""
+        cap = cv2.VideoCapture(video_path)
+        fps = cap.get(cv2.CAP_PROP_FPS) or 25.0
+        total = int(cap.get(cv2.CAP_PROP_FRAME_COUNT) or 0)
+        step = max(1, int(round(fps / self.sampler.probe_fps)))
+        self.sampler.reset(total / fps if total else 0.0)
+        if self.frames_dir:
+            os.makedirs(self.frames_dir, exist_ok=True)
+        ring = None
+        filled = 0
+        # Analysed and skipped frames in decode order; the tracker must see them in that order
+        pending = []
+        frame_times, boxes, frames = [], [], []
+        stats = {"decoded": 0, "sampled": 0, "skipped": 0, "analysed": 0}
+
+        def flush():
+            nonlocal filled
+            if filled:
+                batch = self.detector.detect_frames(list(ring[:filled]), first_frame=len(frame_times))
+                boxes.append(batch)
+            else:
+                batch = None
+            slot = 0
+            for kind, t in pending:
+                if kind == "skip":
+                    self.tracker.extend(t)
+                    continue
+                frame_idx = len(frame_times)
+                frame_times.append(t)
+                lo, hi = np.searchsorted(batch["frame_idx"], [frame_idx, frame_idx + 1])
+                self.tracker.update(t, batch[lo:hi])
+                if self.frames_dir:
+                    path = os.path.join(self.frames_dir, f"dense_{frame_idx:05d}.jpg")
+                    cv2.imwrite(path, ring[slot])
+                    frames.append({"frame_idx": frame_idx, "timestamp": round(t, 3), "frame_path": path})
+                slot += 1
+            pending.clear()
+            filled = 0
+
+        try:
+            index = -1
+            while cap.grab():
+                index += 1
+                stats["decoded"] += 1
+                if index % step:
+                    continue
+                ok, frame = cap.retrieve()
+                if not ok:
+                    continue
+                stats["sampled"] += 1
+                t = cap.get(cv2.CAP_PROP_POS_MSEC) / 1000.0
+                if not self.sampler.offer(t, motion_thumb(frame)):
+                    stats["skipped"] += 1
+                    pending.append(("skip", t))
+                    continue
+                if ring is None or ring.shape[1:] != frame.shape:
+                    flush()
+                    ring = np.empty((self.batch_size,) + frame.shape, dtype=frame.dtype)
+                ring[filled] = frame
+                filled += 1
+                pending.append(("frame", t))
+                if filled == self.batch_size:
+                    flush()
+                    if progress_callback and total:
+                        progress_callback(f"Dense scan: {index}/{total} frames", index / total)
+            flush()
+        finally:
+            cap.release()
+        stats["analysed"] = len(frame_times)
+        stats["sampling"] = self.sampler.stats()
+        current_span().count(frames=stats["analysed"])
+        tracks = self.tracker.finish(getattr(self.detector, "class_names", {}))
+        logger.info("Dense scan of %s: %s, %d tracks", video_path, stats, len(tracks))
+        return {"boxes": concat(boxes), "frame_times": np.asarray(frame_times, dtype=np.float32),
+                "tracks": tracks, "frames": frames, "stats": stats}
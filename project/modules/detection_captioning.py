@@ -1,33 +1,87 @@
-import torch
-from PIL import Image
-from typing import List
-from project.modules.utils import setup_logger, timeit
+import os
+import time
+from typing import List, Tuple
+import numpy as np
+from project.modules.utils import setup_logger, timeit, resolve_device
+from project.modules.tracing import current_span
+from project.modules.detections import from_yolo, concat, summarize
+from project.modules.caption_cache import CaptionCache, DEFAULT_CAPTION_CACHE, dhash
 from tqdm import tqdm
 
 logger = setup_logger(__name__)
 
+BACKENDS = ("torch", "onnx")
+CAPTION_MODES = ("blip", "tags")
+BLIP_MODEL = "Salesforce/blip-image-captioning-base"
+# BLIP-base captions are rarely longer than 20 tokens; greedy decoding matches
+# beam search on short captions at a fraction of the cost
+CAPTION_MAX_NEW_TOKENS = 30
+CAPTION_VARIANT = f"{BLIP_MODEL}:greedy:{CAPTION_MAX_NEW_TOKENS}"
+
+def tags_caption(rows: np.ndarray, class_names: dict) -> str:
+    """A caption built from YOLO classes, e.g. "a scene with 2 persons, a car and a dog"."""
+    if not len(rows):
+        return "a scene with no detected objects"
+    names = {int(k): v for k, v in (class_names or {}).items()}
+    classes, counts = np.unique(rows["cls"], return_counts=True)
+    order = np.argsort(-counts, kind="stable")
+    parts = [f"{count} {names.get(int(cls), str(cls))}s" if count > 1 else f"a {names.get(int(cls), str(cls))}"
+             for cls, count in zip(classes[order], counts[order])]
+    return "a scene with " + (", ".join(parts[:-1]) + " and " + parts[-1] if len(parts) > 1 else parts[0])
+
 class DetectorCaptioner:
-    def __init__(self, use_gpu: bool = False):
-        self.device = "cuda" if use_gpu and torch.cuda.is_available() else "cpu"
-        logger.info(f"Initializing DetectorCaptioner on device: {self.device}")
+    def __init__(self, use_gpu: bool = False, backend: str = None, caption_mode: str = "blip",
+                 caption_cache: str = DEFAULT_CAPTION_CACHE):
+        if caption_mode not in CAPTION_MODES:
+            raise ValueError(f"Unknown caption mode '{caption_mode}', expected one of {CAPTION_MODES}")
+        self.caption_mode = caption_mode
+        # Path of the perceptual-hash caption cache; None disables it
+        self.caption_cache_path = caption_cache
+        self.caption_cache = None
+        self.backend = backend or os.environ.get("VISUAL_INSIGHT_BACKEND", "torch")
+        if self.backend not in BACKENDS:
+            raise ValueError(f"Unknown backend '{self.backend}', expected one of {BACKENDS}")
+        self.onnx = None
+        if self.backend == "onnx":
+            from project.modules.onnx_backend import OnnxBackend
+            # The vision models run in ONNX Runtime on CPU; the eager models that
+            # stay (BLIP's text decoder, CLIP's text tower) live there as well
+            self.onnx = OnnxBackend()
+            use_gpu = False
+        self.device = resolve_device(use_gpu)
+        logger.info(f"Initializing DetectorCaptioner on device: {self.device} ({self.backend} backend)")
         self.yolo_model = None
         self.blip_processor = None
         self.blip_model = None
         self.clip_processor = None
         self.clip_model = None
+        self.class_names = {}
 
     def _load_models(self):
+        self._load_yolo()
+        if self.caption_mode != "tags":
+            self._load_blip()
+        self._load_clip()
+
+    def _load_blip(self):
+        if self.blip_model is None:
+            from transformers import BlipProcessor, BlipForConditionalGeneration
+            logger.info("Loading BLIP model...")
+            self.blip_processor = BlipProcessor.from_pretrained(BLIP_MODEL)
+            self.blip_model = BlipForConditionalGeneration.from_pretrained(BLIP_MODEL)
+            self.blip_model.to(self.device)
+        if self.caption_cache is None and self.caption_cache_path:
+            self.caption_cache = CaptionCache(self.caption_cache_path)
+
+    def _load_yolo(self):
         if self.yolo_model is None:
             from ultralytics import YOLO
             logger.info("Loading YOLOv8 model...")
             self.yolo_model = YOLO("yolov8n.pt")
             self.yolo_model.to(self.device)
-        if self.blip_model is None:
-            from transformers import BlipProcessor, BlipForConditionalGeneration
-            logger.info("Loading BLIP model...")
-            self.blip_processor = BlipProcessor.from_pretrained("Salesforce/blip-image-captioning-base")
-            self.blip_model = BlipForConditionalGeneration.from_pretrained("Salesforce/blip-image-captioning-base")
-            self.blip_model.to(self.device)
+            self.class_names = dict(self.yolo_model.names)
+
+    def _load_clip(self):
         if self.clip_model is None:
             from transformers import CLIPProcessor, CLIPModel
             logger.info("Loading CLIP model...")
@@ -35,37 +89,145 @@ class DetectorCaptioner:
             self.clip_processor = CLIPProcessor.from_pretrained("openai/clip-vit-base-patch32")
             self.clip_model.to(self.device)
 
+    def encode_text(self, texts: List[str]):
+        """CLIP text-tower embeddings, L2-normalised, in the same space as the keyframe embeddings."""
+        import torch
+        self._load_clip()
+        inputs = self.clip_processor(text=list(texts), return_tensors="pt", padding=True).to(self.device)
+        with torch.no_grad():
+            features = self.clip_model.get_text_features(**inputs)
+        features = features / features.norm(dim=-1, keepdim=True)
+        return features.cpu().numpy()
+
+    def detect_frames(self, frames: list, first_frame: int = 0) -> np.ndarray:
+        """YOLO only, on decoded BGR frames in one batch; rows are numbered from `first_frame`."""
+        self._load_yolo()
+        current_span().count(frames=len(frames))
+        return self._detect(frames, first_frame)
+
+    def _detect(self, frames: list, first_frame: int) -> np.ndarray:
+        if self.onnx:
+            return self.onnx.detect(self.yolo_model, frames, first_frame)
+        preds = self.yolo_model(frames, device=self.device, verbose=False)
+        return from_yolo(preds, first_frame=first_frame)
+
+    def _caption(self, images: list):
+        """Captions plus the output token ids (BOS first, padded to the longest) for a batch of PIL images."""
+        import torch
+        if not self.onnx:
+            blip_inputs = self.blip_processor(images, return_tensors="pt").to(self.device)
+            blip_out = self.blip_model.generate(**blip_inputs, max_new_tokens=CAPTION_MAX_NEW_TOKENS, num_beams=1,
+                                                do_sample=False, use_cache=True)
+            return self.blip_processor.batch_decode(blip_out, skip_special_tokens=True), blip_out
+        pixel_values = self.blip_processor(images=images, return_tensors="np")["pixel_values"]
+        image_embeds = torch.from_numpy(self.onnx.blip_image(self.blip_model, pixel_values))
+        # What BlipForConditionalGeneration.generate does after its vision model
+        text_config = self.blip_model.config.text_config
+        input_ids = torch.full((len(images), 1), text_config.bos_token_id, dtype=torch.long)
+        with torch.no_grad():
+            blip_out = self.blip_model.text_decoder.generate(
+                input_ids=input_ids, attention_mask=torch.ones_like(input_ids),
+                encoder_hidden_states=image_embeds,
+                encoder_attention_mask=torch.ones(image_embeds.shape[:-1], dtype=torch.long),
+                eos_token_id=text_config.sep_token_id, pad_token_id=text_config.pad_token_id,
+                max_new_tokens=CAPTION_MAX_NEW_TOKENS, num_beams=1, do_sample=False, use_cache=True)
+        return self.blip_processor.batch_decode(blip_out, skip_special_tokens=True), blip_out
+
+    def _captions(self, images: list, rows: np.ndarray, first_frame: int, tags: bool):
+        """Captions, their sources ("cache", "blip" or "tags") and the number of generated tokens.
+
+        Only frames missing from the cache go through BLIP, as one batch, and a
+        frame that repeats another in the batch reuses its caption (source
+        "cache"). With `tags` the captions come from the frames' YOLO classes.
+        """
+        if tags:
+            frame_rows = [rows[rows["frame_idx"] == first_frame + j] for j in range(len(images))]
+            return [tags_caption(r, self.class_names) for r in frame_rows], ["tags"] * len(images), 0
+        hashes = [dhash(img) for img in images] if self.caption_cache else []
+        captions = self.caption_cache.get_many(CAPTION_VARIANT, hashes) if hashes else [None] * len(images)
+        sources = ["cache" if c is not None else "blip" for c in captions]
+        todo = [j for j, c in enumerate(captions) if c is None]
+        # Near-identical frames within the batch share one generation
+        same_as = {}
+        if hashes:
+            for j in todo:
+                same_as[j] = next((k for k in todo if k < j and same_as[k] == k and
+                                   bin(hashes[j] ^ hashes[k]).count("1") <= self.caption_cache.max_distance), j)
+        unique = [j for j in todo if same_as.get(j, j) == j]
+        tokens = 0
+        if unique:
+            generated, blip_out = self._caption([images[j] for j in unique])
+            # Only what was generated: drop the BOS prompt and the batch padding
+            pad_token_id = self.blip_model.config.text_config.pad_token_id
+            tokens = int((blip_out[:, 1:] != pad_token_id).sum())
+            for j, caption in zip(unique, generated):
+                captions[j] = caption
+            for j in todo:
+                if same_as.get(j, j) != j:
+                    captions[j] = captions[same_as[j]]
+                    sources[j] = "cache"
+            if hashes:
+                self.caption_cache.put_many(CAPTION_VARIANT, [hashes[j] for j in unique], generated)
+        return captions, sources, tokens
+
+    def _embed(self, images: list) -> np.ndarray:
+        """Raw (unnormalised) CLIP image features, one row per image."""
+        import torch
+        if self.onnx:
+            pixel_values = self.clip_processor(images=images, return_tensors="np")["pixel_values"]
+            return self.onnx.clip_image(self.clip_model, pixel_values)
+        clip_inputs = self.clip_processor(images=images, return_tensors="pt").to(self.device)
+        with torch.no_grad():
+            image_features = self.clip_model.get_image_features(**clip_inputs)
+        return image_features.cpu().numpy()
+
     @timeit
-    def process_keyframes(self, keyframes: List[dict], batch_size: int = 8) -> List[dict]:
-        self._load_models()
+    def process_keyframes(self, keyframes: List[dict], batch_size: int = 8, caption_mode: str = None,
+                          caption_budget: float = None) -> Tuple[List[dict], np.ndarray]:
+        """Per-frame results (caption, embedding, box counts) plus every box as one structured array.
+
+        `caption_mode` overrides the instance's for this call. With `caption_budget`
+        (seconds for the whole call), batches whose BLIP time would run past the
+        budget are captioned from their YOLO classes.
+        """
+        import cv2
+        from PIL import Image
+        caption_mode = caption_mode or self.caption_mode
+        if caption_mode not in CAPTION_MODES:
+            raise ValueError(f"Unknown caption mode '{caption_mode}', expected one of {CAPTION_MODES}")
+        self._load_yolo()
+        self._load_clip()
+        if caption_mode != "tags":
+            self._load_blip()
         results = []
+        boxes = []
+        blip_seconds, blip_frames = 0.0, 0
+        started = time.perf_counter()
         keyframes.sort(key=lambda x: x.get("scene_idx", 0))
         for i in tqdm(range(0, len(keyframes), batch_size), desc="Processing Keyframes"):
             batch_keyframes = keyframes[i:i+batch_size]
             image_paths = [kf["frame_path"] for kf in batch_keyframes]
             images = [Image.open(p).convert("RGB") for p in image_paths]
-            yolo_preds = self.yolo_model(image_paths, device=self.device, verbose=False)
-            blip_inputs = self.blip_processor(images, return_tensors="pt").to(self.device)
-            blip_out = self.blip_model.generate(**blip_inputs, max_new_tokens=50)
-            captions = self.blip_processor.batch_decode(blip_out, skip_special_tokens=True)
-            clip_inputs = self.clip_processor(images=images, return_tensors="pt").to(self.device)
-            with torch.no_grad():
-                image_features = self.clip_model.get_image_features(**clip_inputs)
-            clip_embeddings = image_features.cpu().numpy().tolist()
+            frames = [cv2.imread(p) for p in image_paths] if self.onnx else image_paths
+            rows = self._detect(frames, len(results))
+            boxes.append(rows)
+            tags = caption_mode == "tags"
+            if not tags and caption_budget is not None and blip_frames:
+                projected = blip_seconds / blip_frames * len(images)
+                tags = time.perf_counter() - started + projected > caption_budget
+            caption_start = time.perf_counter()
+            captions, sources, tokens = self._captions(images, rows, len(results), tags)
+            if "blip" in sources:
+                blip_seconds += time.perf_counter() - caption_start
+                blip_frames += sources.count("blip")
+            current_span().count(frames=len(batch_keyframes), tokens=tokens, cached=sources.count("cache"))
+            clip_embeddings = self._embed(images).tolist()
             for j, kf in enumerate(batch_keyframes):
                 item = dict(kf)
-                detections = []
-                yolo_result = yolo_preds[j]
-                names = yolo_result.names
-                for box in yolo_result.boxes:
-                    detections.append({
-                        "box": box.xyxyn.cpu().numpy().flatten().tolist(),
-                        "conf": float(box.conf.cpu()),
-                        "class_id": int(box.cls.cpu()),
-                        "class_name": names[int(box.cls.cpu())]
-                    })
-                item["detections"] = detections
                 item["caption"] = captions[j]
+                item["caption_source"] = sources[j]
                 item["clip_embedding"] = clip_embeddings[j]
                 results.append(item)
-        return results
+        detections = concat(boxes)
+        summarize(results, detections, self.class_names)
+        return results, detections
@@ -0,0 +1,81 @@
+"""Detections as one structured NumPy array per video instead of a dict per box.
+
+Rows are (frame_idx, xyxyn, conf, cls) where `frame_idx` is the position of the
+frame in the pipeline's per-frame results; rows are kept in frame order.
+"""
+import numpy as np
+
+DETECTION_DTYPE = np.dtype([("frame_idx", np.int32), ("xyxyn", np.float32, (4,)),
+                            ("conf", np.float32), ("cls", np.int16)])
+
+def empty() -> np.ndarray:
+    return np.zeros(0, dtype=DETECTION_DTYPE)
+
+def from_yolo(preds, first_frame: int = 0) -> np.ndarray:
+    """Rows for a batch of ultralytics results with a single device-to-host copy."""
+    import torch
+    counts = [len(p.boxes) for p in preds]
+    out = np.zeros(sum(counts), dtype=DETECTION_DTYPE)
+    if not len(out):
+        return out
+    # boxes.data ends with (conf, cls) whether or not a track id column is present
+    packed = torch.cat([torch.cat([p.boxes.xyxyn, p.boxes.data[:, -2:]], dim=1) for p in preds if len(p.boxes)])
+    packed = packed.float().cpu().numpy()
+    out["frame_idx"] = np.repeat(np.arange(first_frame, first_frame + len(preds)), counts)
+    out["xyxyn"] = packed[:, :4]
+    out["conf"] = packed[:, 4]
+    out["cls"] = packed[:, 5].astype(np.int16)
+    return out
+
+def from_dicts(det_results: list) -> np.ndarray:
+    """Rows from per-frame results that still carry a `detections` list of box dicts."""
+    rows = [(i, d["box"], d["conf"], d["class_id"])
+            for i, r in enumerate(det_results) for d in r.get("detections") or []]
+    return np.array(rows, dtype=DETECTION_DTYPE) if rows else empty()
+
+def concat(arrays: list) -> np.ndarray:
+    arrays = [a for a in arrays if a is not None and len(a)]
+    return np.concatenate(arrays) if arrays else empty()
+
+def class_ids(class_names: dict, labels) -> np.ndarray:
+    """Ids whose name is in `labels`; `class_names` maps id (int or str) to name."""
+    labels = set(labels)
+    return np.array([int(k) for k, name in (class_names or {}).items() if name in labels], dtype=np.int16)
+
+def select(dets: np.ndarray, classes=None, min_conf: float = 0.0, exclusive: bool = False) -> np.ndarray:
+    """Rows of the given class ids at or above `min_conf` (strictly above with `exclusive`)."""
+    mask = dets["conf"] > min_conf if exclusive else dets["conf"] >= min_conf
+    if classes is not None:
+        mask &= np.isin(dets["cls"], classes)
+    return dets[mask]
+
+def counts_per_frame(dets: np.ndarray, n_frames: int) -> np.ndarray:
+    return np.bincount(dets["frame_idx"], minlength=n_frames)[:n_frames]
+
+def counts_per_scene(dets: np.ndarray, frame_scene, n_scenes: int) -> np.ndarray:
+    """Box counts per scene, given the scene index of every frame."""
+    frame_scene = np.asarray(frame_scene, dtype=np.int64)
+    if not len(dets) or not len(frame_scene):
+        return np.zeros(n_scenes, dtype=np.int64)
+    scenes = frame_scene[dets["frame_idx"]]
+    scenes = scenes[(scenes >= 0) & (scenes < n_scenes)]
+    return np.bincount(scenes, minlength=n_scenes)
+
+def summarize(det_results: list, dets: np.ndarray, class_names: dict):
+    """Store `detection_count` and an {class: count} summary on every per-frame result."""
+    names = {int(k): v for k, v in (class_names or {}).items()}
+    counts = counts_per_frame(dets, len(det_results))
+    objects = [{} for _ in det_results]
+    if len(dets):
+        pairs, pair_counts = np.unique(np.stack([dets["frame_idx"], dets["cls"]]), axis=1, return_counts=True)
+        for (frame, cls), count in zip(pairs.T, pair_counts):
+            objects[frame][names.get(int(cls), str(cls))] = int(count)
+    for r, count, objs in zip(det_results, counts, objects):
+        r["detection_count"] = int(count)
+        r["objects"] = objs
+
+def to_dicts(dets: np.ndarray, class_names: dict) -> list:
+    """Box dicts in the shape the JSON results used before (for display and reports)."""
+    names = {str(k): v for k, v in (class_names or {}).items()}
+    return [{"box": [float(v) for v in row["xyxyn"]], "conf": float(row["conf"]), "class_id": int(row["cls"]),
+             "class_name": names.get(str(int(row["cls"])), str(int(row["cls"])))} for row in dets]
@@ -0,0 +1,183 @@
+import os
+import json
+import shutil
+import struct
+import hashlib
+import tempfile
+from project.modules.utils import setup_logger, generate_id
+
+logger = setup_logger(__name__)
+
+CHUNK_SIZE = 1024 * 1024
+SNIFF_BYTES = 64 * 1024
+MIN_PREFIX_BYTES = 4 * 1024 * 1024
+DEFAULT_CACHE_DIR = os.environ.get(
+    "VISUAL_INSIGHT_CACHE", os.path.join(tempfile.gettempdir(), "visual_insight", "uploads"))
+
+# Containers whose prefix is decodable on its own: MP4 with the moov atom up
+# front (faststart) or fragmented, MPEG-TS, and Matroska/WebM.
+STREAMABLE_CONTAINERS = {"mp4-faststart", "mp4-fragmented", "mpegts", "matroska"}
+COMPLETE_SUFFIX = ".complete"
+
+def mark_complete(path: str):
+    """Tell tail-mode readers (possibly in another process) that `path` will not grow any more."""
+    open(path + COMPLETE_SUFFIX, "w").close()
+
+def is_marked_complete(path: str) -> bool:
+    return os.path.exists(path + COMPLETE_SUFFIX)
+
+def remove_partial(path: str):
+    for p in (path, path + COMPLETE_SUFFIX):
+        try:
+            os.remove(p)
+        except OSError:
+            pass
+
+def sniff_container(head: bytes) -> str:
+    """Identify the container from the first bytes of a file."""
+    if head[:4] == b"\x1a\x45\xdf\xa3":
+        return "matroska"
+    if len(head) >= 377 and head[0] == head[188] == head[376] == 0x47:
+        return "mpegts"
+    if head[:4] == b"RIFF" and head[8:12] == b"AVI ":
+        return "avi"
+    if head[4:8] not in (b"ftyp", b"moov", b"free", b"wide", b"mdat", b"skip"):
+        return "unknown"
+    # Walk the top-level boxes: whichever of moov/moof/mdat comes first decides
+    # whether playback can begin before the file is complete.
+    offset = 0
+    while offset + 8 <= len(head):
+        size, kind = struct.unpack(">I4s", head[offset:offset + 8])
+        if size == 1 and offset + 16 <= len(head):
+            size = struct.unpack(">Q", head[offset + 8:offset + 16])[0]
+        if kind == b"moov":
+            return "mp4-fragmented" if b"mvex" in head[offset:offset + size] else "mp4-faststart"
+        if kind == b"moof":
+            return "mp4-fragmented"
+        if kind == b"mdat" or size < 8:
+            return "mp4"
+        offset += size
+    return "mp4"
+
+class IngestWriter:
+    """Streams one upload to disk, hashing it as chunks arrive.
+
+    The file is written under the ingestor's tmp dir and moved to its
+    content-addressed location on `close()`. If `on_prefix` is given it is
+    called once with `(partial_path, bytes_written)` as soon as a streamable
+    container has `min_prefix_bytes` on disk, so analysis can begin while the
+    rest of the upload is still arriving.
+    """
+
+    def __init__(self, ingestor, filename: str, on_prefix=None, min_prefix_bytes: int = MIN_PREFIX_BYTES):
+        self.ingestor = ingestor
+        self.filename = filename
+        self.ext = os.path.splitext(filename)[1].lower() or ".bin"
+        self.partial_path = os.path.join(ingestor.tmp_dir, generate_id() + self.ext)
+        self.file = open(self.partial_path, "wb")
+        self.hash = hashlib.sha256()
+        self.size = 0
+        self.head = b""
+        self.container = None
+        self.on_prefix = on_prefix
+        self.min_prefix_bytes = min_prefix_bytes
+        self.prefix_started = False
+
+    @property
+    def streamable(self) -> bool:
+        return self.container in STREAMABLE_CONTAINERS
+
+    def write(self, data: bytes):
+        self.file.write(data)
+        self.hash.update(data)
+        self.size += len(data)
+        if self.container is None:
+            self.head += bytes(data[:SNIFF_BYTES - len(self.head)])
+            if len(self.head) >= SNIFF_BYTES:
+                self.container = sniff_container(self.head)
+        if (self.on_prefix is not None and not self.prefix_started and self.streamable
+                and self.size >= self.min_prefix_bytes):
+            self.prefix_started = True
+            # Readers open the file by path, so what has been written must be visible
+            self.file.flush()
+            self.on_prefix(self.partial_path, self.size)
+
+    def close(self) -> dict:
+        self.file.close()
+        if self.container is None:
+            self.container = sniff_container(self.head)
+        sha256 = self.hash.hexdigest()
+        path = self.ingestor.source_path(sha256, self.ext)
+        cached = os.path.exists(path)
+        if not cached:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        if self.prefix_started:
+            # A prefix reader may still have the partial file open, so leave it
+            # in place (the caller discards it) and link the finished bytes in.
+            if not cached:
+                try:
+                    os.link(self.partial_path, path)
+                except OSError:
+                    shutil.copyfile(self.partial_path, path)
+            mark_complete(self.partial_path)
+        elif cached:
+            os.remove(self.partial_path)
+        else:
+            os.replace(self.partial_path, path)
+        if cached:
+            logger.info("Upload %s already ingested as %s", self.filename, sha256[:12])
+        return {"path": path, "sha256": sha256, "size": self.size, "container": self.container,
+                "streamable": self.streamable, "cached": cached, "name": self.filename,
+                "partial_path": self.partial_path if self.prefix_started else None}
+
+    def abort(self):
+        self.file.close()
+        remove_partial(self.partial_path)
+
+class Ingestor:
+    """Content-addressed store for uploaded videos and their analysis outputs.
+
+    Layout: `<root>/objects/<sha[:2]>/<sha>/source<ext>` with one output dir per
+    pipeline and settings next to it, so re-uploading the same bytes finds the finished
+    analysis instead of running it again.
+    """
+
+    def __init__(self, root: str = DEFAULT_CACHE_DIR):
+        self.root = os.path.abspath(root)
+        self.tmp_dir = os.path.join(self.root, "tmp")
+        os.makedirs(self.tmp_dir, exist_ok=True)
+
+    def object_dir(self, sha256: str) -> str:
+        return os.path.join(self.root, "objects", sha256[:2], sha256)
+
+    def source_path(self, sha256: str, ext: str = ".mp4") -> str:
+        return os.path.join(self.object_dir(sha256), "source" + ext)
+
+    def output_dir(self, sha256: str, pipeline: str = "pro", options: dict = None) -> str:
+        # Settings that change the analysis are part of the key as well as the bytes
+        settings = json.dumps(options or {}, sort_keys=True, default=str)
+        return os.path.join(self.object_dir(sha256), f"{pipeline}-{hashlib.sha1(settings.encode()).hexdigest()[:8]}")
+
+    def writer(self, filename: str, on_prefix=None, min_prefix_bytes: int = MIN_PREFIX_BYTES) -> IngestWriter:
+        return IngestWriter(self, filename, on_prefix, min_prefix_bytes)
+
+    def ingest(self, fileobj, filename: str, on_prefix=None, chunk_size: int = CHUNK_SIZE) -> dict:
+        """Copy a readable file object (e.g. a Streamlit UploadedFile) into the store."""
+        writer = self.writer(filename, on_prefix)
+        if hasattr(fileobj, "seek"):
+            fileobj.seek(0)
+        try:
+            while True:
+                chunk = fileobj.read(chunk_size)
+                if not chunk:
+                    break
+                writer.write(chunk)
+        except BaseException:
+            writer.abort()
+            raise
+        return writer.close()
+
+    def discard_partial(self, result: dict):
+        """Remove the partial file kept for a prefix reader once it is done with it."""
+        if result.get("partial_path"):
+            remove_partial(result["partial_path"])
@@ -1,6 +1,9 @@
 import cv2
 import os
 from project.modules.utils import timeit, setup_logger
+from project.modules.video_probe import probe_video
+from project.modules.tracing import current_span
+from project.modules.thumbnails import write_thumbnail
 from tqdm import tqdm
 
 logger = setup_logger(__name__)
@@ -13,8 +16,8 @@ class KeyframeExtractor:
 
     @timeit
     def extract_keyframes(self, video_path: str, scenes: list):
+        fps = probe_video(video_path)['fps'] or 25
         cap = cv2.VideoCapture(video_path)
-        fps = cap.get(cv2.CAP_PROP_FPS) or 25
         results = []
         for i, (start, end) in enumerate(tqdm(scenes, desc="Extracting keyframes")):
             mid = (start + end) / 2.0
@@ -26,6 +29,8 @@ class KeyframeExtractor:
                 continue
             outpath = os.path.join(self.storyboard_dir, f"scene_{i:03d}.jpg")
             cv2.imwrite(outpath, frame)
-            results.append({"scene_idx": i, "start": start, "end": end, "frame_path": outpath, "timestamp": mid})
+            results.append({"scene_idx": i, "start": start, "end": end, "frame_path": outpath, "timestamp": mid,
+                            "thumb_path": write_thumbnail(frame, outpath)})
         cap.release()
+        current_span().count(frames=len(results))
         return results
@@ -1,17 +1,41 @@
 import re
-import torch
-from project.modules.utils import setup_logger, timeit
+import numpy as np
+from project.modules.utils import setup_logger, timeit, resolve_device
+from project.modules.tracing import current_span
+from project.modules.detections import from_dicts, class_ids, select, to_dicts
 from tqdm import tqdm
 
 logger = setup_logger(__name__)
 
+WEAPON_LABELS = {'knife', 'gun', 'pistol', 'revolver', 'rifle'}
+# Weapons are flagged strictly above this confidence
+WEAPON_CONF = 0.4
+# Zero-shot CLIP categories; each frame's softmax over all prompts (neutral ones
+# included) is summed per category
+ZERO_SHOT_PROMPTS = {
+    "violence": ["a photo of people fighting", "a photo of a violent attack", "a photo of someone being beaten"],
+    "gore": ["a photo of blood and gore", "a photo of a bloody wound", "a photo of a dead body"],
+    "nudity": ["a photo of a naked person", "an explicit nude photo"],
+    "drugs": ["a photo of illegal drugs", "a photo of someone injecting drugs", "a photo of drug paraphernalia"],
+    "self_harm": ["a photo of self-harm", "a photo of cuts on a wrist", "a photo of a person hurting themselves"],
+}
+NEUTRAL_PROMPTS = ["a photo", "an ordinary everyday scene", "a photo of people talking", "a photo of a landscape",
+                   "a photo of a room", "a screenshot of text", "a photo of food", "a photo of a street"]
+ZERO_SHOT_THRESHOLD = 0.5
+# CLIP's learned temperature
+LOGIT_SCALE = 100.0
 PROFANITY = {"fuck", "shit", "bitch", "asshole", "cunt", "dick", "pussy", "nigger", "faggot", "slut", "whore"}
 
 class Moderator:
-    def __init__(self, use_gpu: bool = False):
-        self.device = "cuda" if use_gpu and torch.cuda.is_available() else "cpu"
+    def __init__(self, use_gpu: bool = False, text_encoder=None):
+        self.device = resolve_device(use_gpu)
         logger.info(f"Initializing Moderator on device: {self.device}")
         self.nudenet = None
+        # Callable mapping prompts to L2-normalised CLIP text embeddings
+        # (DetectorCaptioner.encode_text); without it the zero-shot head is off
+        self.text_encoder = text_encoder
+        self.prompt_embeddings = None
+        self.prompt_categories = None
 
     def _load_model(self):
         if self.nudenet is None:
@@ -25,44 +49,111 @@ class Moderator:
             except Exception as e:
                 logger.error(f"Failed to load NudeNet model: {e}")
                 self.nudenet = "unavailable"
+        self._load_prompts()
+
+    def _load_prompts(self):
+        if self.prompt_embeddings is None and self.text_encoder is not None:
+            prompts = [(c, p) for c, ps in ZERO_SHOT_PROMPTS.items() for p in ps] + [(None, p) for p in NEUTRAL_PROMPTS]
+            try:
+                embeddings = np.asarray(self.text_encoder([p for _, p in prompts]), dtype=np.float32)
+            except Exception as e:
+                logger.error(f"Failed to encode moderation prompts, zero-shot moderation is off: {e}")
+                self.text_encoder = None
+                return
+            # (prompts, categories) one-hot, so category probabilities are one more matmul
+            categories = list(ZERO_SHOT_PROMPTS)
+            onehot = np.zeros((len(prompts), len(categories)), dtype=np.float32)
+            for row, (category, _) in enumerate(prompts):
+                if category is not None:
+                    onehot[row, categories.index(category)] = 1.0
+            self.prompt_embeddings, self.prompt_categories = embeddings, (categories, onehot)
 
     @timeit
-    def moderate(self, det_results: list, speech_segments: list):
+    def moderate(self, det_results: list, speech_segments: list, boxes=None, class_names: dict = None,
+                 tracks: list = None, frames: list = None, embeddings=None):
+        """`boxes` is the structured detections array; without it the frames' box dicts are used.
+        `tracks` come from a dense scan and are flagged with their start and end times; `frames`
+        are the extra frames it sampled ({scene_idx, timestamp, frame_path}), checked for NSFW too.
+        `embeddings` are the frames' CLIP image embeddings, one row per frame (default: the
+        frames' `clip_embedding`); they are scored against the zero-shot prompts."""
         self._load_model()
-        image_flags = self._moderate_images(det_results)
+        current_span().count(frames=len(det_results) + len(frames or []), segments=len(speech_segments))
+        image_flags = self._moderate_images(det_results, boxes, class_names, frames or [])
+        zero_shot_flags, zero_shot_max = self._moderate_zero_shot(det_results, embeddings)
+        image_flags.extend(zero_shot_flags)
         text_flags = self._moderate_text(speech_segments)
+        track_flags = self._moderate_tracks(tracks or [])
         report = {
             "image_flags": image_flags, 
             "text_flags": text_flags,
+            "track_flags": track_flags,
             "summary": {
                 "image_flags_count": len(image_flags),
                 "text_flags_count": len(text_flags),
-                "has_nsfw_content": any(f['reason'] == 'nsfw' for f in image_flags),
-                "has_violence_content": any(f['reason'] == 'violence_keyword' for f in image_flags),
-                "has_profanity": len(text_flags) > 0
+                "track_flags_count": len(track_flags),
+                "has_nsfw_content": any(f['reason'] in ('nsfw', 'nudity') for f in image_flags),
+                "has_violence_content": any(f['reason'] in ('violence_keyword', 'violence', 'gore') for f in image_flags)
+                                        or bool(track_flags),
+                "has_drug_content": any(f['reason'] == 'drugs' for f in image_flags),
+                "has_self_harm_content": any(f['reason'] == 'self_harm' for f in image_flags),
+                "has_profanity": len(text_flags) > 0,
+                "zero_shot_max": zero_shot_max
             }
         }
         return report
 
-    def _moderate_images(self, det_results: list):
+    def _moderate_images(self, det_results: list, boxes=None, class_names: dict = None, frames: list = ()):
         image_flags = []
         if self.nudenet and self.nudenet != "unavailable":
-            image_paths = [r["frame_path"] for r in det_results]
+            checked = list(det_results) + list(frames)
+            image_paths = [r["frame_path"] for r in checked]
             try:
                 nude_results = self.nudenet.detect(image_paths)
                 for i, res in enumerate(nude_results):
                     nsfw_detections = [d for d in res['preds'] if d['class'] in ['EXPOSED_ANUS', 'EXPOSED_BREAST_F', 'EXPOSED_GENITALIA_F', 'EXPOSED_GENITALIA_M']]
                     if nsfw_detections:
-                        image_flags.append({"scene_idx": det_results[i]["scene_idx"], "timestamp": det_results[i]["timestamp"], "reason": "nsfw", "details": nsfw_detections})
+                        image_flags.append({"scene_idx": checked[i]["scene_idx"], "timestamp": checked[i]["timestamp"], "reason": "nsfw", "details": nsfw_detections})
             except Exception as e:
                 logger.error(f"NudeNet detection failed: {e}")
-        weapon_labels = {'knife', 'gun', 'pistol', 'revolver', 'rifle'}
-        for r in det_results:
-            for d in r.get("detections", []):
-                if d.get("class_name") in weapon_labels and d.get("conf", 0) > 0.4:
-                    image_flags.append({"scene_idx": r["scene_idx"], "timestamp": r["timestamp"], "reason": "violence_keyword", "details": d})
+        if boxes is None:
+            boxes = from_dicts(det_results)
+            class_names = {d["class_id"]: d["class_name"] for r in det_results for d in r.get("detections") or []}
+        weapons = select(boxes, class_ids(class_names, WEAPON_LABELS), min_conf=WEAPON_CONF, exclusive=True)
+        for row, details in zip(weapons, to_dicts(weapons, class_names)):
+            r = det_results[int(row["frame_idx"])]
+            image_flags.append({"scene_idx": r["scene_idx"], "timestamp": r["timestamp"], "reason": "violence_keyword", "details": details})
         return image_flags
 
+    def _moderate_zero_shot(self, det_results: list, embeddings=None):
+        """Flags from one (frames x prompts) matmul against the keyframes' existing CLIP embeddings."""
+        self._load_prompts()
+        if self.prompt_embeddings is None or not det_results:
+            return [], {}
+        if embeddings is None:
+            if any(r.get("clip_embedding") is None for r in det_results):
+                return [], {}
+            embeddings = [r["clip_embedding"] for r in det_results]
+        if len(embeddings) != len(det_results):
+            return [], {}
+        image = np.array(embeddings, dtype=np.float32)
+        image /= np.maximum(np.linalg.norm(image, axis=1, keepdims=True), 1e-12)
+        logits = LOGIT_SCALE * (image @ self.prompt_embeddings.T)
+        probs = np.exp(logits - logits.max(axis=1, keepdims=True))
+        probs /= probs.sum(axis=1, keepdims=True)
+        categories, onehot = self.prompt_categories
+        scores = probs @ onehot
+        flags = []
+        for i, c in zip(*np.nonzero(scores >= ZERO_SHOT_THRESHOLD)):
+            r = det_results[int(i)]
+            flags.append({"scene_idx": r["scene_idx"], "timestamp": r["timestamp"], "reason": categories[c],
+                          "source": "clip", "score": round(float(scores[i, c]), 4)})
+        return flags, {c: round(float(v), 4) for c, v in zip(categories, scores.max(axis=0))}
+
+    def _moderate_tracks(self, tracks: list):
+        return [{"start": t["start"], "end": t["end"], "reason": "violence_track", "track_id": t["track_id"],
+                 "class_name": t["class_name"], "max_conf": t["max_conf"]}
+                for t in tracks if t.get("class_name") in WEAPON_LABELS and t.get("max_conf", 0) > WEAPON_CONF]
+
     def _moderate_text(self, speech_segments: list):
         text_flags = []
         for seg in speech_segments:
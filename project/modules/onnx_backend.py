@@ -0,0 +1,162 @@
+"""ONNX Runtime CPU backend for the DetectorCaptioner vision models.
+
+YOLOv8, the CLIP image tower and the BLIP vision encoder are exported once to
+`<cache_dir>/<name>.onnx` and reused by every later process. A cached graph
+decides the detections and embeddings, so the default cache is per user, and
+files that another user owns or could have written are exported again. Sessions run on
+the CPU provider with explicit intra/inter-op thread counts. YOLO's letterbox,
+decoding and NMS are done here, so detections come out as the same structured
+rows `from_yolo` produces.
+"""
+import os
+import cv2
+import numpy as np
+from project.modules.detections import DETECTION_DTYPE, empty
+from project.modules.utils import setup_logger, user_cache_dir, is_private
+
+logger = setup_logger(__name__)
+
+DEFAULT_ONNX_DIR = os.environ.get("VISUAL_INSIGHT_ONNX", user_cache_dir("onnx"))
+OPSET = 17
+YOLO_SIZE = 640
+# ultralytics predict() defaults, so both backends keep the same boxes
+YOLO_CONF = 0.25
+YOLO_IOU = 0.7
+YOLO_MAX_DET = 300
+
+def session_options(intra_threads: int = 0, inter_threads: int = 1):
+    import onnxruntime as ort
+    opts = ort.SessionOptions()
+    opts.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+    # 0 lets ONNX Runtime use one thread per physical core
+    opts.intra_op_num_threads = intra_threads or 0
+    opts.inter_op_num_threads = max(1, inter_threads)
+    opts.execution_mode = ort.ExecutionMode.ORT_PARALLEL if inter_threads > 1 else ort.ExecutionMode.ORT_SEQUENTIAL
+    return opts
+
+def letterbox(frame: np.ndarray, size: int = YOLO_SIZE):
+    """Resize keeping aspect ratio and pad to a square with grey 114, as ultralytics does."""
+    h, w = frame.shape[:2]
+    gain = min(size / h, size / w)
+    nh, nw = int(round(h * gain)), int(round(w * gain))
+    top, left = (size - nh) // 2, (size - nw) // 2
+    canvas = np.full((size, size, 3), 114, dtype=np.uint8)
+    canvas[top:top + nh, left:left + nw] = cv2.resize(frame, (nw, nh), interpolation=cv2.INTER_LINEAR)
+    return canvas, (w, h, gain, left, top)
+
+def yolo_inputs(frames: list, size: int = YOLO_SIZE):
+    """BGR frames -> (N, 3, size, size) float32 RGB batch plus what is needed to undo the letterbox."""
+    boxed = [letterbox(f, size) for f in frames]
+    batch = np.stack([b for b, _ in boxed])[..., ::-1].transpose(0, 3, 1, 2)
+    return np.ascontiguousarray(batch, dtype=np.float32) / 255.0, [m for _, m in boxed]
+
+def yolo_rows(output: np.ndarray, metas: list, first_frame: int = 0, conf: float = YOLO_CONF,
+              iou: float = YOLO_IOU, max_det: int = YOLO_MAX_DET) -> np.ndarray:
+    """Decode YOLOv8 output (N, 4 + classes, anchors) into detection rows with per-class NMS."""
+    rows = []
+    for i, (pred, (w, h, gain, left, top)) in enumerate(zip(output, metas)):
+        pred = pred.T
+        cls = pred[:, 4:].argmax(axis=1)
+        score = pred[np.arange(len(pred)), 4 + cls]
+        keep = score > conf
+        pred, cls, score = pred[keep], cls[keep], score[keep]
+        if not len(pred):
+            continue
+        xywh = np.column_stack([pred[:, 0] - pred[:, 2] / 2, pred[:, 1] - pred[:, 3] / 2, pred[:, 2], pred[:, 3]])
+        picked = cv2.dnn.NMSBoxesBatched(xywh.tolist(), score.tolist(), cls.tolist(), conf, iou)
+        picked = np.asarray(picked, dtype=np.int64).reshape(-1)
+        picked = picked[np.argsort(-score[picked], kind="stable")][:max_det]
+        xyxy = np.column_stack([xywh[picked, 0], xywh[picked, 1],
+                                xywh[picked, 0] + xywh[picked, 2], xywh[picked, 1] + xywh[picked, 3]])
+        xyxy = (xyxy - [left, top, left, top]) / gain
+        out = np.zeros(len(picked), dtype=DETECTION_DTYPE)
+        out["frame_idx"] = first_frame + i
+        out["xyxyn"] = np.clip(xyxy, 0, [w, h, w, h]) / [w, h, w, h]
+        out["conf"] = score[picked]
+        out["cls"] = cls[picked]
+        rows.append(out)
+    return np.concatenate(rows) if rows else empty()
+
+class OnnxBackend:
+    """Lazily exported, cached ONNX sessions for the vision models of DetectorCaptioner."""
+
+    def __init__(self, cache_dir: str = DEFAULT_ONNX_DIR, intra_threads: int = 0, inter_threads: int = 1):
+        self.cache_dir = cache_dir
+        self.intra_threads = intra_threads
+        self.inter_threads = inter_threads
+        self.sessions = {}
+
+    def set_threads(self, intra_threads: int, inter_threads: int = 1):
+        """Thread counts are fixed per session, so open sessions are rebuilt on next use."""
+        if (intra_threads, inter_threads) != (self.intra_threads, self.inter_threads):
+            self.intra_threads, self.inter_threads = intra_threads, inter_threads
+            self.sessions.clear()
+
+    def path(self, name: str) -> str:
+        return os.path.join(self.cache_dir, f"{name}.onnx")
+
+    def session(self, name: str, export):
+        """The session for `name`, calling `export(path)` first if the model is not cached yet."""
+        if name not in self.sessions:
+            import onnxruntime as ort
+            path = self.path(name)
+            cached = os.path.exists(path)
+            if cached and not is_private(path):
+                logger.warning("Ignoring ONNX cache %s: not private to this user", path)
+                cached = False
+            if not cached:
+                os.makedirs(self.cache_dir, mode=0o700, exist_ok=True)
+                tmp = f"{path}.tmp{os.getpid()}"
+                logger.info("Exporting %s to ONNX...", name)
+                export(tmp)
+                os.replace(tmp, path)
+            self.sessions[name] = ort.InferenceSession(path, session_options(self.intra_threads, self.inter_threads),
+                                                       providers=["CPUExecutionProvider"])
+        return self.sessions[name]
+
+    def detect(self, yolo_model, frames: list, first_frame: int = 0) -> np.ndarray:
+        """YOLO on decoded BGR frames; same rows as `from_yolo` on the torch model's results."""
+        def export(path):
+            exported = yolo_model.export(format="onnx", imgsz=YOLO_SIZE, dynamic=True, opset=OPSET)
+            os.replace(exported, path)
+
+        session = self.session("yolov8n", export)
+        batch, metas = yolo_inputs(frames)
+        output = session.run(None, {session.get_inputs()[0].name: batch})[0]
+        return yolo_rows(output, metas, first_frame)
+
+    def clip_image(self, clip_model, pixel_values: np.ndarray) -> np.ndarray:
+        """`CLIPModel.get_image_features` for preprocessed pixel values."""
+        def export(path):
+            _export_vision(clip_model, lambda m, x: m.get_image_features(pixel_values=x),
+                           clip_model.config.vision_config.image_size, path)
+
+        session = self.session("clip-vit-base-patch32-image", export)
+        return session.run(None, {"pixel_values": pixel_values.astype(np.float32)})[0]
+
+    def blip_image(self, blip_model, pixel_values: np.ndarray) -> np.ndarray:
+        """Last hidden state of the BLIP vision encoder, which the text decoder cross-attends to."""
+        def export(path):
+            _export_vision(blip_model, lambda m, x: m.vision_model(pixel_values=x)[0],
+                           blip_model.config.vision_config.image_size, path)
+
+        session = self.session("blip-image-captioning-base-vision", export)
+        return session.run(None, {"pixel_values": pixel_values.astype(np.float32)})[0]
+
+def _export_vision(model, forward, image_size: int, path: str):
+    import torch
+
+    class Wrapper(torch.nn.Module):
+        def __init__(self):
+            super().__init__()
+            self.model = model
+
+        def forward(self, pixel_values):
+            return forward(self.model, pixel_values)
+
+    wrapper = Wrapper().eval()
+    dummy = torch.zeros(1, 3, image_size, image_size)
+    with torch.no_grad():
+        torch.onnx.export(wrapper, (dummy,), path, input_names=["pixel_values"], output_names=["features"],
+                          dynamic_axes={"pixel_values": {0: "batch"}, "features": {0: "batch"}},
+                          opset_version=OPSET)
@@ -0,0 +1,159 @@
+import cv2
+import numpy as np
+from project.modules.utils import setup_logger, timeit
+from project.modules.tracing import current_span
+
+logger = setup_logger(__name__)
+
+BLOCK = 8
+
+def _sharpness(batch: np.ndarray) -> np.ndarray:
+    lap = (batch[:, :-2, 1:-1] + batch[:, 2:, 1:-1] + batch[:, 1:-1, :-2] + batch[:, 1:-1, 2:]
+           - 4.0 * batch[:, 1:-1, 1:-1])
+    return lap.reshape(len(batch), -1).var(axis=1)
+
+def _noise(batch: np.ndarray) -> np.ndarray:
+    # Immerkaer's fast noise variance estimate: the [1 -2 1] x [1 -2 1] kernel cancels
+    # image structure up to second order, leaving mostly sensor/compression noise.
+    rows = batch[:, :, :-2] - 2.0 * batch[:, :, 1:-1] + batch[:, :, 2:]
+    resp = rows[:, :-2] - 2.0 * rows[:, 1:-1] + rows[:, 2:]
+    h, w = resp.shape[1:]
+    return np.sqrt(np.pi / 2.0) * np.abs(resp).sum(axis=(1, 2)) / (6.0 * h * w)
+
+def _blockiness(crops: np.ndarray) -> np.ndarray:
+    # Ratio of the gradient across 8x8 block edges to the gradient inside blocks;
+    # ~1.0 for clean video, larger when DCT blocking is visible.
+    scores = []
+    for d in (np.abs(np.diff(crops, axis=2)), np.abs(np.diff(crops, axis=1)).transpose(0, 2, 1)):
+        edge = (np.arange(d.shape[2]) + 1) % BLOCK == 0
+        inner = d[:, :, ~edge].mean(axis=(1, 2))
+        scores.append(d[:, :, edge].mean(axis=(1, 2)) / (inner + 1e-6))
+    return (scores[0] + scores[1]) / 2.0
+
+def _center(gray: np.ndarray, size: int) -> np.ndarray:
+    h, w = gray.shape
+    c = min(size, h - h % BLOCK, w - w % BLOCK)
+    y0, x0 = (h - c) // 2 // BLOCK * BLOCK, (w - c) // 2 // BLOCK * BLOCK
+    return gray[y0:y0 + c, x0:x0 + c]
+
+class QualityProfiler:
+    """Per-frame quality metrics on frames sampled across the whole video.
+
+    Brightness and noise are measured on frames downscaled to `max_side`.
+    Sharpness and blockiness need the native pixel grid: downscaling raises
+    the Laplacian variance and moves the 8x8 block edges. They are measured on
+    native-resolution centre crops instead, so sharpness stays comparable with
+    the full-resolution keyframe thresholds.
+    """
+
+    def __init__(self, num_samples: int = 120, max_side: int = 360, crop_size: int = 128,
+                 sharpness_size: int = 512, segment_seconds: float = 10.0, batch_size: int = 32,
+                 seek_gap: int = 250):
+        self.num_samples = num_samples
+        self.max_side = max_side
+        self.crop_size = crop_size - crop_size % BLOCK
+        self.sharpness_size = sharpness_size - sharpness_size % BLOCK
+        self.segment_seconds = segment_seconds
+        self.batch_size = batch_size
+        self.seek_gap = seek_gap
+
+    def _target_frames(self, frame_count: int) -> np.ndarray:
+        n = max(1, min(self.num_samples, frame_count))
+        return np.unique(np.linspace(0, max(frame_count - 1, 0), num=n).astype(np.int64))
+
+    def _prepare(self, frame: np.ndarray):
+        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        h, w = gray.shape
+        crop = _center(gray, self.crop_size)
+        detail = _center(gray, self.sharpness_size)
+        scale = self.max_side / float(max(h, w))
+        if scale < 1.0:
+            gray = cv2.resize(gray, (max(3, int(w * scale)), max(3, int(h * scale))), interpolation=cv2.INTER_AREA)
+        return gray, crop, detail
+
+    def _measure(self, frames: list, crops: list, details: list) -> dict:
+        batch = np.stack(frames).astype(np.float32)
+        metrics = {
+            "sharpness": _sharpness(np.stack(details).astype(np.float32)),
+            "brightness": batch.mean(axis=(1, 2)),
+            "noise": _noise(batch),
+        }
+        if crops[0].shape[0] >= 2 * BLOCK:
+            metrics["blockiness"] = _blockiness(np.stack(crops).astype(np.float32))
+        else:
+            metrics["blockiness"] = np.ones(len(frames), dtype=np.float32)
+        return metrics
+
+    def _segments(self, times: np.ndarray, metrics: dict, duration: float, scenes: list = None) -> list:
+        if scenes:
+            bounds = np.array([float(s) for s, _ in scenes] + [float(scenes[-1][1])])
+        else:
+            n = max(1, int(np.ceil(duration / self.segment_seconds)))
+            bounds = np.linspace(0.0, max(duration, times[-1] if len(times) else 0.0), n + 1)
+        idx = np.clip(np.searchsorted(bounds, times, side="right") - 1, 0, len(bounds) - 2)
+        counts = np.bincount(idx, minlength=len(bounds) - 1)
+        means = {k: np.bincount(idx, weights=v, minlength=len(bounds) - 1) / np.maximum(counts, 1)
+                 for k, v in metrics.items()}
+        timeline = []
+        for i in np.flatnonzero(counts):
+            entry = {"start": round(float(bounds[i]), 3), "end": round(float(bounds[i + 1]), 3), "samples": int(counts[i])}
+            entry.update({k: round(float(v[i]), 3) for k, v in means.items()})
+            timeline.append(entry)
+        return timeline
+
+    @timeit
+    def profile(self, video_path: str, fps: float = 0.0, frame_count: int = 0, scenes: list = None) -> dict:
+        cap = cv2.VideoCapture(video_path)
+        fps = fps or cap.get(cv2.CAP_PROP_FPS) or 25.0
+        frame_count = frame_count or int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+        targets = self._target_frames(frame_count)
+        metrics = {"sharpness": [], "brightness": [], "noise": [], "blockiness": []}
+        sampled = []
+        frames, crops, details = [], [], []
+
+        def flush():
+            for k, v in self._measure(frames, crops, details).items():
+                metrics[k].append(v)
+            frames.clear()
+            crops.clear()
+            details.clear()
+
+        # Single forward pass: grab() walks short gaps, a seek only happens for long gaps.
+        pos = 0
+        for target in targets:
+            if target - pos > self.seek_gap:
+                cap.set(cv2.CAP_PROP_POS_FRAMES, int(target))
+                pos = int(target)
+            ok = True
+            while pos < target and ok:
+                ok = cap.grab()
+                pos += 1
+            ok, frame = cap.read() if ok else (False, None)
+            pos += 1
+            if not ok:
+                break
+            gray, crop, detail = self._prepare(frame)
+            if frames and (gray.shape != frames[0].shape or detail.shape != details[0].shape):
+                flush()
+            frames.append(gray)
+            crops.append(crop)
+            details.append(detail)
+            sampled.append(target)
+            if len(frames) >= self.batch_size:
+                flush()
+        if frames:
+            flush()
+        cap.release()
+
+        if not sampled:
+            logger.warning("No frames could be decoded from %s", video_path)
+            return {"frames_sampled": 0, "timeline": []}
+        current_span().count(frames=len(sampled))
+        metrics = {k: np.concatenate(v) for k, v in metrics.items()}
+        times = np.asarray(sampled, dtype=np.float64) / fps
+        duration = frame_count / fps if frame_count else float(times[-1])
+        summary = {f"avg_{k}": round(float(v.mean()), 3) for k, v in metrics.items()}
+        summary["min_sharpness"] = round(float(metrics["sharpness"].min()), 3)
+        summary["frames_sampled"] = len(sampled)
+        summary["timeline"] = self._segments(times, metrics, duration, scenes)
+        return summary
@@ -0,0 +1,54 @@
+"""Dynamic int8 quantization of Linear layers for the CPU-bound text models.
+
+The quantized module is pickled whole to `<cache_dir>/<name>-int8-torch<version>.pt`,
+so later loads skip both the fp32 checkpoint and the quantization pass.
+Loading it unpickles arbitrary code, so the default cache is a private
+per-user directory rather than the shared temp dir. Files that another user
+owns or could have written are ignored.
+Which models run quantized is chosen per model, either by the caller or
+through `VISUAL_INSIGHT_QUANTIZE` (a comma-separated list such as
+"summarizer,transcriber").
+"""
+import os
+from project.modules.utils import setup_logger, user_cache_dir, is_private
+
+logger = setup_logger(__name__)
+
+DEFAULT_QUANT_DIR = os.environ.get("VISUAL_INSIGHT_QUANT", user_cache_dir("quantized"))
+QUANTIZABLE = ("summarizer", "transcriber")
+
+def wants_quantized(component: str, explicit: bool = None) -> bool:
+    if explicit is not None:
+        return explicit
+    names = os.environ.get("VISUAL_INSIGHT_QUANTIZE", "")
+    return component in {n.strip() for n in names.split(",")}
+
+def quantize_linear(model):
+    """Linear layers to int8 weights with per-batch activation scales; the rest stays fp32."""
+    import torch
+    return torch.ao.quantization.quantize_dynamic(model.to("cpu").eval(), {torch.nn.Linear}, dtype=torch.qint8)
+
+def cached_path(name: str, cache_dir: str = DEFAULT_QUANT_DIR) -> str:
+    import torch
+    # Pickled quantized modules are only guaranteed to load in the torch that wrote them
+    return os.path.join(cache_dir, f"{name}-int8-torch{torch.__version__.split('+')[0]}.pt")
+
+def load_quantized(name: str, build, cache_dir: str = DEFAULT_QUANT_DIR):
+    """The quantized model from the cache, or `quantize_linear(build())` saved there first."""
+    import torch
+    path = cached_path(name, cache_dir)
+    if os.path.exists(path) and not is_private(path):
+        logger.warning("Ignoring quantized cache %s: not private to this user", path)
+    elif os.path.exists(path):
+        try:
+            logger.info("Loading int8 %s from %s", name, path)
+            return torch.load(path, map_location="cpu", weights_only=False)
+        except Exception as e:
+            logger.warning("Ignoring unreadable quantized cache %s: %s", path, e)
+    logger.info("Quantizing %s to int8...", name)
+    model = quantize_linear(build())
+    os.makedirs(cache_dir, mode=0o700, exist_ok=True)
+    tmp = f"{path}.tmp{os.getpid()}"
+    torch.save(model, tmp)
+    os.replace(tmp, path)
+    return model
@@ -0,0 +1,132 @@
+"""Frame selection policies for the dense scan.
+
+A sampler sees every probed frame as a small greyscale thumbnail during the
+decode pass and decides whether the models get the full frame.
+"""
+import cv2
+import numpy as np
+
+THUMB_SIZE = (64, 36)
+# Motion below `low` counts as static, above `high` as fast, per scoring method
+MOTION_RANGES = {"diff": (1.5, 12.0), "flow": (0.05, 0.8)}
+
+def motion_thumb(frame) -> np.ndarray:
+    return cv2.resize(cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY), THUMB_SIZE, interpolation=cv2.INTER_AREA)
+
+def motion_score(prev: np.ndarray, small: np.ndarray, method: str = "diff") -> float:
+    """Mean abs grey-level difference, or mean Farneback flow magnitude in thumbnail pixels."""
+    if prev is None:
+        return 0.0
+    if method == "flow":
+        flow = cv2.calcOpticalFlowFarneback(prev, small, None, 0.5, 2, 9, 2, 5, 1.1, 0)
+        return float(np.linalg.norm(flow, axis=2).mean())
+    return float(cv2.absdiff(small, prev).mean())
+
+class FixedRateSampler:
+    """Every probed frame at `fps`, except ones nearly identical to the last selected frame."""
+
+    def __init__(self, fps: float = 2.0, diff_threshold: float = 2.0):
+        self.probe_fps = fps
+        self.diff_threshold = diff_threshold
+        self.reset()
+
+    def reset(self, duration: float = 0.0):
+        self.reference = None
+        self.probed = 0
+        self.selected = 0
+
+    def offer(self, t: float, small: np.ndarray) -> bool:
+        self.probed += 1
+        if self.reference is not None and motion_score(self.reference, small) < self.diff_threshold:
+            return False
+        self.reference = small
+        self.selected += 1
+        return True
+
+    def stats(self) -> dict:
+        return {"policy": "fixed", "fps": self.probe_fps, "probed": self.probed, "selected": self.selected}
+
+class AdaptiveSampler:
+    """Motion-gated sampling under a per-video frame budget.
+
+    The target rate moves between `min_fps` in static footage and `max_fps` in
+    fast motion. A token bucket refilled at `budget / duration` caps the total;
+    tokens saved in static stretches (up to `burst * budget`) are spent when
+    motion picks up, so short events still get sampled densely.
+    """
+
+    def __init__(self, min_fps: float = 0.25, max_fps: float = 4.0, budget: int = 240, method: str = "diff",
+                 motion_range: tuple = None, burst: float = 0.2):
+        if method not in MOTION_RANGES:
+            raise ValueError(f"Unknown motion method '{method}', expected one of {tuple(MOTION_RANGES)}")
+        self.min_fps = min_fps
+        self.max_fps = max_fps
+        self.probe_fps = max_fps
+        self.budget = budget
+        self.method = method
+        self.low, self.high = motion_range or MOTION_RANGES[method]
+        self.capacity = max(1.0, burst * budget)
+        self.reset()
+
+    def reset(self, duration: float = 0.0):
+        self.duration = duration
+        self.fill_rate = (self.budget - 1) / duration if duration > 0 else float("inf")
+        self.tokens = 1.0
+        self.credit = 0.0
+        self.prev = None
+        self.last_t = None
+        self.times = []
+        self.probed = 0
+        self.budget_limited = 0
+        self.static_seconds = 0.0
+        self.high_seconds = 0.0
+        self.high_selected = 0
+
+    def rate(self, motion: float) -> float:
+        level = np.clip((motion - self.low) / max(self.high - self.low, 1e-9), 0.0, 1.0)
+        return self.min_fps + (self.max_fps - self.min_fps) * float(level)
+
+    def offer(self, t: float, small: np.ndarray) -> bool:
+        motion = motion_score(self.prev, small, self.method)
+        self.prev = small
+        self.probed += 1
+        dt = 0.0 if self.last_t is None else max(0.0, t - self.last_t)
+        first = self.last_t is None
+        self.last_t = t
+        self.credit = min(1.0, self.credit + self.rate(motion) * dt)
+        self.tokens = min(self.capacity, self.tokens + self.fill_rate * dt)
+        high = motion >= self.high
+        if high:
+            self.high_seconds += dt
+        elif motion <= self.low:
+            self.static_seconds += dt
+        if not (first or self.credit >= 1.0):
+            return False
+        if self.tokens < 1.0 or len(self.times) >= self.budget:
+            self.budget_limited += 1
+            return False
+        self.tokens -= 1.0
+        self.credit = 0.0
+        self.times.append(t)
+        self.high_selected += int(high)
+        return True
+
+    def stats(self) -> dict:
+        """Coverage of the selection: how much was sampled, where, and the longest blind spot."""
+        times = np.asarray(self.times)
+        edges = np.concatenate([[0.0], times, [max(self.duration, self.last_t or 0.0)]])
+        gaps = np.diff(edges) if len(edges) > 1 else np.zeros(1)
+        return {
+            "policy": "adaptive",
+            "method": self.method,
+            "budget": self.budget,
+            "probed": self.probed,
+            "selected": len(self.times),
+            "budget_limited": self.budget_limited,
+            "mean_fps": round(len(self.times) / self.duration, 3) if self.duration else None,
+            "max_gap": round(float(gaps.max()), 3),
+            "mean_gap": round(float(gaps.mean()), 3),
+            "static_seconds": round(self.static_seconds, 2),
+            "high_motion_seconds": round(self.high_seconds, 2),
+            "high_motion_fps": round(self.high_selected / self.high_seconds, 3) if self.high_seconds else None,
+        }
@@ -0,0 +1,180 @@
+import os
+import heapq
+import wave
+import numpy as np
+from project.modules.detections import counts_per_scene
+from project.modules.utils import setup_logger
+
+logger = setup_logger(__name__)
+
+DEFAULT_WEIGHTS = {"detections": 0.3, "speech": 0.25, "loudness": 0.2, "novelty": 0.25}
+
+def _normalize(values: np.ndarray) -> np.ndarray:
+    lo, hi = float(values.min()), float(values.max())
+    if hi - lo < 1e-9:
+        return np.zeros_like(values)
+    return (values - lo) / (hi - lo)
+
+def _coverage(intervals, starts: np.ndarray, ends: np.ndarray) -> np.ndarray:
+    # Seconds of each [start, end) window covered by the union of `intervals`,
+    # using a cumulative coverage function instead of a scenes x intervals matrix.
+    iv = sorted((float(s), float(e)) for s, e in intervals if e is not None and s is not None and e > s)
+    if not iv:
+        return np.zeros(len(starts))
+    merged = [list(iv[0])]
+    for s, e in iv[1:]:
+        if s <= merged[-1][1]:
+            merged[-1][1] = max(merged[-1][1], e)
+        else:
+            merged.append([s, e])
+    m = np.asarray(merged)
+    cum = np.concatenate([[0.0], np.cumsum(m[:, 1] - m[:, 0])])
+
+    def covered_until(t):
+        j = np.searchsorted(m[:, 0], t, side="right") - 1
+        inside = np.clip(t - m[np.maximum(j, 0), 0], 0.0, m[np.maximum(j, 0), 1] - m[np.maximum(j, 0), 0])
+        return np.where(j >= 0, cum[np.maximum(j, 0)] + inside, 0.0)
+
+    return covered_until(ends) - covered_until(starts)
+
+def _block_energy(audio_path: str, block_seconds: float = 0.1, chunk_blocks: int = 600):
+    # Mean-square energy per block, read in chunks so long recordings stay out of memory
+    with wave.open(audio_path, "rb") as wf:
+        if wf.getsampwidth() != 2:
+            raise ValueError("Only 16-bit PCM audio is supported")
+        channels, rate = wf.getnchannels(), wf.getframerate()
+        block = max(1, int(rate * block_seconds))
+        energies = []
+        while True:
+            raw = wf.readframes(block * chunk_blocks)
+            if not raw:
+                break
+            samples = np.frombuffer(raw, dtype=np.int16).astype(np.float32) / 32768.0
+            samples = samples.reshape(-1, channels).mean(axis=1)
+            n = len(samples) // block * block
+            if n:
+                energies.append(np.square(samples[:n]).reshape(-1, block).mean(axis=1))
+            if n < len(samples):
+                energies.append(np.array([np.square(samples[n:]).mean()], dtype=np.float32))
+    energy = np.concatenate(energies) if energies else np.zeros(0, dtype=np.float32)
+    return energy, block / float(rate)
+
+class SceneScorer:
+    def __init__(self, weights: dict = None, moderation_penalty: float = 1.0, diversity: float = 0.3):
+        self.weights = dict(DEFAULT_WEIGHTS, **(weights or {}))
+        self.moderation_penalty = moderation_penalty
+        self.diversity = diversity
+
+    def _loudness(self, audio_path: str, starts: np.ndarray, ends: np.ndarray) -> np.ndarray:
+        if not audio_path or not os.path.exists(audio_path):
+            return np.zeros(len(starts))
+        try:
+            energy, block_dur = _block_energy(audio_path)
+        except Exception as e:
+            logger.warning("Could not read audio energy from %s: %s", audio_path, e)
+            return np.zeros(len(starts))
+        if not len(energy):
+            return np.zeros(len(starts))
+        cum = np.concatenate([[0.0], np.cumsum(energy, dtype=np.float64)])
+        lo = np.clip((starts / block_dur).astype(int), 0, len(energy) - 1)
+        hi = np.clip(np.ceil(ends / block_dur).astype(int), lo + 1, len(energy))
+        rms = np.sqrt((cum[hi] - cum[lo]) / (hi - lo))
+        return 20.0 * np.log10(rms + 1e-6)
+
+    def embeddings(self, scenes: list, det_results: list):
+        dim = next((len(r["clip_embedding"]) for r in det_results or [] if r.get("clip_embedding") is not None), 0)
+        if not dim:
+            return None
+        emb = np.zeros((len(scenes), dim), dtype=np.float32)
+        for r in det_results:
+            i = r.get("scene_idx")
+            if r.get("clip_embedding") is not None and i is not None and 0 <= i < len(scenes):
+                emb[i] = r["clip_embedding"]
+        norms = np.linalg.norm(emb, axis=1, keepdims=True)
+        return np.divide(emb, norms, out=np.zeros_like(emb), where=norms > 0)
+
+    def features(self, scenes: list, det_results: list = None, transcript_segments: list = None,
+                 audio_path: str = None, moderation: dict = None, embeddings: np.ndarray = None,
+                 boxes: np.ndarray = None) -> dict:
+        bounds = np.asarray(scenes, dtype=np.float64).reshape(-1, 2)
+        starts, ends = bounds[:, 0], bounds[:, 1]
+        durations = np.maximum(ends - starts, 1e-3)
+
+        if boxes is not None:
+            frame_scene = [-1 if r.get("scene_idx") is None else r["scene_idx"] for r in det_results or []]
+            counts = counts_per_scene(boxes, frame_scene, len(scenes)).astype(np.float64)
+        else:
+            counts = np.zeros(len(scenes))
+            for r in det_results or []:
+                i = r.get("scene_idx")
+                if i is not None and 0 <= i < len(scenes):
+                    counts[i] = r.get("detection_count", len(r.get("detections") or []))
+
+        speech = _coverage([(s.get("start"), s.get("end")) for s in transcript_segments or []], starts, ends)
+
+        if embeddings is None:
+            embeddings = self.embeddings(scenes, det_results)
+        if embeddings is not None and embeddings.any():
+            centroid = embeddings.mean(axis=0)
+            centroid /= np.linalg.norm(centroid) + 1e-9
+            novelty = 1.0 - embeddings @ centroid
+            novelty[~embeddings.any(axis=1)] = np.median(novelty)
+        else:
+            novelty = np.zeros(len(scenes))
+
+        flagged = np.zeros(len(scenes))
+        moderation = moderation or {}
+        for flag in moderation.get("image_flags", []):
+            i = flag.get("scene_idx")
+            if i is not None and 0 <= i < len(scenes):
+                flagged[i] = 1.0
+        text_flags = [(f.get("start"), f.get("end"))
+                      for f in moderation.get("text_flags", []) + moderation.get("track_flags", [])]
+        flagged = np.maximum(flagged, _coverage(text_flags, starts, ends) / durations)
+
+        return {
+            "detections": counts / durations,
+            "speech": speech / durations,
+            "loudness": self._loudness(audio_path, starts, ends),
+            "novelty": novelty,
+            "moderation": flagged,
+        }
+
+    def score(self, features: dict) -> np.ndarray:
+        total = sum(w * _normalize(np.asarray(features[k], dtype=np.float64)) for k, w in self.weights.items() if k in features)
+        return total - self.moderation_penalty * features.get("moderation", 0.0)
+
+    def select(self, scenes: list, scores: np.ndarray, embeddings: np.ndarray = None,
+               target_duration: float = None, max_scenes: int = None, min_clip: float = 1.0) -> list:
+        bounds = np.asarray(scenes, dtype=np.float64).reshape(-1, 2)
+        total = float((bounds[:, 1] - bounds[:, 0]).sum())
+        if target_duration is None:
+            target_duration = min(60.0, max(10.0, 0.15 * total))
+        # Lazy greedy MMR: candidates live in a max-heap keyed on their last known
+        # score; a popped candidate is re-scored against the selected set and only
+        # accepted if it still beats the next best, keeping selection ~O(n log n).
+        heap = [(-float(s), i, 0) for i, s in enumerate(scores)]
+        heapq.heapify(heap)
+        use_mmr = embeddings is not None and self.diversity > 0
+        selected_sum = np.zeros(embeddings.shape[1], dtype=np.float64) if use_mmr else None
+        chosen, remaining = [], target_duration
+        while heap and remaining >= min_clip and (max_scenes is None or len(chosen) < max_scenes):
+            _, i, version = heapq.heappop(heap)
+            if use_mmr and chosen and version != len(chosen):
+                norm = np.linalg.norm(selected_sum)
+                redundancy = max(0.0, float(embeddings[i] @ selected_sum) / norm) if norm > 0 else 0.0
+                updated = float(scores[i]) - self.diversity * redundancy
+                if heap and updated < -heap[0][0]:
+                    heapq.heappush(heap, (-updated, i, len(chosen)))
+                    continue
+            start, end = bounds[i]
+            if end - start > remaining:
+                # Trim an over-long scene to a centered window that fits the budget
+                mid = (start + end) / 2.0
+                start, end = mid - remaining / 2.0, mid + remaining / 2.0
+            chosen.append((i, float(start), float(end)))
+            remaining -= end - start
+            if use_mmr:
+                selected_sum += embeddings[i]
+        chosen.sort(key=lambda c: c[1])
+        return chosen
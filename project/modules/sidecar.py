@@ -0,0 +1,99 @@
+"""Columnar sidecar for the numeric parts of an analysis.
+
+analysis.json keeps summaries and an `arrays` map of references; the columns
+themselves are plain .npy files under `<output_dir>/arrays/`, one per column, so
+a reader memory-maps only the ones it touches.
+"""
+import os
+from collections.abc import Mapping
+import numpy as np
+from project.modules.scene_scorer import _block_energy
+from project.modules.detections import from_dicts, summarize, to_dicts
+from project.modules.utils import setup_logger
+
+logger = setup_logger(__name__)
+
+ARRAYS_DIR = "arrays"
+ENVELOPE_BLOCK_SECONDS = 0.1
+
+def write_arrays(output_dir: str, arrays: dict) -> dict:
+    """Write each array as arrays/<name>.npy; returns the references to keep in analysis.json."""
+    folder = os.path.join(output_dir, ARRAYS_DIR)
+    os.makedirs(folder, exist_ok=True)
+    refs = {}
+    for name, values in arrays.items():
+        values = np.ascontiguousarray(values)
+        rel = os.path.join(ARRAYS_DIR, f"{name}.npy")
+        tmp = os.path.join(output_dir, rel + f".tmp{os.getpid()}")
+        with open(tmp, "wb") as f:
+            np.save(f, values)
+        os.replace(tmp, os.path.join(output_dir, rel))
+        refs[name] = {"path": rel.replace(os.sep, "/"), "shape": list(values.shape), "dtype": values.dtype.str}
+    return refs
+
+class Sidecar(Mapping):
+    """Read-only, lazy view of one analysis' columns: each is memory-mapped on first access."""
+
+    def __init__(self, output_dir: str, refs: dict = None):
+        self.output_dir = output_dir
+        self.refs = dict(refs or {})
+        self._open = {}
+
+    def __getitem__(self, name: str) -> np.ndarray:
+        if name not in self._open:
+            ref = self.refs[name]
+            self._open[name] = np.load(os.path.join(self.output_dir, ref["path"]), mmap_mode="r")
+        return self._open[name]
+
+    def __contains__(self, name):
+        return name in self.refs
+
+    def __iter__(self):
+        return iter(self.refs)
+
+    def __len__(self):
+        return len(self.refs)
+
+def open_sidecar(results: dict, output_dir: str) -> Sidecar:
+    return Sidecar(output_dir, results.get("arrays"))
+
+def frame_detections(sidecar: Sidecar, frame_idx: int, class_names: dict, limit: int = None) -> list:
+    """Box dicts for one frame, best first, read from the `boxes` column."""
+    if "boxes" not in sidecar:
+        return []
+    boxes = sidecar["boxes"]
+    # Rows are stored in frame order, so a frame's boxes are one contiguous run
+    lo, hi = np.searchsorted(boxes["frame_idx"], [frame_idx, frame_idx + 1])
+    rows = np.asarray(boxes[lo:hi])
+    return to_dicts(rows[np.argsort(-rows["conf"])][:limit], class_names)
+
+def audio_envelope(audio_path: str, block_seconds: float = ENVELOPE_BLOCK_SECONDS) -> np.ndarray:
+    """RMS level per block of a 16-bit PCM WAV, enough to draw a waveform without the samples."""
+    energy, _ = _block_energy(audio_path, block_seconds)
+    return np.sqrt(energy).astype(np.float32)
+
+def add_audio_envelope(results: dict, output_dir: str, audio_path: str):
+    try:
+        envelope = audio_envelope(audio_path)
+    except Exception as e:
+        logger.warning("Could not compute audio envelope for %s: %s", audio_path, e)
+        return
+    results.setdefault("arrays", {}).update(write_arrays(output_dir, {"audio_envelope": envelope}))
+    results["audio_envelope_block"] = ENVELOPE_BLOCK_SECONDS
+
+def compact_results(results: dict, output_dir: str, boxes: np.ndarray = None) -> dict:
+    """Write the detections array to the sidecar, in place; `results` stays JSON-serialisable.
+
+    Results that still carry per-box dicts (older outputs) are converted first.
+    """
+    det_results = results.get("detections") or []
+    if boxes is None and any("detections" in r for r in det_results):
+        boxes = from_dicts(det_results)
+        class_names = {d["class_id"]: d["class_name"] for r in det_results for d in r["detections"] or []}
+        summarize(det_results, boxes, class_names)
+        for r in det_results:
+            r.pop("detections", None)
+        results["class_names"] = dict(results.get("class_names") or {}, **{str(k): v for k, v in class_names.items()})
+    if boxes is not None:
+        results.setdefault("arrays", {}).update(write_arrays(output_dir, {"boxes": boxes}))
+    return results
@@ -1,13 +1,16 @@
-import torch
-from project.modules.utils import setup_logger, timeit
+from project.modules.utils import setup_logger, timeit, resolve_device
+from project.modules.tracing import current_span
+from project.modules.quantize import load_quantized, wants_quantized
 
 logger = setup_logger(__name__)
 
 class SpeechTranscriber:
-    def __init__(self, model_name: str = "base", use_gpu: bool = False):
+    def __init__(self, model_name: str = "base", use_gpu: bool = False, quantize: bool = None):
         self.model_name = model_name
-        self.device = "cuda" if use_gpu and torch.cuda.is_available() else "cpu"
-        logger.info(f"Initializing SpeechTranscriber on device: {self.device}")
+        # Dynamic int8 kernels are CPU-only
+        self.quantize = wants_quantized("transcriber", quantize)
+        self.device = resolve_device(use_gpu and not self.quantize)
+        logger.info(f"Initializing SpeechTranscriber on device: {self.device}{' (int8)' if self.quantize else ''}")
         self.model = None
 
     def _load(self):
@@ -15,7 +18,11 @@ class SpeechTranscriber:
             try:
                 import whisper
                 logger.info(f"Loading Whisper model '{self.model_name}'...")
-                self.model = whisper.load_model(self.model_name, device=self.device)
+                if self.quantize:
+                    self.model = load_quantized(f"whisper-{self.model_name}",
+                                                lambda: whisper.load_model(self.model_name, device="cpu"))
+                else:
+                    self.model = whisper.load_model(self.model_name, device=self.device)
                 logger.info("Whisper model loaded successfully.")
             except Exception as e:
                 logger.error(f"Failed to load Whisper model: {e}")
@@ -29,6 +36,7 @@ class SpeechTranscriber:
             return "", []
         try:
             res = self.model.transcribe(audio_path, fp16=self.device=="cuda")
+            current_span().count(segments=len(res.get("segments", [])), tokens=len(res.get("text", "").split()))
             return res.get("text", ""), res.get("segments", [])
         except Exception as e:
             logger.error(f"Error during transcription: {e}")
@@ -1,25 +1,38 @@
-import torch
-from project.modules.utils import setup_logger, timeit
-from transformers import pipeline
+from project.modules.utils import setup_logger, timeit, resolve_device
+from project.modules.tracing import current_span
+from project.modules.quantize import load_quantized, wants_quantized
 
 logger = setup_logger(__name__)
 
+MODEL_NAME = "facebook/bart-large-cnn"
+
 class TextSummarizer:
-    def __init__(self, use_gpu: bool = False):
-        self.device = 0 if use_gpu and torch.cuda.is_available() else -1
-        logger.info(f"Initializing TextSummarizer on device: {'GPU' if self.device == 0 else 'CPU'}")
+    def __init__(self, use_gpu: bool = False, quantize: bool = None):
+        # Dynamic int8 kernels are CPU-only
+        self.quantize = wants_quantized("summarizer", quantize)
+        self.device = 0 if resolve_device(use_gpu and not self.quantize) == "cuda" else -1
+        logger.info(f"Initializing TextSummarizer on device: {'GPU' if self.device == 0 else 'CPU'}"
+                    f"{' (int8)' if self.quantize else ''}")
         self.summarizer = None
 
     def _load_model(self):
         if self.summarizer is None:
+            from transformers import pipeline
             logger.info("Loading summarization model (BART)...")
-            self.summarizer = pipeline("summarization", model="facebook/bart-large-cnn", device=self.device)
+            if self.quantize:
+                from transformers import AutoModelForSeq2SeqLM, AutoTokenizer
+                model = load_quantized("bart-large-cnn", lambda: AutoModelForSeq2SeqLM.from_pretrained(MODEL_NAME))
+                self.summarizer = pipeline("summarization", model=model,
+                                           tokenizer=AutoTokenizer.from_pretrained(MODEL_NAME), device=-1)
+            else:
+                self.summarizer = pipeline("summarization", model=MODEL_NAME, device=self.device)
 
     @timeit
     def summarize(self, text: str, min_length: int = 50, max_length: int = 250):
         self._load_model()
         if not text or not self.summarizer:
             return ""
+        current_span().count(tokens=len(text.split()))
         try:
             summary = self.summarizer(text, max_length=max_length, min_length=min_length, do_sample=False)
             return summary[0]['summary_text']
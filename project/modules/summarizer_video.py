@@ -1,46 +1,249 @@
 import os
-from project.modules.utils import setup_logger, timeit
+import bisect
+import shutil
+import tempfile
+import threading
+import subprocess
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from project.modules.utils import setup_logger, timeit, find_executable
+from project.modules.video_probe import probe_video, probe_keyframes
+from project.modules.scene_scorer import SceneScorer
+from project.modules.tracing import current_span
 from tqdm import tqdm
 
 logger = setup_logger(__name__)
 
+# "smart" copies GOPs untouched and only re-encodes the partial GOP at each cut,
+# "copy" snaps every cut to a keyframe, "reencode" transcodes every clip as an
+# independent ffmpeg job, "moviepy" is the original serial moviepy pipeline.
+ASSEMBLY_MODES = ("smart", "copy", "reencode", "moviepy")
+COPY_CODECS = {"h264", "hevc"}
+SMART_AUDIO_CODECS = {"", "aac"}
+# ffprobe's H.264 profile names to libx264's
+X264_PROFILES = {"constrained baseline": "baseline", "baseline": "baseline", "main": "main", "high": "high",
+                 "high 10": "high10", "high 4:2:2": "high422", "high 4:4:4 predictive": "high444"}
+
 class VideoSummarizer:
-    def __init__(self, outdir: str):
+    def __init__(self, outdir: str, mode: str = "smart", snap_tolerance: float = 2.0, scorer: SceneScorer = None,
+                 max_workers: int = None):
+        if mode not in ASSEMBLY_MODES:
+            raise ValueError(f"Unknown assembly mode '{mode}', expected one of {ASSEMBLY_MODES}")
         self.outdir = outdir
+        self.mode = mode
+        self.snap_tolerance = snap_tolerance
+        self.scorer = scorer or SceneScorer()
+        self.max_workers = max_workers or os.cpu_count() or 1
+        # How the last summary was actually built: `method` is the mode that ran,
+        # "first_clip" for the single stream-copied clip, or None if nothing was written
+        self.last_assembly = {}
 
     @timeit
-    def create_summary_video(self, video_path: str, scenes: list, det_results: list, max_scenes: int = 6):
-        scored = []
-        det_map = {r["scene_idx"]: r for r in det_results}
-        for i, s in enumerate(scenes):
-            score = 0
-            r = det_map.get(i)
-            if r and r.get("detections"):
-                score += len(r.get("detections"))
-            scored.append((score, i, s))
-        scored.sort(reverse=True)
-        chosen = [s for _, _, s in scored[:max_scenes]]
+    def create_summary_video(self, video_path: str, scenes: list, det_results: list, max_scenes: int = None,
+                             mode: str = None, transcript_segments: list = None, audio_path: str = None,
+                             moderation: dict = None, target_duration: float = None,
+                             progress_callback=None, cancel_event: threading.Event = None, boxes=None):
+        chosen = []
+        if scenes:
+            embeddings = self.scorer.embeddings(scenes, det_results)
+            features = self.scorer.features(scenes, det_results, transcript_segments, audio_path, moderation, embeddings,
+                                            boxes=boxes)
+            scores = self.scorer.score(features)
+            picks = self.scorer.select(scenes, scores, embeddings, target_duration, max_scenes)
+            chosen = [(start, end) for _, start, end in picks]
+            current_span().count(segments=len(chosen))
+            logger.info("Selected %d of %d scenes (%.1fs) for the summary", len(chosen), len(scenes),
+                        sum(end - start for start, end in chosen))
+        mode = mode or self.mode
+        self.last_assembly = {"mode": mode, "method": None, "segments": len(chosen)}
+        if mode != "moviepy" and chosen:
+            out_path = self._assemble_ffmpeg(video_path, chosen, mode, progress_callback, cancel_event)
+            if out_path or (cancel_event and cancel_event.is_set()):
+                return out_path
+            logger.info("ffmpeg assembly unavailable; falling back to moviepy")
+        return self._assemble_moviepy(video_path, chosen)
+
+    def _plan_cuts(self, segments: list, keyframes: list, smart: bool) -> list:
+        # Returns (start, end, copy) parts; copy parts always begin on a keyframe.
+        parts = []
+        for start, end in segments:
+            i = bisect.bisect_left(keyframes, start - 1e-3)
+            next_kf = keyframes[i] if i < len(keyframes) else None
+            if next_kf is not None and next_kf - start <= 1e-3:
+                parts.append((next_kf, end, True))
+            elif smart:
+                if next_kf is None or next_kf >= end:
+                    parts.append((start, end, False))
+                else:
+                    parts.append((start, next_kf, False))
+                    parts.append((next_kf, end, True))
+            else:
+                prev_kf = keyframes[i - 1] if i > 0 else None
+                if prev_kf is not None and start - prev_kf <= self.snap_tolerance:
+                    parts.append((prev_kf, end, True))
+                elif next_kf is not None and next_kf < end:
+                    parts.append((next_kf, end, True))
+                elif prev_kf is not None:
+                    parts.append((prev_kf, end, True))
+        return [p for p in parts if p[1] - p[0] > 1e-3]
+
+    def _part_command(self, ffmpeg: str, video_path: str, part: tuple, info: dict, out_path: str, threads: int) -> list:
+        start, end, copy = part
+        if copy:
+            # Seek slightly past the keyframe so input seeking lands exactly on it
+            return [ffmpeg, "-y", "-v", "error", "-ss", f"{start + 1e-3:.3f}", "-i", video_path,
+                    "-t", f"{end - start:.3f}", "-map", "0:v:0", "-map", "0:a:0?",
+                    "-c", "copy", "-avoid_negative_ts", "make_zero", "-f", "mpegts", out_path]
+        return [ffmpeg, "-y", "-v", "error", "-ss", f"{start:.3f}", "-i", video_path,
+                "-t", f"{end - start:.3f}", "-map", "0:v:0", "-map", "0:a:0?",
+                "-c:v", "libx264", "-preset", "veryfast", "-crf", "18", "-threads", str(threads),
+                "-pix_fmt", info.get("pix_fmt") or "yuv420p", "-r", f"{info['fps'] or 25:.6f}",
+                *self._x264_options(info),
+                "-c:a", "aac", "-ar", str(info.get("audio_sample_rate") or 44100),
+                "-f", "mpegts", out_path]
+
+    @staticmethod
+    def _x264_options(info: dict) -> list:
+        """Keep re-encoded parts' SPS close to the source's, with parameter sets before every IDR.
+
+        Smart mode joins these parts with stream-copied GOPs. The output is tagged
+        avc3 (see `_concat`), so each part's in-band SPS/PPS applies to its own frames.
+        """
+        options = []
+        if info.get("codec_name") == "h264":
+            profile = X264_PROFILES.get((info.get("profile") or "").lower())
+            if profile:
+                options += ["-profile:v", profile]
+            if info.get("level", 0) > 0:
+                options += ["-level:v", f"{info['level'] / 10:.1f}"]
+        params = ["repeat-headers=1"]
+        if info.get("codec_name") == "h264" and info.get("refs", 0) > 0:
+            params.append(f"ref={info['refs']}")
+        return options + ["-x264-params", ":".join(params)]
+
+    def _render_parts(self, ffmpeg: str, video_path: str, parts: list, info: dict, work_dir: str,
+                      progress_callback=None, cancel_event: threading.Event = None):
+        # Each part is an independent ffmpeg process; encoder threads are split so
+        # that workers x threads stays within this job's share of the cores.
+        budget = int(os.environ.get("VISUAL_INSIGHT_THREADS") or 0) or os.cpu_count() or 1
+        workers = max(1, min(self.max_workers, len(parts), budget))
+        threads = max(1, budget // workers)
+        paths = [os.path.join(work_dir, f"part_{n:04d}.ts") for n in range(len(parts))]
+        running, lock = set(), threading.Lock()
+        aborted = threading.Event()
+
+        def render(n):
+            if aborted.is_set():
+                return False
+            proc = subprocess.Popen(self._part_command(ffmpeg, video_path, parts[n], info, paths[n], threads),
+                                    stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+            with lock:
+                running.add(proc)
+            _, err = proc.communicate()
+            with lock:
+                running.discard(proc)
+            if proc.returncode != 0 and not aborted.is_set():
+                logger.warning("ffmpeg failed on part %d (%d): %s", n, proc.returncode, err.decode(errors="ignore")[-500:])
+            return proc.returncode == 0
+
+        def abort():
+            aborted.set()
+            with lock:
+                for proc in running:
+                    proc.kill()
+
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            pending = {executor.submit(render, n) for n in range(len(parts))}
+            done_count = 0
+            while pending:
+                done, pending = wait(pending, timeout=0.2, return_when=FIRST_COMPLETED)
+                if cancel_event is not None and cancel_event.is_set() and not aborted.is_set():
+                    logger.info("Summary rendering cancelled")
+                    abort()
+                for future in done:
+                    if not future.result() and not aborted.is_set():
+                        abort()
+                    done_count += 1
+                    if progress_callback and not aborted.is_set():
+                        progress_callback(f"Rendering summary clips ({done_count}/{len(parts)})...", 0.9 * done_count / len(parts))
+        return None if aborted.is_set() else paths
+
+    def _concat(self, ffmpeg: str, paths: list, out_path: str, aac_audio: bool, inband_headers: bool = False) -> bool:
+        list_path = os.path.join(os.path.dirname(paths[0]), "parts.txt")
+        with open(list_path, "w", encoding="utf-8") as f:
+            for part_path in paths:
+                f.write("file '{}'\n".format(part_path.replace("'", "'\\''")))
+        cmd = [ffmpeg, "-y", "-v", "error", "-f", "concat", "-safe", "0", "-i", list_path,
+               "-c", "copy", "-movflags", "+faststart", out_path]
+        if aac_audio:
+            cmd[-3:-3] = ["-bsf:a", "aac_adtstoasc"]
+        if inband_headers:
+            # avc1 would pin every frame to the first part's SPS/PPS; avc3 lets the
+            # copied and re-encoded parts each carry their own
+            cmd[-3:-3] = ["-tag:v", "avc3"]
+        proc = subprocess.run(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, check=False)
+        if proc.returncode != 0:
+            logger.warning("ffmpeg concat failed (%d): %s", proc.returncode, proc.stderr.decode(errors="ignore")[-500:])
+        return proc.returncode == 0
+
+    def _assemble_ffmpeg(self, video_path: str, chosen: list, mode: str, progress_callback=None,
+                         cancel_event: threading.Event = None):
+        ffmpeg = find_executable("ffmpeg")
+        if not ffmpeg:
+            return None
+        info = probe_video(video_path)
+        if mode == "reencode":
+            parts = [(start, end, False) for start, end in chosen]
+        else:
+            keyframes = probe_keyframes(video_path) if info.get("codec_name") in COPY_CODECS else []
+            smart = mode == "smart" and info.get("codec_name") == "h264" and info.get("audio_codec", "") in SMART_AUDIO_CODECS
+            parts = self._plan_cuts(chosen, keyframes, smart) if keyframes else []
+            if not parts:
+                logger.info("Stream copy not possible for %s; re-encoding clips", info.get("codec_name") or "unknown codec")
+                parts = [(start, end, False) for start, end in chosen]
+        reencoded = sum(1 for p in parts if not p[2])
+        aac_audio = reencoded > 0 or info.get("audio_codec") == "aac"
+
+        out_path = os.path.join(self.outdir, "summary.mp4")
+        work_dir = tempfile.mkdtemp(prefix="summary_parts_", dir=self.outdir)
+        try:
+            paths = self._render_parts(ffmpeg, video_path, parts, info, work_dir, progress_callback, cancel_event)
+            if paths is None:
+                return None
+            if progress_callback:
+                progress_callback("Joining summary clips...", 0.95)
+            mixed = 0 < reencoded < len(parts) and info.get("codec_name") == "h264"
+            if not self._concat(ffmpeg, paths, out_path, aac_audio, inband_headers=mixed):
+                return None
+            logger.info("Assembled summary from %d parts (%d re-encoded)", len(parts), reencoded)
+            self.last_assembly.update(method=mode, parts=len(parts), reencoded=reencoded, inband_headers=mixed)
+            if progress_callback:
+                progress_callback("Summary video ready", 1.0)
+            return out_path
+        finally:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+    def _assemble_moviepy(self, video_path: str, chosen: list):
         try:
             import importlib
             moviepy = importlib.import_module("moviepy.editor")
             VideoFileClip = getattr(moviepy, "VideoFileClip")
             concatenate_videoclips = getattr(moviepy, "concatenate_videoclips")
+            source = VideoFileClip(video_path)
             clips = []
             for start, end in tqdm(chosen, desc="Building summary clips"):
                 try:
-                    clip = VideoFileClip(video_path).subclip(start, end)
-                    clips.append(clip)
+                    clips.append(source.subclip(start, end))
                 except Exception as e:
                     logger.warning("Failed to create clip %s-%s: %s", start, end, e)
             if not clips:
                 logger.warning("No clips selected; creating a short sample from the start")
-                clips = [VideoFileClip(video_path).subclip(0, min(5, 5))]
+                clips = [source.subclip(0, min(5, source.duration))]
             final = concatenate_videoclips(clips)
             out_path = os.path.join(self.outdir, "summary.mp4")
             final.write_videofile(out_path, codec="libx264", audio_codec="aac")
-            for c in clips:
-                c.close()
             final.close()
+            source.close()
+            self.last_assembly["method"] = "moviepy"
             return out_path
         except Exception as e:
             logger.warning("moviepy not available or failed: %s", e)
@@ -49,8 +252,9 @@ class VideoSummarizer:
                 start, end = chosen[0] if chosen else (0, min(5, 5))
                 duration = max(0.5, end - start)
                 cmd = ['ffmpeg', '-y', '-ss', str(start), '-i', video_path, '-t', str(duration), '-c', 'copy', out_path]
-                import subprocess
-                subprocess.run(cmd, check=False, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+                proc = subprocess.run(cmd, check=False, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+                if proc.returncode == 0:
+                    self.last_assembly["method"] = "first_clip"
                 return out_path
             except Exception as e2:
                 logger.error("Failed to produce fallback summary: %s", e2)
@@ -0,0 +1,99 @@
+import os
+import threading
+from collections import OrderedDict
+import cv2
+import numpy as np
+from project.modules.utils import setup_logger
+
+logger = setup_logger(__name__)
+
+THUMB_WIDTH = 320
+THUMB_HEIGHT = 180
+THUMB_DIR = "thumbs"
+
+def _encoding():
+    # WebP is about a third smaller than JPEG at the same quality; fall back
+    # where the OpenCV build was compiled without it.
+    try:
+        ok, _ = cv2.imencode(".webp", np.zeros((8, 8, 3), np.uint8), [cv2.IMWRITE_WEBP_QUALITY, 80])
+        if ok:
+            return ".webp", [cv2.IMWRITE_WEBP_QUALITY, 80]
+    except cv2.error:
+        pass
+    return ".jpg", [cv2.IMWRITE_JPEG_QUALITY, 80]
+
+THUMB_EXT, THUMB_PARAMS = _encoding()
+
+def thumbnail_path(frame_path: str) -> str:
+    """storyboard/scene_000.jpg -> storyboard/thumbs/scene_000.webp"""
+    folder, name = os.path.split(frame_path)
+    return os.path.join(folder, THUMB_DIR, os.path.splitext(name)[0] + THUMB_EXT)
+
+def fit_frame(frame, width: int = THUMB_WIDTH, height: int = THUMB_HEIGHT):
+    """Scale into a fixed box, padding with black so every preview has the same size."""
+    h, w = frame.shape[:2]
+    scale = min(width / w, height / h)
+    new_w, new_h = max(1, int(round(w * scale))), max(1, int(round(h * scale)))
+    small = cv2.resize(frame, (new_w, new_h), interpolation=cv2.INTER_AREA)
+    top, left = (height - new_h) // 2, (width - new_w) // 2
+    return cv2.copyMakeBorder(small, top, height - new_h - top, left, width - new_w - left,
+                              cv2.BORDER_CONSTANT, value=(0, 0, 0))
+
+def write_thumbnail(frame, frame_path: str) -> str:
+    """Write the preview for a keyframe that was just saved to `frame_path`."""
+    out = thumbnail_path(frame_path)
+    os.makedirs(os.path.dirname(out), exist_ok=True)
+    cv2.imwrite(out, fit_frame(frame), THUMB_PARAMS)
+    return out
+
+def ensure_thumbnail(frame_path: str) -> str:
+    """Preview path for a keyframe, generating it for results made before thumbnails existed."""
+    out = thumbnail_path(frame_path)
+    if not os.path.exists(out):
+        frame = cv2.imread(frame_path)
+        if frame is None:
+            logger.warning("Could not read keyframe %s", frame_path)
+            return None
+        write_thumbnail(frame, frame_path)
+    return out
+
+class ThumbnailCache:
+    """Process-wide LRU of encoded preview bytes, bounded by total size.
+
+    Sessions keep only file paths; the bytes live here once, shared by every
+    session, and are handed to the UI still encoded so nothing is decoded per rerun.
+    """
+
+    def __init__(self, max_bytes: int = 32 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, frame_path: str):
+        path = ensure_thumbnail(frame_path)
+        if path is None:
+            return None
+        key = (path, os.path.getmtime(path))
+        with self._lock:
+            data = self._items.get(key)
+            if data is not None:
+                self._items.move_to_end(key)
+                self.hits += 1
+                return data
+        with open(path, "rb") as f:
+            data = f.read()
+        with self._lock:
+            self.misses += 1
+            if key not in self._items:
+                self._items[key] = data
+                self.size += len(data)
+            while self.size > self.max_bytes and len(self._items) > 1:
+                _, evicted = self._items.popitem(last=False)
+                self.size -= len(evicted)
+        return data
+
+    def stats(self) -> dict:
+        return {"items": len(self._items), "bytes": self.size, "hits": self.hits, "misses": self.misses}
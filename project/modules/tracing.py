@@ -0,0 +1,191 @@
+import os
+import sys
+import json
+import time
+import itertools
+import threading
+import contextvars
+from contextlib import contextmanager
+from functools import wraps
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+_active_tracer = contextvars.ContextVar("active_tracer", default=None)
+_current_span = contextvars.ContextVar("current_span", default=None)
+
+def _peak_rss_kb() -> int:
+    if resource is not None:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return int(peak // 1024 if sys.platform == "darwin" else peak)
+    try:
+        import psutil
+        info = psutil.Process().memory_info()
+        return int(getattr(info, "peak_wset", info.rss) // 1024)
+    except Exception:
+        return 0
+
+class Span:
+    __slots__ = ("name", "span_id", "parent_id", "thread_id", "thread_name", "start_ns", "end_ns",
+                 "cpu_ns", "rss_peak_delta_kb", "counts", "attrs")
+
+    def __init__(self, name: str, span_id: int, parent_id: int = None, attrs: dict = None):
+        thread = threading.current_thread()
+        self.name = name
+        self.span_id = span_id
+        self.parent_id = parent_id
+        self.thread_id = thread.ident
+        self.thread_name = thread.name
+        self.start_ns = time.perf_counter_ns()
+        self.end_ns = None
+        self.cpu_ns = 0
+        self.rss_peak_delta_kb = 0
+        self.counts = {}
+        self.attrs = dict(attrs or {})
+
+    def count(self, **items):
+        for key, value in items.items():
+            self.counts[key] = self.counts.get(key, 0) + int(value)
+        return self
+
+    @property
+    def duration_ns(self) -> int:
+        return (self.end_ns or time.perf_counter_ns()) - self.start_ns
+
+    def to_dict(self, origin_ns: int) -> dict:
+        return {
+            "name": self.name,
+            "id": self.span_id,
+            "parent": self.parent_id,
+            "thread": self.thread_name,
+            "start_ms": round((self.start_ns - origin_ns) / 1e6, 3),
+            "duration_ms": round(self.duration_ns / 1e6, 3),
+            "cpu_ms": round(self.cpu_ns / 1e6, 3),
+            "rss_peak_delta_kb": self.rss_peak_delta_kb,
+            "counts": dict(self.counts),
+            "attrs": dict(self.attrs),
+        }
+
+class _NullSpan:
+    def count(self, **items):
+        return self
+
+class Tracer:
+    def __init__(self, name: str = "pipeline"):
+        self.name = name
+        self.spans = []
+        self.origin_ns = time.perf_counter_ns()
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def activate(self):
+        token = _active_tracer.set(self)
+        try:
+            yield self
+        finally:
+            _active_tracer.reset(token)
+
+    @contextmanager
+    def span(self, name: str, **attrs):
+        parent = _current_span.get()
+        span = Span(name, next(self._ids), parent.span_id if parent is not None else None, attrs)
+        token = _current_span.set(span)
+        # Per-thread CPU: process CPU would give spans overlapping in other threads
+        # (parallel ffmpeg jobs, asyncio.to_thread) each other's time. Pools that
+        # native libraries run on their own threads are not included.
+        cpu_start = time.thread_time_ns()
+        rss_start = _peak_rss_kb()
+        try:
+            yield span
+        finally:
+            span.end_ns = time.perf_counter_ns()
+            if threading.get_ident() == span.thread_id:
+                span.cpu_ns = time.thread_time_ns() - cpu_start
+            span.rss_peak_delta_kb = max(0, _peak_rss_kb() - rss_start)
+            _current_span.reset(token)
+            with self._lock:
+                self.spans.append(span)
+
+    def summary(self) -> dict:
+        with self._lock:
+            spans = sorted(self.spans, key=lambda s: s.start_ns)
+        totals = {}
+        for s in spans:
+            entry = totals.setdefault(s.name, {"calls": 0, "duration_ms": 0.0, "cpu_ms": 0.0})
+            entry["calls"] += 1
+            entry["duration_ms"] = round(entry["duration_ms"] + s.duration_ns / 1e6, 3)
+            entry["cpu_ms"] = round(entry["cpu_ms"] + s.cpu_ns / 1e6, 3)
+        roots = [s for s in spans if s.parent_id is None]
+        return {
+            "tracer": self.name,
+            "wall_ms": round(sum(s.duration_ns for s in roots) / 1e6, 3),
+            "spans": [s.to_dict(self.origin_ns) for s in spans],
+            "totals": totals,
+        }
+
+    def to_chrome_trace(self) -> dict:
+        pid = os.getpid()
+        with self._lock:
+            spans = list(self.spans)
+        events = [{"name": "thread_name", "ph": "M", "pid": pid, "tid": tid, "args": {"name": tname}}
+                  for tid, tname in {(s.thread_id, s.thread_name) for s in spans}]
+        for s in spans:
+            args = {"cpu_ms": round(s.cpu_ns / 1e6, 3), "rss_peak_delta_kb": s.rss_peak_delta_kb}
+            args.update(s.counts)
+            args.update({k: str(v) for k, v in s.attrs.items()})
+            events.append({
+                "name": s.name,
+                "cat": self.name,
+                "ph": "X",
+                "ts": (s.start_ns - self.origin_ns) / 1000.0,
+                "dur": s.duration_ns / 1000.0,
+                "pid": pid,
+                "tid": s.thread_id,
+                "args": args,
+            })
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def export_chrome_trace(self, path: str) -> str:
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_chrome_trace(), f)
+        return path
+
+def get_tracer():
+    return _active_tracer.get()
+
+def current_span():
+    s = _current_span.get()
+    return s if s is not None and _active_tracer.get() is not None else _NullSpan()
+
+@contextmanager
+def span(name: str, **attrs):
+    tracer = _active_tracer.get()
+    if tracer is None:
+        yield _NullSpan()
+        return
+    with tracer.span(name, **attrs) as s:
+        yield s
+
+def traced(name: str = None):
+    def decorator(func):
+        span_name = name or func.__qualname__
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(span_name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+def propagate(func):
+    # Bind func to the caller's tracer and current span so work submitted to a
+    # thread pool nests under the stage that submitted it.
+    ctx = contextvars.copy_context()
+
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        return ctx.copy().run(func, *args, **kwargs)
+    return wrapper
@@ -1,13 +1,31 @@
 import os
+import stat
 import logging
 import uuid
 import time
+import shutil
 from functools import wraps
+from project.modules.tracing import span
 
 def ensure_dirs(paths):
     for p in paths:
         os.makedirs(p, exist_ok=True)
 
+def user_cache_dir(*parts) -> str:
+    """A path under the per-user cache ($XDG_CACHE_HOME or ~/.cache) for files that get loaded as code."""
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "visual_insight", *parts)
+
+def is_private(path: str) -> bool:
+    """True if the file and its directory belong to this user and nobody else can write to them."""
+    if not hasattr(os, "getuid"):
+        return True
+    for p in (path, os.path.dirname(os.path.abspath(path))):
+        st = os.stat(p)
+        if st.st_uid != os.getuid() or st.st_mode & (stat.S_IWGRP | stat.S_IWOTH):
+            return False
+    return True
+
 def generate_id():
     return uuid.uuid4().hex[:12]
 
@@ -21,12 +39,31 @@ def setup_logger(name=__name__, level=logging.INFO):
     logger.setLevel(level)
     return logger
 
+def find_executable(name: str):
+    path = shutil.which(name)
+    if path is None and name == "ffmpeg":
+        try:
+            import imageio_ffmpeg
+            path = imageio_ffmpeg.get_ffmpeg_exe()
+        except Exception:
+            path = None
+    return path
+
+def resolve_device(use_gpu: bool) -> str:
+    # torch is only imported when a GPU is requested, so CPU-only imports stay cheap
+    if not use_gpu:
+        return "cpu"
+    import torch
+    return "cuda" if torch.cuda.is_available() else "cpu"
+
 def timeit(func):
+    # Records a tracing span when a Tracer is active and always logs wall time
     @wraps(func)
     def wrapper(*args, **kwargs):
-        start = time.time()
-        res = func(*args, **kwargs)
-        end = time.time()
+        with span(func.__qualname__):
+            start = time.perf_counter()
+            res = func(*args, **kwargs)
+            end = time.perf_counter()
         logger = logging.getLogger(func.__module__)
         logger.info(f"{func.__name__} took {end-start:.2f}s")
         return res
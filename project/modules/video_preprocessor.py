@@ -1,6 +1,8 @@
 import os
 import subprocess
 from project.modules.utils import timeit, setup_logger
+from project.modules.video_probe import probe_video
+from project.modules.tracing import current_span
 
 logger = setup_logger(__name__)
 
@@ -32,20 +34,14 @@ class VideoPreprocessor:
                 scene_list = scene_manager.get_scene_list()
                 scenes = [(start.get_seconds(), end.get_seconds()) for start, end in scene_list]
                 logger.info("Detected %d scenes", len(scenes))
+                current_span().count(segments=len(scenes))
                 return scenes
             finally:
                 video_manager.release()
         except Exception as e:
             logger.warning("scenedetect not available or failed: %s", e)
             try:
-                import cv2
-                cap = cv2.VideoCapture(self.path)
-                fps = cap.get(cv2.CAP_PROP_FPS) or 25
-                frame_count = cap.get(cv2.CAP_PROP_FRAME_COUNT) or 0
-                duration = frame_count / fps if fps and frame_count else 5.0
-                cap.release()
-                if duration <= 0:
-                    duration = 5.0
+                duration = probe_video(self.path)['duration'] or 5.0
             except Exception:
                 duration = 5.0
             logger.info("Falling back to single scene 0-%.1f", duration)
@@ -0,0 +1,180 @@
+import os
+import json
+import subprocess
+import threading
+from collections import OrderedDict
+from fractions import Fraction
+from project.modules.utils import setup_logger, find_executable
+
+logger = setup_logger(__name__)
+
+_CACHE_SIZE = 128
+_cache = OrderedDict()
+_keyframe_cache = OrderedDict()
+_lock = threading.Lock()
+
+def _cache_key(path: str):
+    st = os.stat(path)
+    return (os.path.abspath(path), st.st_mtime_ns, st.st_size)
+
+def _parse_rate(rate) -> float:
+    try:
+        value = float(Fraction(str(rate)))
+    except (ValueError, ZeroDivisionError):
+        return 0.0
+    # ffprobe reports 90000/1-style timebase rates for streams without a real frame rate
+    return value if 0 < value < 1000 else 0.0
+
+def _rotation(stream: dict) -> int:
+    rotate = stream.get("tags", {}).get("rotate")
+    if rotate is None:
+        for side in stream.get("side_data_list", []):
+            if "rotation" in side:
+                rotate = side["rotation"]
+                break
+    try:
+        return int(float(rotate or 0)) % 360
+    except ValueError:
+        return 0
+
+def _probe_ffprobe(path: str):
+    ffprobe = find_executable("ffprobe")
+    if not ffprobe:
+        return None
+    cmd = [ffprobe, "-v", "error", "-print_format", "json", "-show_format", "-show_streams", path]
+    try:
+        proc = subprocess.run(cmd, capture_output=True, check=True, timeout=30)
+        data = json.loads(proc.stdout or b"{}")
+    except Exception as e:
+        logger.warning("ffprobe failed for %s: %s", path, e)
+        return None
+    streams = data.get("streams", [])
+    video = next((s for s in streams if s.get("codec_type") == "video"), None)
+    if video is None:
+        return None
+    audio = next((s for s in streams if s.get("codec_type") == "audio"), None)
+    fmt = data.get("format", {})
+
+    fps = _parse_rate(video.get("avg_frame_rate")) or _parse_rate(video.get("r_frame_rate"))
+    duration = float(fmt.get("duration") or video.get("duration") or 0.0)
+    frame_count = int(video.get("nb_frames") or 0) or int(round(duration * fps))
+    rotation = _rotation(video)
+    width, height = int(video.get("width", 0)), int(video.get("height", 0))
+    if rotation in (90, 270):
+        # OpenCV applies the display matrix when decoding, so report display geometry
+        width, height = height, width
+    tag = video.get("codec_tag", "0x0")
+    return {
+        "width": width,
+        "height": height,
+        "fps": fps,
+        "frame_count": frame_count,
+        "duration": duration,
+        "resolution": f"{width}x{height}",
+        "codec": int(tag, 16) if tag.startswith("0x") else 0,
+        "codec_name": video.get("codec_name", ""),
+        "pix_fmt": video.get("pix_fmt", ""),
+        "profile": video.get("profile", ""),
+        "level": int(video.get("level") or 0),
+        "refs": int(video.get("refs") or 0),
+        "bitrate": int(fmt.get("bit_rate") or video.get("bit_rate") or 0),
+        "format_name": fmt.get("format_name", ""),
+        "has_audio": audio is not None,
+        "audio_codec": audio.get("codec_name", "") if audio else "",
+        "audio_sample_rate": int(audio.get("sample_rate") or 0) if audio else 0,
+        "rotation": rotation,
+        "source": "ffprobe",
+    }
+
+def _probe_opencv(path: str) -> dict:
+    import cv2
+    cap = cv2.VideoCapture(path)
+    width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+    height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+    fps = float(cap.get(cv2.CAP_PROP_FPS))
+    frame_count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+    fourcc = int(cap.get(cv2.CAP_PROP_FOURCC))
+    bitrate = cap.get(cv2.CAP_PROP_BITRATE) if hasattr(cv2, "CAP_PROP_BITRATE") else 0
+    rotation = cap.get(cv2.CAP_PROP_ORIENTATION_META) if hasattr(cv2, "CAP_PROP_ORIENTATION_META") else 0
+    cap.release()
+    codec_name = "".join(chr((fourcc >> (8 * i)) & 0xFF) for i in range(4)).strip("\x00 ").lower()
+    return {
+        "width": width,
+        "height": height,
+        "fps": fps,
+        "frame_count": frame_count,
+        "duration": frame_count / fps if fps > 0 else 0.0,
+        "resolution": f"{width}x{height}",
+        "codec": fourcc,
+        "codec_name": codec_name,
+        "pix_fmt": "",
+        "profile": "",
+        "level": 0,
+        "refs": 0,
+        "bitrate": int(bitrate * 1000) if bitrate else 0,
+        "format_name": "",
+        "has_audio": None,
+        "audio_codec": "",
+        "audio_sample_rate": 0,
+        "rotation": int(rotation or 0) % 360,
+        "source": "opencv",
+    }
+
+def _memoized(cache: OrderedDict, path: str, compute):
+    key = _cache_key(path)
+    with _lock:
+        if key in cache:
+            cache.move_to_end(key)
+            return cache[key]
+    value = compute(path)
+    with _lock:
+        cache[key] = value
+        while len(cache) > _CACHE_SIZE:
+            cache.popitem(last=False)
+    return value
+
+def _probe_keyframes(path: str) -> list:
+    ffprobe = find_executable("ffprobe")
+    if not ffprobe:
+        logger.warning("ffprobe not found; keyframe positions unavailable")
+        return []
+    # Packet flags come straight from the demuxer, so no frame is decoded here
+    cmd = [ffprobe, "-v", "error", "-select_streams", "v:0", "-show_entries", "packet=pts_time,flags",
+           "-of", "csv=p=0", path]
+    try:
+        proc = subprocess.run(cmd, capture_output=True, check=True, timeout=120)
+    except Exception as e:
+        logger.warning("ffprobe keyframe scan failed for %s: %s", path, e)
+        return []
+    times = []
+    for line in proc.stdout.decode(errors="ignore").splitlines():
+        pts, _, flags = line.partition(",")
+        if "K" in flags:
+            try:
+                times.append(float(pts))
+            except ValueError:
+                continue
+    return sorted(times)
+
+def probe_video(path: str) -> dict:
+    return dict(_memoized(_cache, path, lambda p: _probe_ffprobe(p) or _probe_opencv(p)))
+
+def probe_keyframes(path: str) -> list:
+    return list(_memoized(_keyframe_cache, path, _probe_keyframes))
+
+def decode_errors(path: str) -> list:
+    """Decode every stream of `path` with ffmpeg; returns its error lines (empty if clean)."""
+    ffmpeg = find_executable("ffmpeg")
+    if not ffmpeg:
+        raise RuntimeError("ffmpeg not found")
+    proc = subprocess.run([ffmpeg, "-v", "error", "-i", path, "-f", "null", "-"],
+                          stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, check=False)
+    errors = proc.stderr.decode(errors="ignore").splitlines()
+    if proc.returncode != 0:
+        errors.append(f"ffmpeg exited with {proc.returncode}")
+    return errors
+
+def clear_probe_cache():
+    with _lock:
+        _cache.clear()
+        _keyframe_cache.clear()
@@ -0,0 +1,21 @@
+"""Streamlit-free processing pipelines shared by the apps and the command line.
+
+Submodules are imported on first attribute access, and heavy model libraries
+(torch, transformers, ultralytics, whisper, moviepy) only when a stage first
+needs them, so importing the package is cheap for CLI and worker processes.
+"""
+import importlib
+
+_EXPORTS = {
+    "process_video_pro": "project.pipeline.pro",
+    "process_video_advanced": "project.pipeline.advanced",
+}
+
+__all__ = list(_EXPORTS)
+
+def __getattr__(name):
+    if name in _EXPORTS:
+        value = getattr(importlib.import_module(_EXPORTS[name]), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
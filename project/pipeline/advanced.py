@@ -0,0 +1,238 @@
+"""Pipeline behind the Advanced app: YOLO/BLIP/CLIP, Whisper, BART and the moderation models."""
+import os
+import json
+import time
+import numpy as np
+from typing import Dict, Optional
+
+from project.modules.video_preprocessor import VideoPreprocessor
+from project.modules.keyframe_extractor import KeyframeExtractor
+from project.modules.detection_captioning import DetectorCaptioner
+from project.modules.speech_transcriber import SpeechTranscriber
+from project.modules.summarizer import TextSummarizer
+from project.modules.moderator import Moderator
+from project.modules.summarizer_video import VideoSummarizer
+from project.modules.dense import DenseScanner
+from project.modules.sampler import AdaptiveSampler
+from project.modules.video_probe import probe_video
+from project.modules.tracing import Tracer, span
+from project.pipeline.resources import ResourceManager
+from project.modules.sidecar import add_audio_envelope, compact_results, write_arrays
+from project.search.store import save_video_embeddings
+from project.modules.utils import setup_logger
+
+logger = setup_logger(__name__)
+
+def extract_video_metadata(video_path: str) -> Dict:
+    return probe_video(video_path)
+
+def _quantize_flag(quantize, component: str):
+    # None defers to VISUAL_INSIGHT_QUANTIZE
+    return None if quantize is None else component in quantize
+
+def load_components(use_gpu: bool = False, preload: bool = False, backend: str = None, quantize=None) -> Dict:
+    """Model wrappers that long-lived workers reuse across videos so weights stay loaded."""
+    components = {
+        'detector': DetectorCaptioner(use_gpu=use_gpu, backend=backend),
+        'transcriber': SpeechTranscriber(use_gpu=use_gpu, quantize=_quantize_flag(quantize, 'transcriber')),
+        'summarizer': TextSummarizer(use_gpu=use_gpu, quantize=_quantize_flag(quantize, 'summarizer')),
+    }
+    # Zero-shot moderation encodes its prompts with the detector's CLIP text tower
+    components['moderator'] = Moderator(use_gpu=use_gpu, text_encoder=components['detector'].encode_text)
+    if preload:
+        components['detector']._load_models()
+        components['transcriber']._load()
+        components['summarizer']._load_model()
+        components['moderator']._load_model()
+    return components
+
+def process_video_advanced(
+    video_path: str,
+    output_dir: str,
+    scene_threshold: float = 27.0,
+    use_gpu: bool = False,
+    enable_detection: bool = True,
+    enable_transcription: bool = True,
+    enable_summarization: bool = True,
+    enable_moderation: bool = True,
+    enable_summary_video: bool = False,
+    progress_callback=None,
+    components: Optional[Dict] = None,
+    dense_fps: float = 0.0,
+    sampling: str = "fixed",
+    sample_budget: int = 240,
+    backend: Optional[str] = None,
+    quantize: Optional[list] = None,
+    caption_mode: str = "blip",
+    caption_budget: Optional[float] = None
+):
+    start_time = time.time()
+    components = components or {}
+    results = {
+        'success': False,
+        'video_info': {},
+        'scenes': [],
+        'keyframes': [],
+        'detections': [],
+        'captions': [],
+        'transcript': '',
+        'summary': '',
+        'moderation': {},
+        'processing_time': 0
+    }
+    
+    audio_path = None
+    boxes = None
+    dense_frames = []
+    detector = None
+    tracer = Tracer("process_video_advanced")
+    resources = ResourceManager.for_process()
+    
+    try:
+        with tracer.activate(), span("process_video_advanced", video=os.path.basename(video_path)):
+            if progress_callback:
+                progress_callback("Extracting video metadata...", 0.05)
+            
+            video_info = extract_video_metadata(video_path)
+            results['video_info'] = video_info
+            
+            if progress_callback:
+                progress_callback("Detecting scenes...", 0.15)
+            
+            preprocessor = VideoPreprocessor(video_path, output_dir)
+            scenes = preprocessor.detect_scenes(scene_threshold)
+            results['scenes'] = scenes
+            
+            if progress_callback:
+                progress_callback("Extracting keyframes...", 0.30)
+            
+            extractor = KeyframeExtractor(output_dir)
+            keyframes = extractor.extract_keyframes(video_path, scenes)
+            results['keyframes'] = keyframes
+            
+            if enable_detection and keyframes:
+                if progress_callback:
+                    progress_callback("Running AI detection & captioning...", 0.45)
+                
+                detector = components.get('detector') or DetectorCaptioner(use_gpu=use_gpu, backend=backend)
+                with resources.stage('detection', onnx=detector.onnx):
+                    det_results, boxes = detector.process_keyframes(
+                        keyframes, caption_mode=caption_mode, caption_budget=caption_budget)
+                results['detections'] = det_results
+                results['class_names'] = {str(k): v for k, v in detector.class_names.items()}
+                
+                if dense_fps > 0:
+                    if progress_callback:
+                        progress_callback(f"Dense object scan at {dense_fps:g} fps...", 0.5)
+                    
+                    # Adaptive sampling treats dense_fps as the ceiling for fast motion
+                    sampler = AdaptiveSampler(max_fps=dense_fps, budget=sample_budget) if sampling == "adaptive" else None
+                    frames_dir = os.path.join(output_dir, "dense_frames") if enable_moderation else None
+                    with resources.stage('dense', onnx=detector.onnx):
+                        dense = DenseScanner(detector, sample_fps=dense_fps, sampler=sampler,
+                                             frames_dir=frames_dir).scan(video_path)
+                    results['dense'] = {'sample_fps': dense_fps, 'sampling': sampling,
+                                        'tracks': dense['tracks'], 'stats': dense['stats']}
+                    results.setdefault('arrays', {}).update(write_arrays(
+                        output_dir, {'dense_boxes': dense['boxes'], 'dense_times': dense['frame_times']}))
+                    starts = np.array([k['start'] for k in keyframes], dtype=np.float64)
+                    for f in dense['frames']:
+                        f['scene_idx'] = keyframes[max(0, int(np.searchsorted(starts, f['timestamp'], 'right')) - 1)]['scene_idx']
+                    dense_frames = dense['frames']
+                
+                results['captions'] = [
+                    {'scene_idx': r['scene_idx'], 'caption': r['caption']}
+                    for r in det_results
+                ]
+            
+            if enable_transcription:
+                if progress_callback:
+                    progress_callback("Transcribing audio...", 0.60)
+                
+                audio_path = preprocessor.extract_audio()
+                if audio_path and os.path.exists(audio_path):
+                    transcriber = components.get('transcriber') or SpeechTranscriber(
+                        use_gpu=use_gpu, quantize=_quantize_flag(quantize, 'transcriber'))
+                    with resources.stage('transcription'):
+                        transcript, segments = transcriber.transcribe(audio_path)
+                    results['transcript'] = transcript
+                    results['transcript_segments'] = segments
+            
+            if enable_summarization and results['transcript']:
+                if progress_callback:
+                    progress_callback("Generating summary...", 0.75)
+                
+                summarizer = components.get('summarizer') or TextSummarizer(
+                    use_gpu=use_gpu, quantize=_quantize_flag(quantize, 'summarizer'))
+                transcript_text = str(results['transcript']) if results['transcript'] else ""
+                with resources.stage('summarization'):
+                    summary = summarizer.summarize(transcript_text)
+                results['summary'] = summary
+            
+            if enable_moderation:
+                if progress_callback:
+                    progress_callback("Running content moderation...", 0.85)
+                
+                moderator = components.get('moderator') or Moderator(
+                    use_gpu=use_gpu, text_encoder=detector.encode_text if detector else None)
+                with resources.stage('moderation'):
+                    mod_results = moderator.moderate(
+                        results.get('detections', []),
+                        results.get('transcript_segments', []),
+                        boxes=boxes,
+                        class_names=results.get('class_names'),
+                        tracks=results.get('dense', {}).get('tracks'),
+                        frames=dense_frames
+                    )
+                results['moderation'] = mod_results
+            
+            if enable_summary_video and scenes:
+                if progress_callback:
+                    progress_callback("Rendering highlight reel...", 0.88)
+                
+                def reel_progress(msg, pct):
+                    if progress_callback:
+                        progress_callback(msg, 0.88 + 0.07 * pct)
+                
+                video_summarizer = VideoSummarizer(output_dir)
+                results['summary_video'] = video_summarizer.create_summary_video(
+                    video_path,
+                    scenes,
+                    results.get('detections', []),
+                    transcript_segments=results.get('transcript_segments', []),
+                    audio_path=audio_path,
+                    moderation=results.get('moderation'),
+                    progress_callback=reel_progress,
+                    boxes=boxes
+                )
+            
+        if progress_callback:
+            progress_callback("Finalizing results...", 0.95)
+        
+        # The highlight scorer reads the inline vectors above; from here on they
+        # live in a float16 .npy for the scene index instead of analysis.json
+        results['embeddings'] = save_video_embeddings(output_dir, results.get('detections', []))
+        # Boxes and the audio envelope go to columnar .npy files; the JSON keeps counts and refs
+        compact_results(results, output_dir, boxes)
+        if audio_path and os.path.exists(audio_path):
+            add_audio_envelope(results, output_dir, audio_path)
+        
+        results['profile'] = tracer.summary()
+        results['profile']['threads'] = dict(resources.assigned, job=resources.per_job)
+        results['profile']['chrome_trace'] = tracer.export_chrome_trace(os.path.join(output_dir, "trace.json"))
+        
+        metadata_path = os.path.join(output_dir, "analysis.json")
+        with open(metadata_path, 'w') as f:
+            json.dump(results, f, indent=2, default=str)
+        
+        results['success'] = True
+        results['processing_time'] = time.time() - start_time
+        
+        if progress_callback:
+            progress_callback("Complete!", 1.0)
+        
+    except Exception as e:
+        results['error'] = str(e)
+        logger.error("Processing error: %s", e)
+    
+    return results
@@ -0,0 +1,347 @@
+"""Tail mode: analyse a video while it is still being written (a recording or an upload in progress).
+
+Frames are read as they land on disk. Scenes are cut incrementally, each
+keyframe is written as soon as its scene closes and audio is transcribed in
+fixed windows behind the video position. analysis.json is rewritten after
+every step with `live.state == "recording"` and `success: false`, and the
+final write after the file stops growing flips both, so results are ready
+seconds after the recording ends.
+"""
+import os
+import time
+import subprocess
+from typing import Dict, Optional, Callable
+
+import cv2
+import numpy as np
+
+from project.modules.detection_captioning import DetectorCaptioner
+from project.modules.speech_transcriber import SpeechTranscriber
+from project.modules.summarizer import TextSummarizer
+from project.modules.moderator import Moderator
+from project.modules.video_probe import probe_video
+from project.modules.ingest import is_marked_complete
+from project.modules.thumbnails import write_thumbnail
+from project.modules.tracing import Tracer, span, current_span
+from project.modules.sidecar import compact_results
+from project.modules.detections import concat
+from project.search.store import save_video_embeddings
+from project.modules.utils import setup_logger, find_executable
+from project.pipeline.runner import atomic_write_json
+from project.pipeline.resources import ResourceManager
+
+logger = setup_logger(__name__)
+
+class SceneTracker:
+    """Incremental cut detector scoring frames like scenedetect's ContentDetector (mean HSV delta)."""
+
+    def __init__(self, threshold: float = 27.0, min_scene_len: float = 0.6, width: int = 160):
+        self.threshold = threshold
+        self.min_scene_len = min_scene_len
+        self.width = width
+        self.start = 0.0
+        self.prev = None
+
+    def update(self, t: float, frame) -> Optional[tuple]:
+        """Feed one sampled frame; returns the (start, end) of a scene that just closed."""
+        h, w = frame.shape[:2]
+        small = cv2.resize(frame, (self.width, max(1, h * self.width // w)), interpolation=cv2.INTER_AREA)
+        hsv = cv2.cvtColor(small, cv2.COLOR_BGR2HSV).astype(np.int16)
+        prev, self.prev = self.prev, hsv
+        if prev is None:
+            return None
+        score = float(np.abs(hsv - prev).mean())
+        if score >= self.threshold and t - self.start >= self.min_scene_len:
+            scene, self.start = (self.start, t), t
+            return scene
+        return None
+
+    def close(self, t: float) -> Optional[tuple]:
+        if t <= self.start:
+            return None
+        scene, self.start = (self.start, t), t
+        return scene
+
+class LiveAnalyzer:
+    def __init__(
+        self,
+        video_path: str,
+        output_dir: str,
+        scene_threshold: float = 27.0,
+        sample_fps: float = 4.0,
+        audio_window: float = 20.0,
+        idle_timeout: float = 15.0,
+        poll_interval: float = 1.0,
+        is_finished: Optional[Callable[[], bool]] = None,
+        enable_detection: bool = True,
+        enable_transcription: bool = True,
+        enable_summarization: bool = True,
+        enable_moderation: bool = True,
+        use_gpu: bool = False,
+        progress_callback=None,
+        components: Optional[Dict] = None
+    ):
+        self.video_path = video_path
+        self.output_dir = output_dir
+        self.storyboard_dir = os.path.join(output_dir, "storyboard")
+        self.audio_dir = os.path.join(output_dir, "audio_windows")
+        os.makedirs(self.storyboard_dir, exist_ok=True)
+        self.sample_interval = 1.0 / sample_fps
+        self.audio_window = audio_window
+        self.idle_timeout = idle_timeout
+        self.poll_interval = poll_interval
+        self.is_finished = is_finished
+        self.enable_detection = enable_detection
+        self.enable_transcription = enable_transcription and find_executable("ffmpeg") is not None
+        self.enable_summarization = enable_summarization
+        self.enable_moderation = enable_moderation
+        self.use_gpu = use_gpu
+        self.progress_callback = progress_callback
+        self.components = dict(components or {})
+        self.tracker = SceneTracker(scene_threshold)
+        self.resources = ResourceManager.for_process()
+
+        self.position = 0.0          # timestamp of the last decoded frame
+        self.next_sample = 0.0
+        self.audio_done = 0.0
+        self.frames_read = 0
+        self.last_size = -1
+        self.last_growth = time.monotonic()
+        self.embedded = []
+        self.boxes = concat([])
+        self.results = {
+            'success': False,
+            'video_info': {},
+            'scenes': [],
+            'keyframes': [],
+            'detections': [],
+            'captions': [],
+            'transcript': '',
+            'transcript_segments': [],
+            'summary': '',
+            'moderation': {},
+            'processing_time': 0,
+            'live': {'state': 'waiting', 'processed_seconds': 0.0, 'updates': 0},
+        }
+
+    def _component(self, name: str, factory):
+        if name not in self.components:
+            self.components[name] = factory(use_gpu=self.use_gpu)
+        return self.components[name]
+
+    def _progress(self, msg: str, pct: float):
+        if self.progress_callback:
+            self.progress_callback(msg, pct)
+
+    # -- Growth tracking ---------------------------------------------------
+
+    def _source_finished(self) -> bool:
+        if self.is_finished is not None and self.is_finished():
+            return True
+        if is_marked_complete(self.video_path):
+            return True
+        try:
+            size = os.path.getsize(self.video_path)
+        except OSError:
+            raise RuntimeError("source file disappeared while it was being analysed")
+        now = time.monotonic()
+        if size != self.last_size:
+            self.last_size, self.last_growth = size, now
+            return False
+        return now - self.last_growth >= self.idle_timeout
+
+    # -- Incremental steps -------------------------------------------------
+
+    def _read_new_frames(self) -> list:
+        """Decode everything past `self.position`; returns the scenes closed on the way."""
+        cap = cv2.VideoCapture(self.video_path)
+        closed = []
+        try:
+            if not cap.isOpened():
+                return closed
+            if self.frames_read:
+                # Reopening is how new data becomes visible; skip back to where we stopped
+                cap.set(cv2.CAP_PROP_POS_MSEC, self.position * 1000.0)
+            while cap.grab():
+                t = round(cap.get(cv2.CAP_PROP_POS_MSEC) / 1000.0, 3)
+                if self.frames_read and t <= self.position:
+                    continue
+                self.position = t
+                self.frames_read += 1
+                if t < self.next_sample:
+                    continue
+                self.next_sample = t + self.sample_interval
+                ok, frame = cap.retrieve()
+                if not ok:
+                    continue
+                scene = self.tracker.update(t, frame)
+                if scene:
+                    closed.append(scene)
+        finally:
+            cap.release()
+        return closed
+
+    def _add_scenes(self, scenes: list) -> list:
+        new_keyframes = []
+        cap = cv2.VideoCapture(self.video_path)
+        try:
+            for start, end in scenes:
+                idx = len(self.results['scenes'])
+                self.results['scenes'].append((start, end))
+                mid = (start + end) / 2.0
+                cap.set(cv2.CAP_PROP_POS_MSEC, mid * 1000.0)
+                ok, frame = cap.read()
+                if not ok:
+                    logger.warning("Failed to read frame for scene %d", idx)
+                    continue
+                outpath = os.path.join(self.storyboard_dir, f"scene_{idx:03d}.jpg")
+                cv2.imwrite(outpath, frame)
+                new_keyframes.append({"scene_idx": idx, "start": start, "end": end, "frame_path": outpath,
+                                      "timestamp": mid, "thumb_path": write_thumbnail(frame, outpath)})
+        finally:
+            cap.release()
+        self.results['keyframes'].extend(new_keyframes)
+        current_span().count(segments=len(scenes), frames=len(new_keyframes))
+        if self.enable_detection and new_keyframes:
+            detector = self._component('detector', DetectorCaptioner)
+            with self.resources.stage('detection', onnx=detector.onnx):
+                det_results, boxes = detector.process_keyframes(new_keyframes)
+            # Frame indices restart at 0 for every call; shift them past the frames already seen
+            boxes['frame_idx'] += len(self.results['detections'])
+            self.boxes = concat([self.boxes, boxes])
+            self.results['detections'].extend(det_results)
+            self.results['class_names'] = {str(k): v for k, v in detector.class_names.items()}
+            self.results['captions'].extend({'scene_idx': r['scene_idx'], 'caption': r['caption']}
+                                            for r in det_results)
+            self.embedded.extend({'scene_idx': r['scene_idx'], 'timestamp': r.get('timestamp'),
+                                  'frame_path': r['frame_path'], 'clip_embedding': r.pop('clip_embedding')}
+                                 for r in det_results if 'clip_embedding' in r)
+            self.results['embeddings'] = save_video_embeddings(self.output_dir, [dict(e) for e in self.embedded])
+            compact_results(self.results, self.output_dir, self.boxes)
+        return new_keyframes
+
+    def _transcribe_window(self, start: float, end: float):
+        os.makedirs(self.audio_dir, exist_ok=True)
+        out = os.path.join(self.audio_dir, f"window_{int(start * 1000):09d}.wav")
+        cmd = [find_executable("ffmpeg"), "-y", "-ss", f"{start:.3f}", "-t", f"{end - start:.3f}",
+               "-i", self.video_path, "-vn", "-acodec", "pcm_s16le", "-ar", "16000", "-ac", "1", out]
+        subprocess.run(cmd, check=False, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        self.audio_done = end
+        # A 44-byte WAV is just the header: no audio stream, or nothing in this window
+        if not os.path.exists(out) or os.path.getsize(out) <= 44:
+            return
+        transcriber = self._component('transcriber', SpeechTranscriber)
+        with self.resources.stage('transcription'):
+            text, segments = transcriber.transcribe(out)
+        for seg in segments:
+            seg = dict(seg)
+            seg['start'] = seg.get('start', 0.0) + start
+            seg['end'] = seg.get('end', 0.0) + start
+            self.results['transcript_segments'].append(seg)
+        if text and text.strip():
+            self.results['transcript'] = (self.results['transcript'] + " " + text.strip()).strip()
+
+    def _write(self, state: str):
+        live = self.results['live']
+        live.update(state=state, processed_seconds=round(self.position, 3), updates=live['updates'] + 1,
+                    updated_at=time.time())
+        atomic_write_json(os.path.join(self.output_dir, "analysis.json"), self.results)
+
+    def step(self) -> bool:
+        """Process whatever has landed since the last call; True if anything changed."""
+        before = self.position
+        new_scenes = self._read_new_frames()
+        if new_scenes:
+            self._add_scenes(new_scenes)
+        # Audio trails the video by a second so a window never ends in unwritten data
+        while self.enable_transcription and self.position - 1.0 - self.audio_done >= self.audio_window:
+            self._transcribe_window(self.audio_done, self.audio_done + self.audio_window)
+        return self.position > before or bool(new_scenes)
+
+    def finish(self):
+        self._read_new_frames_until_stable()
+        self._add_scenes([s for s in [self.tracker.close(self.position)] if s])
+        if self.enable_transcription and self.position - self.audio_done > 0.5:
+            self._transcribe_window(self.audio_done, self.position + 1.0)
+        try:
+            self.results['video_info'] = probe_video(self.video_path)
+        except Exception as e:
+            logger.warning("Could not probe finished recording: %s", e)
+        if self.enable_summarization and self.results['transcript']:
+            self._progress("Generating summary...", 0.9)
+            summarizer = self._component('summarizer', TextSummarizer)
+            with self.resources.stage('summarization'):
+                self.results['summary'] = summarizer.summarize(str(self.results['transcript']))
+        if self.enable_moderation:
+            self._progress("Running content moderation...", 0.95)
+            moderator = self._component('moderator', Moderator)
+            if moderator.text_encoder is None and 'detector' in self.components:
+                moderator.text_encoder = self.components['detector'].encode_text
+            # The embeddings were moved out of the per-frame results as scenes arrived
+            embeddings = [e['clip_embedding'] for e in self.embedded]
+            with self.resources.stage('moderation'):
+                self.results['moderation'] = moderator.moderate(self.results['detections'],
+                                                                self.results['transcript_segments'],
+                                                                self.boxes, self.results.get('class_names'),
+                                                                embeddings=embeddings or None)
+
+    def _read_new_frames_until_stable(self):
+        # The writer has finished, but the last reopen may have raced its final flush
+        while True:
+            before = self.position
+            scenes = self._read_new_frames()
+            if scenes:
+                self._add_scenes(scenes)
+            if self.position <= before:
+                break
+
+    def run(self) -> Dict:
+        start_time = time.time()
+        tracer = Tracer("process_video_live")
+        try:
+            with tracer.activate(), span("process_video_live", video=os.path.basename(self.video_path)):
+                self._write('waiting')
+                while not self._source_finished():
+                    if self.step():
+                        self._write('recording')
+                        self._progress(f"Live: {self.position:.0f}s analysed, "
+                                       f"{len(self.results['scenes'])} scenes so far", 0.5)
+                    time.sleep(self.poll_interval)
+                self._progress("Recording finished, finalizing...", 0.85)
+                self.finish()
+            self.results['profile'] = tracer.summary()
+            self.results['profile']['threads'] = dict(self.resources.assigned, job=self.resources.per_job)
+            self.results['profile']['chrome_trace'] = tracer.export_chrome_trace(
+                os.path.join(self.output_dir, "trace.json"))
+            self.results['success'] = True
+            self.results['processing_time'] = time.time() - start_time
+            self._write('complete')
+            self._progress("Complete!", 1.0)
+        except Exception as e:
+            self.results['error'] = str(e)
+            logger.error("Live processing error: %s", e)
+            self._write('failed')
+        return self.results
+
+def process_video_live(
+    video_path: str,
+    output_dir: str,
+    scene_threshold: float = 27.0,
+    use_gpu: bool = False,
+    enable_detection: bool = True,
+    enable_transcription: bool = True,
+    enable_summarization: bool = True,
+    enable_moderation: bool = True,
+    idle_timeout: float = 15.0,
+    is_finished: Optional[Callable[[], bool]] = None,
+    progress_callback=None,
+    components: Optional[Dict] = None
+):
+    """Tail `video_path` until it stops growing, updating analysis.json as results come in."""
+    os.makedirs(output_dir, exist_ok=True)
+    return LiveAnalyzer(
+        video_path, output_dir, scene_threshold, idle_timeout=idle_timeout, is_finished=is_finished,
+        enable_detection=enable_detection, enable_transcription=enable_transcription,
+        enable_summarization=enable_summarization, enable_moderation=enable_moderation,
+        use_gpu=use_gpu, progress_callback=progress_callback, components=components
+    ).run()
@@ -0,0 +1,909 @@
+"""Pipeline behind the Pro app: fast OpenCV/ffmpeg stages and lightweight NLP, no deep models."""
+import os
+import re
+import json
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import timedelta
+from typing import List, Dict, Optional, Tuple
+
+import cv2
+import numpy as np
+
+from project.modules.quality_profiler import QualityProfiler
+from project.modules.video_probe import probe_video
+from project.modules.thumbnails import write_thumbnail
+from project.modules.sidecar import add_audio_envelope
+from project.modules.tracing import Tracer, span, propagate
+
+def format_duration(seconds: float) -> str:
+    td = timedelta(seconds=int(seconds))
+    hours, remainder = divmod(td.seconds, 3600)
+    minutes, seconds = divmod(remainder, 60)
+    if hours > 0:
+        return f"{hours}h {minutes}m {seconds}s"
+    elif minutes > 0:
+        return f"{minutes}m {seconds}s"
+    else:
+        return f"{seconds}s"
+
+def check_system_capabilities():
+    capabilities = {
+        'opencv': False,
+        'scenedetect': False,
+        'speech_recognition': False,
+        'moviepy': False,
+        'textblob': False
+    }
+    
+    try:
+        import cv2
+        capabilities['opencv'] = True
+    except Exception:
+        pass
+    
+    try:
+        from scenedetect import detect, ContentDetector
+        capabilities['scenedetect'] = True
+    except Exception:
+        pass
+    
+    try:
+        import speech_recognition as sr
+        capabilities['speech_recognition'] = True
+    except Exception:
+        pass
+    
+    try:
+        import importlib
+        importlib.import_module("moviepy.editor")
+        capabilities['moviepy'] = True
+    except Exception:
+        # moviepy is optional; audio extraction will fall back to ffmpeg
+        capabilities['moviepy'] = False
+    
+    try:
+        from textblob import TextBlob
+        capabilities['textblob'] = True
+    except Exception:
+        pass
+    
+    return capabilities
+
+def extract_video_metadata(video_path: str) -> Dict:
+    return probe_video(video_path)
+
+def detect_scenes_fast(video_path: str, threshold: float = 27.0):
+    try:
+        from scenedetect import detect, ContentDetector
+        scenes = detect(video_path, ContentDetector(threshold=threshold))
+        return [(scene[0].get_seconds(), scene[1].get_seconds()) for scene in scenes]
+    except Exception as e:
+        metadata = extract_video_metadata(video_path)
+        duration = metadata['duration']
+        num_segments = max(1, int(duration / 10))
+        segment_duration = duration / num_segments
+        return [(i * segment_duration, (i + 1) * segment_duration) for i in range(num_segments)]
+
+def extract_keyframes_parallel(video_path: str, scenes: List[Tuple], output_dir: str):
+    fps = probe_video(video_path)['fps'] or 25
+    
+    keyframes = []
+    storyboard_dir = os.path.join(output_dir, "storyboard")
+    os.makedirs(storyboard_dir, exist_ok=True)
+    
+    @propagate
+    def extract_single_keyframe(idx, start, end):
+        try:
+            with span("extract_single_keyframe", scene=idx) as stage:
+                local_cap = cv2.VideoCapture(video_path)
+                mid = (start + end) / 2.0
+                frame_no = int(mid * fps)
+                local_cap.set(cv2.CAP_PROP_POS_FRAMES, frame_no)
+                ret, frame = local_cap.read()
+                local_cap.release()
+                
+                if ret:
+                    outpath = os.path.join(storyboard_dir, f"scene_{idx:03d}.jpg")
+                    cv2.imwrite(outpath, frame)
+                    stage.count(frames=1)
+                    return {
+                        'scene_idx': idx,
+                        'start': start,
+                        'end': end,
+                        'timestamp': mid,
+                        'frame_path': outpath,
+                        'thumb_path': write_thumbnail(frame, outpath)
+                    }
+        except Exception as e:
+            return None
+    
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        futures = {executor.submit(extract_single_keyframe, i, s, e): i for i, (s, e) in enumerate(scenes)}
+        for future in as_completed(futures):
+            result = future.result()
+            if result:
+                keyframes.append(result)
+    
+    return sorted(keyframes, key=lambda x: x['scene_idx'])
+
+def extract_audio_from_video(video_path: str, output_dir: str) -> str | None:
+    try:
+        from moviepy.editor import VideoFileClip  # type: ignore
+        audio_path = os.path.join(output_dir, "audio.wav")
+        
+        video = VideoFileClip(video_path)
+        if video.audio is not None:
+            video.audio.write_audiofile(
+                audio_path, 
+                fps=16000,
+                nbytes=2,
+                codec='pcm_s16le',
+                verbose=False,
+                logger=None
+            )
+            video.close()
+            if os.path.exists(audio_path) and os.path.getsize(audio_path) > 1000:
+                return audio_path
+        video.close()
+        return None
+    except Exception as e:
+        try:
+            import subprocess
+            audio_path = os.path.join(output_dir, "audio.wav")
+            subprocess.run(
+                ["ffmpeg", "-i", video_path, "-vn", "-acodec", "pcm_s16le", "-ar", "16000", "-ac", "1", audio_path],
+                capture_output=True, check=False, timeout=60
+            )
+            if os.path.exists(audio_path) and os.path.getsize(audio_path) > 1000:
+                return audio_path
+        except Exception:
+            pass
+        return None
+
+def analyze_audio_properties(audio_path: str) -> Dict:
+    """Analyze audio properties and quality"""
+    try:
+        from pydub import AudioSegment
+        
+        audio = AudioSegment.from_wav(audio_path)
+        
+        duration_sec = len(audio) / 1000.0
+        sample_rate = audio.frame_rate
+        channels = audio.channels
+        sample_width = audio.sample_width * 8
+        loudness = audio.dBFS
+        max_amplitude = audio.max
+        
+        return {
+            'duration': round(duration_sec, 2),
+            'sample_rate': sample_rate,
+            'channels': channels,
+            'bit_depth': sample_width,
+            'loudness_db': round(loudness, 2),
+            'max_amplitude': max_amplitude,
+            'file_size_mb': round(os.path.getsize(audio_path) / (1024*1024), 2),
+            'quality_score': min(100, int((sample_rate/16000) * 50 + (abs(loudness)/60) * 50))
+        }
+    except Exception as e:
+        return {
+            'duration': 0,
+            'sample_rate': 0,
+            'channels': 0,
+            'bit_depth': 0,
+            'loudness_db': 0,
+            'max_amplitude': 0,
+            'file_size_mb': 0,
+            'quality_score': 0
+        }
+
+def create_audio_waveform(audio_path: str) -> Optional[str]:
+    """Generate audio waveform visualization"""
+    try:
+        from pydub import AudioSegment
+        import matplotlib.pyplot as plt
+        import numpy as np
+        
+        audio = AudioSegment.from_wav(audio_path)
+        samples = np.array(audio.get_array_of_samples())
+        
+        if audio.channels == 2:
+            samples = samples.reshape((-1, 2))
+            samples = samples.mean(axis=1)
+        
+        sample_rate = audio.frame_rate
+        duration = len(audio) / 1000.0
+        time = np.linspace(0, duration, num=len(samples))
+        
+        plt.style.use('dark_background')
+        fig, ax = plt.subplots(figsize=(12, 4), facecolor='#1a1a2e')
+        ax.set_facecolor('#16213e')
+        
+        ax.plot(time, samples, color='#00d4ff', linewidth=0.5, alpha=0.8)
+        ax.fill_between(time, samples, color='#00d4ff', alpha=0.3)
+        
+        ax.set_xlabel('Time (seconds)', color='#ffffff', fontsize=12)
+        ax.set_ylabel('Amplitude', color='#ffffff', fontsize=12)
+        ax.set_title('🎵 Audio Waveform Analysis', color='#ffffff', fontsize=14, pad=15)
+        
+        ax.tick_params(colors='#ffffff')
+        ax.spines['bottom'].set_color('#00d4ff')
+        ax.spines['left'].set_color('#00d4ff')
+        ax.spines['top'].set_visible(False)
+        ax.spines['right'].set_visible(False)
+        
+        ax.grid(True, alpha=0.2, color='#ffffff', linestyle='--')
+        
+        plt.tight_layout()
+        
+        waveform_path = audio_path.replace('audio.wav', 'waveform.png')
+        plt.savefig(waveform_path, dpi=150, facecolor='#1a1a2e', edgecolor='none')
+        plt.close()
+        
+        return waveform_path if os.path.exists(waveform_path) else None
+        
+    except Exception as e:
+        print(f"Waveform generation error: {str(e)}")
+        return None
+
+def transcribe_audio_advanced(audio_path: str, target_language: str = 'auto') -> Dict:
+    """
+    Advanced multi-language audio transcription with automatic language detection
+    
+    Supported languages:
+    - English (en-US), Spanish (es-ES), French (fr-FR), German (de-DE)
+    - Chinese (zh-CN), Japanese (ja-JP), Korean (ko-KR), Hindi (hi-IN)
+    - Arabic (ar-SA), Russian (ru-RU), Portuguese (pt-BR), Italian (it-IT)
+    - Dutch (nl-NL), Polish (pl-PL), Turkish (tr-TR), Vietnamese (vi-VN)
+    """
+    if not audio_path or not os.path.exists(audio_path):
+        return {
+            'text': 'No audio detected in video.',
+            'word_count': 0,
+            'estimated_words': 0,
+            'confidence': 0,
+            'status': 'no_audio',
+            'language': 'unknown',
+            'detected_language': 'unknown'
+        }
+    
+    try:
+        import speech_recognition as sr
+        recognizer = sr.Recognizer()
+        
+        # Enhanced settings for multi-language
+        recognizer.energy_threshold = 300
+        recognizer.dynamic_energy_threshold = True
+        recognizer.pause_threshold = 0.8
+        
+        audio_file = sr.AudioFile(audio_path)
+        with audio_file as source:
+            recognizer.adjust_for_ambient_noise(source, duration=1)
+            audio_data = recognizer.record(source)
+        
+        # Language mapping for Google Speech API
+        language_codes = {
+            'auto': None,  # Auto-detect
+            'English': 'en-US',
+            'Spanish': 'es-ES',
+            'French': 'fr-FR',
+            'German': 'de-DE',
+            'Chinese': 'zh-CN',
+            'Japanese': 'ja-JP',
+            'Korean': 'ko-KR',
+            'Hindi': 'hi-IN',
+            'Arabic': 'ar-SA',
+            'Russian': 'ru-RU',
+            'Portuguese': 'pt-BR',
+            'Italian': 'it-IT',
+            'Dutch': 'nl-NL',
+            'Polish': 'pl-PL',
+            'Turkish': 'tr-TR',
+            'Vietnamese': 'vi-VN'
+        }
+        
+        # Determine language code
+        lang_code = language_codes.get(target_language, 'en-US') if target_language != 'auto' else 'en-US'
+        
+        # Try transcription with selected/detected language
+        try:
+            if target_language == 'auto':
+                # Try multiple languages for auto-detection
+                languages_to_try = ['en-US', 'es-ES', 'fr-FR', 'de-DE', 'zh-CN', 'hi-IN', 'ar-SA', 'ru-RU']
+                best_result = None
+                best_confidence = 0
+                
+                for lang in languages_to_try:
+                    try:
+                        text = recognizer.recognize_google(audio_data, language=lang, show_all=False)  # type: ignore
+                        if text and len(text.strip()) > 10:  # Valid transcription
+                            # Simple confidence heuristic: longer = more likely correct
+                            confidence = min(0.95, 0.6 + (len(text) / 500))
+                            if confidence > best_confidence:
+                                best_confidence = confidence
+                                best_result = {
+                                    'text': text,
+                                    'language': lang,
+                                    'detected_language': lang.split('-')[0].upper()
+                                }
+                    except:
+                        continue
+                
+                if best_result:
+                    words = len(best_result['text'].split())
+                    return {
+                        'text': best_result['text'],
+                        'word_count': words,
+                        'estimated_words': words,
+                        'confidence': best_confidence,
+                        'status': 'success',
+                        'language': best_result['language'],
+                        'detected_language': best_result['detected_language']
+                    }
+            else:
+                # Use specified language
+                text = recognizer.recognize_google(audio_data, language=lang_code, show_all=False)  # type: ignore
+                if text and len(text.strip()) > 0:
+                    words = len(text.split())
+                    return {
+                        'text': text,
+                        'word_count': words,
+                        'estimated_words': words,
+                        'confidence': 0.85,
+                        'status': 'success',
+                        'language': lang_code,
+                        'detected_language': target_language
+                    }
+            
+            return {
+                'text': 'No clear speech detected in audio.',
+                'word_count': 0,
+                'estimated_words': 0,
+                'confidence': 0,
+                'status': 'no_speech',
+                'language': lang_code,
+                'detected_language': 'unknown'
+            }
+            
+        except sr.UnknownValueError:
+            return {
+                'text': 'Speech was unclear or no speech detected.',
+                'word_count': 0,
+                'estimated_words': 0,
+                'confidence': 0,
+                'status': 'no_speech',
+                'language': lang_code,
+                'detected_language': 'unknown'
+            }
+        except sr.RequestError as e:
+            return {
+                'text': f'Speech recognition service error: {str(e)}',
+                'word_count': 0,
+                'estimated_words': 0,
+                'confidence': 0,
+                'status': 'error',
+                'language': lang_code,
+                'detected_language': 'unknown'
+            }
+    
+    except Exception as e:
+        return {
+            'text': f'Transcription error: {str(e)}',
+            'word_count': 0,
+            'estimated_words': 0,
+            'confidence': 0,
+            'status': 'error',
+            'language': 'unknown',
+            'detected_language': 'unknown'
+        }
+
+def generate_text_summary(text: str, max_sentences: int = 3) -> Dict:
+    """Generate concise, accurate AI summary from transcribed text"""
+    if not text or len(text.strip()) == 0:
+        return {
+            'summary': 'No speech detected in video.',
+            'key_points': [],
+            'sentiment': 'neutral',
+            'topics': []
+        }
+    
+    try:
+        from textblob import TextBlob
+        import nltk
+        from nltk.tokenize import sent_tokenize
+        from nltk.corpus import stopwords
+        
+        # Download required NLTK data
+        try:
+            nltk.data.find('tokenizers/punkt')
+        except LookupError:
+            nltk.download('punkt', quiet=True)
+        
+        try:
+            nltk.data.find('corpora/stopwords')
+        except LookupError:
+            nltk.download('stopwords', quiet=True)
+        
+        blob = TextBlob(text)
+        sentences = list(blob.sentences)  # type: ignore
+        
+        if len(sentences) == 0:
+            return {
+                'summary': text[:200] + '...' if len(text) > 200 else text,
+                'key_points': [],
+                'sentiment': 'neutral',
+                'topics': []
+            }
+        
+        # Score sentences by importance (word frequency + position)
+        stop_words = set(stopwords.words('english'))
+        word_frequencies = {}
+        
+        for word in blob.words:  # type: ignore
+            if word.lower() not in stop_words and len(word) > 3:
+                word_frequencies[word.lower()] = word_frequencies.get(word.lower(), 0) + 1
+        
+        # Normalize frequencies
+        max_freq = max(word_frequencies.values()) if word_frequencies else 1
+        for word in word_frequencies:
+            word_frequencies[word] = word_frequencies[word] / max_freq
+        
+        # Score sentences
+        sentence_scores = {}
+        for i, sentence in enumerate(sentences):
+            score = 0
+            word_count = 0
+            for word in sentence.words:
+                if word.lower() in word_frequencies:
+                    score += word_frequencies[word.lower()]
+                    word_count += 1
+            
+            # Boost first and last sentences
+            if i == 0:
+                score *= 1.5
+            elif i == len(sentences) - 1:
+                score *= 1.2
+            
+            if word_count > 0:
+                sentence_scores[i] = score / word_count
+        
+        # Select top sentences
+        if len(sentence_scores) > 0:
+            top_indices = sorted(sentence_scores, key=lambda x: sentence_scores.get(x, 0), reverse=True)[:max_sentences]
+            top_indices.sort()  # Maintain original order
+            selected_sentences = [str(sentences[i]) for i in top_indices]
+        else:
+            selected_sentences = [str(s) for s in sentences[:max_sentences]]
+        
+        summary = ' '.join(selected_sentences)
+        
+        # Extract key points (top 3 most important sentences)
+        key_points = selected_sentences[:3] if len(selected_sentences) >= 3 else selected_sentences
+        
+        # Sentiment analysis with improved accuracy
+        sentiment_score = blob.sentiment.polarity  # type: ignore
+        subjectivity = blob.sentiment.subjectivity  # type: ignore
+        
+        if sentiment_score > 0.15:
+            sentiment = 'positive'
+        elif sentiment_score < -0.15:
+            sentiment = 'negative'
+        else:
+            sentiment = 'neutral'
+        
+        # Extract topics (most frequent meaningful words)
+        words = [word.lower() for word in blob.words if word.lower() not in stop_words and len(word) > 4]  # type: ignore
+        word_freq = Counter(words)
+        topics = [word for word, count in word_freq.most_common(5)]
+        
+        return {
+            'summary': summary[:500] + '...' if len(summary) > 500 else summary,  # Limit to 500 chars
+            'key_points': key_points,
+            'sentiment': sentiment,
+            'sentiment_score': sentiment_score,
+            'subjectivity': subjectivity,
+            'topics': topics,
+            'word_count': len(text.split())
+        }
+    
+    except Exception as e:
+        # Fallback to simple sentence splitting
+        sentences = text.split('.')
+        sentences = [s.strip() for s in sentences if s.strip()]
+        summary = '. '.join(sentences[:max_sentences]) + '.' if len(sentences) > max_sentences else text
+        return {
+            'summary': summary[:300] + '...' if len(summary) > 300 else summary,
+            'key_points': sentences[:3] if len(sentences) >= 3 else sentences,
+            'sentiment': 'neutral',
+            'topics': [],
+            'word_count': len(text.split())
+        }
+
+def detect_content_issues(text: str, keyframes: List, language: str = 'en') -> Dict:
+    """
+    Multi-language content moderation supporting 16+ languages
+    Detects profanity, violence, adult content across different languages
+    """
+    
+    # Multi-language profanity lists
+    profanity_lists = {
+        'en': {'fuck', 'shit', 'damn', 'hell', 'bitch', 'ass', 'bastard', 'dick', 'pussy', 'cunt', 'whore', 'slut'},
+        'es': {'mierda', 'puta', 'coño', 'joder', 'cabrón', 'pendejo', 'verga', 'chingar'},
+        'fr': {'merde', 'putain', 'con', 'salope', 'connard', 'chier', 'bordel'},
+        'de': {'scheiße', 'fick', 'arsch', 'hure', 'verdammt', 'schlampe'},
+        'zh': {'操', '妈的', '傻逼', '混蛋', '婊子', '狗屎'},
+        'ja': {'くそ', 'ばか', 'あほ', 'しね', 'ちくしょう'},
+        'ko': {'씨발', '개새끼', '병신', '지랄', '엿먹어'},
+        'hi': {'बकवास', 'कमीना', 'चूतिया', 'हरामी'},
+        'ar': {'تبا', 'لعنة', 'قذر', 'عاهرة'},
+        'ru': {'блять', 'сука', 'хуй', 'пизда', 'ебать'},
+        'pt': {'merda', 'porra', 'caralho', 'puta', 'foda'},
+        'it': {'cazzo', 'merda', 'puttana', 'stronzo', 'figa'},
+        'nl': {'kut', 'shit', 'klootzak', 'hoer', 'lul'},
+        'pl': {'kurwa', 'pierdolić', 'gówno', 'suka'},
+        'tr': {'siktir', 'amk', 'orospu', 'piç', 'bok'},
+        'vi': {'địt', 'đụ', 'cứt', 'đĩ', 'chó'}
+    }
+    
+    # Multi-language violence keywords
+    violence_keywords = {
+        'en': {'kill', 'murder', 'death', 'blood', 'gun', 'shoot', 'fight', 'attack', 'violence', 'weapon', 'bomb', 'terrorist', 'war'},
+        'es': {'matar', 'asesinar', 'muerte', 'sangre', 'pistola', 'disparar', 'pelear', 'atacar', 'violencia', 'arma', 'bomba', 'guerra'},
+        'fr': {'tuer', 'assassiner', 'mort', 'sang', 'pistolet', 'tirer', 'combattre', 'attaquer', 'violence', 'arme', 'bombe', 'guerre'},
+        'de': {'töten', 'morden', 'tod', 'blut', 'waffe', 'schießen', 'kämpfen', 'angriff', 'gewalt', 'bombe', 'krieg'},
+        'zh': {'杀', '谋杀', '死亡', '血', '枪', '射击', '打架', '攻击', '暴力', '武器', '炸弹', '战争'},
+        'ja': {'殺す', '殺人', '死', '血', '銃', '撃つ', '戦う', '攻撃', '暴力', '武器', '爆弾', '戦争'},
+        'ko': {'죽이다', '살인', '죽음', '피', '총', '쏘다', '싸우다', '공격', '폭력', '무기', '폭탄', '전쟁'},
+        'hi': {'मारना', 'हत्या', 'मौत', 'खून', 'बंदूक', 'गोली', 'लड़ाई', 'हमला', 'हिंसा', 'हथियार', 'बम', 'युद्ध'},
+        'ar': {'قتل', 'جريمة قتل', 'موت', 'دم', 'مسدس', 'إطلاق نار', 'قتال', 'هجوم', 'عنف', 'سلاح', 'قنبلة', 'حرب'},
+        'ru': {'убить', 'убийство', 'смерть', 'кровь', 'пистолет', 'стрелять', 'драться', 'атака', 'насилие', 'оружие', 'бомба', 'война'},
+        'pt': {'matar', 'assassinar', 'morte', 'sangue', 'arma', 'atirar', 'lutar', 'atacar', 'violência', 'bomba', 'guerra'},
+        'it': {'uccidere', 'omicidio', 'morte', 'sangue', 'pistola', 'sparare', 'combattere', 'attacco', 'violenza', 'arma', 'bomba', 'guerra'},
+        'nl': {'doden', 'moord', 'dood', 'bloed', 'pistool', 'schieten', 'vechten', 'aanval', 'geweld', 'wapen', 'bom', 'oorlog'},
+        'pl': {'zabić', 'morderstwo', 'śmierć', 'krew', 'pistolet', 'strzelać', 'walczyć', 'atak', 'przemoc', 'broń', 'bomba', 'wojna'},
+        'tr': {'öldürmek', 'cinayet', 'ölüm', 'kan', 'silah', 'ateş', 'kavga', 'saldırı', 'şiddet', 'bomba', 'savaş'},
+        'vi': {'giết', 'giết người', 'chết', 'máu', 'súng', 'bắn', 'đánh nhau', 'tấn công', 'bạo lực', 'vũ khí', 'bom', 'chiến tranh'}
+    }
+    
+    # Multi-language adult content keywords
+    adult_keywords = {
+        'en': {'sex', 'porn', 'nude', 'naked', 'adult', 'xxx', 'explicit', 'erotic', 'sexual', 'nsfw'},
+        'es': {'sexo', 'porno', 'desnudo', 'adulto', 'xxx', 'explícito', 'erótico', 'sexual'},
+        'fr': {'sexe', 'porno', 'nu', 'adulte', 'xxx', 'explicite', 'érotique', 'sexuel'},
+        'de': {'sex', 'porno', 'nackt', 'erwachsene', 'xxx', 'explizit', 'erotisch', 'sexuell'},
+        'zh': {'性', '色情', '裸体', '成人', 'xxx', '露骨', '情色', '性的'},
+        'ja': {'セックス', 'ポルノ', 'ヌード', '裸', 'アダルト', 'xxx', '露骨', 'エロ', '性的'},
+        'ko': {'섹스', '포르노', '누드', '벌거벗은', '성인', 'xxx', '노골적인', '에로틱', '성적인'},
+        'hi': {'यौन', 'पोर्न', 'नग्न', 'वयस्क', 'xxx', 'स्पष्ट', 'कामुक', 'यौन'},
+        'ar': {'جنس', 'إباحي', 'عاري', 'بالغ', 'xxx', 'صريح', 'مثير', 'جنسي'},
+        'ru': {'секс', 'порно', 'обнаженный', 'взрослый', 'xxx', 'откровенный', 'эротический', 'сексуальный'},
+        'pt': {'sexo', 'pornô', 'nu', 'adulto', 'xxx', 'explícito', 'erótico', 'sexual'},
+        'it': {'sesso', 'porno', 'nudo', 'adulto', 'xxx', 'esplicito', 'erotico', 'sessuale'},
+        'nl': {'sex', 'porno', 'naakt', 'volwassen', 'xxx', 'expliciet', 'erotisch', 'seksueel'},
+        'pl': {'seks', 'porno', 'nagi', 'dorosły', 'xxx', 'wyraźny', 'erotyczny', 'seksualny'},
+        'tr': {'seks', 'porno', 'çıplak', 'yetişkin', 'xxx', 'açık', 'erotik', 'cinsel'},
+        'vi': {'tình dục', 'khiêu dâm', 'khỏa thân', 'người lớn', 'xxx', 'rõ ràng', 'khiêu gợi', 'tình dục'}
+    }
+    
+    # Detect language from code (e.g., 'en-US' -> 'en')
+    lang_code = language.split('-')[0].lower() if '-' in language else language.lower()
+    
+    # Get appropriate word lists for detected language
+    profanity_set = profanity_lists.get(lang_code, profanity_lists['en'])
+    violence_set = violence_keywords.get(lang_code, violence_keywords['en'])
+    adult_set = adult_keywords.get(lang_code, adult_keywords['en'])
+    
+    # Also include English keywords for multilingual content
+    if lang_code != 'en':
+        profanity_set = profanity_set.union(profanity_lists['en'])
+        violence_set = violence_set.union(violence_keywords['en'])
+        adult_set = adult_set.union(adult_keywords['en'])
+    
+    text_lower = text.lower()
+    words = re.findall(r'\b\w+\b', text_lower)
+    
+    profanity_found = [word for word in words if word in profanity_set]
+    violence_found = [word for word in words if word in violence_set]
+    adult_found = [word for word in words if word in adult_set]
+    
+    issues = []
+    severity_score = 0
+    
+    if profanity_found:
+        issues.append({
+            'type': 'Profanity',
+            'severity': 'Medium',
+            'count': len(profanity_found),
+            'examples': list(set(profanity_found))[:5]
+        })
+        severity_score += len(profanity_found) * 2
+    
+    if violence_found:
+        issues.append({
+            'type': 'Violence',
+            'severity': 'High',
+            'count': len(violence_found),
+            'examples': list(set(violence_found))[:5]
+        })
+        severity_score += len(violence_found) * 3
+    
+    if adult_found:
+        issues.append({
+            'type': 'Adult Content',
+            'severity': 'High',
+            'count': len(adult_found),
+            'examples': list(set(adult_found))[:5]
+        })
+        severity_score += len(adult_found) * 3
+    
+    # Visual content analysis
+    avg_brightness = 128
+    if keyframes:
+        try:
+            sample_frames = keyframes[:min(5, len(keyframes))]
+            brightness_values = []
+            for kf in sample_frames:
+                if os.path.exists(kf['frame_path']):
+                    img = cv2.imread(kf['frame_path'])
+                    if img is not None:
+                        gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+                        brightness_values.append(float(np.mean(gray)))  # type: ignore
+            if brightness_values:
+                avg_brightness = np.mean(brightness_values)
+        except Exception:
+            pass
+    
+    if avg_brightness < 50:
+        issues.append({
+            'type': 'Dark Content',
+            'severity': 'Low',
+            'count': 1,
+            'examples': ['Video contains predominantly dark scenes']
+        })
+        severity_score += 5
+    
+    if severity_score > 20:
+        rating = 'Not Safe'
+        recommendation = 'Content requires moderation and age restriction'
+    elif severity_score > 10:
+        rating = 'Caution'
+        recommendation = 'Content may require age verification'
+    else:
+        rating = 'Safe'
+        recommendation = 'Content is suitable for general audiences'
+    
+    return {
+        'issues': issues,
+        'severity_score': severity_score,
+        'rating': rating,
+        'recommendation': recommendation,
+        'is_safe': severity_score <= 10,
+        'total_flags': len(issues),
+        'language': language,
+        'moderation_language': lang_code
+    }
+
+def analyze_video_quality(video_path: str, metadata: Optional[Dict] = None, scenes: Optional[List] = None) -> Dict:
+    metadata = metadata or extract_video_metadata(video_path)
+    
+    width = metadata['width']
+    height = metadata['height']
+    fps = metadata['fps']
+    
+    resolution_quality = 'Low'
+    if width >= 3840:
+        resolution_quality = '4K Ultra HD'
+    elif width >= 1920:
+        resolution_quality = 'Full HD 1080p'
+    elif width >= 1280:
+        resolution_quality = 'HD 720p'
+    elif width >= 854:
+        resolution_quality = 'SD 480p'
+    
+    fps_quality = 'Standard'
+    if fps >= 60:
+        fps_quality = 'High (60+ FPS)'
+    elif fps >= 30:
+        fps_quality = 'Good (30 FPS)'
+    else:
+        fps_quality = 'Low (< 30 FPS)'
+    
+    # Sample frames uniformly across the whole video in one decode pass
+    profile = QualityProfiler().profile(video_path, fps=fps, frame_count=metadata.get('frame_count', 0), scenes=scenes)
+    
+    # Zero (rated Poor) when no frame could be decoded; the profiler logs a warning
+    avg_sharpness = profile.get('avg_sharpness', 0)
+    sharpness_quality = 'Good'
+    if avg_sharpness > 500:
+        sharpness_quality = 'Excellent'
+    elif avg_sharpness > 100:
+        sharpness_quality = 'Good'
+    else:
+        sharpness_quality = 'Poor'
+    
+    overall_score = 0
+    if resolution_quality in ['4K Ultra HD', 'Full HD 1080p']:
+        overall_score += 40
+    elif resolution_quality in ['HD 720p']:
+        overall_score += 30
+    else:
+        overall_score += 15
+    
+    if fps >= 60:
+        overall_score += 30
+    elif fps >= 30:
+        overall_score += 25
+    else:
+        overall_score += 10
+    
+    if sharpness_quality == 'Excellent':
+        overall_score += 30
+    elif sharpness_quality == 'Good':
+        overall_score += 20
+    else:
+        overall_score += 5
+    
+    return {
+        'resolution_quality': resolution_quality,
+        'fps_quality': fps_quality,
+        'sharpness_quality': sharpness_quality,
+        'overall_score': overall_score,
+        'overall_rating': 'Excellent' if overall_score >= 85 else 'Good' if overall_score >= 60 else 'Fair' if overall_score >= 40 else 'Poor',
+        'avg_sharpness': round(float(avg_sharpness), 2),
+        'avg_brightness': profile.get('avg_brightness', 0),
+        'avg_noise': profile.get('avg_noise', 0),
+        'avg_blockiness': profile.get('avg_blockiness', 0),
+        'frames_sampled': profile.get('frames_sampled', 0),
+        'timeline': profile.get('timeline', [])
+    }
+
+def process_video_pro(
+    video_path: str,
+    output_dir: str,
+    scene_threshold: float = 27.0,
+    target_language: str = 'auto',
+    progress_callback=None
+):
+    start_time = time.time()
+    results = {
+        'success': False,
+        'video_info': {},
+        'scenes': [],
+        'keyframes': [],
+        'transcription': {},
+        'summary': {},
+        'content_moderation': {},
+        'quality_analysis': {},
+        'processing_time': 0,
+        'language': target_language
+    }
+    
+    tracer = Tracer("process_video_pro")
+    
+    try:
+        with tracer.activate(), span("process_video_pro", video=os.path.basename(video_path)):
+            if progress_callback:
+                progress_callback("📊 Analyzing video metadata...", 0.05)
+            
+            with span("extract_video_metadata"):
+                video_info = extract_video_metadata(video_path)
+            results['video_info'] = video_info
+            
+            if progress_callback:
+                progress_callback("🎬 Detecting scenes with AI...", 0.15)
+            
+            with span("detect_scenes") as stage:
+                scenes = detect_scenes_fast(video_path, threshold=scene_threshold)
+                stage.count(segments=len(scenes))
+            results['scenes'] = scenes
+            
+            if progress_callback:
+                progress_callback("🖼️ Extracting keyframes (parallel processing)...", 0.30)
+            
+            with span("extract_keyframes") as stage:
+                keyframes = extract_keyframes_parallel(video_path, scenes, output_dir)
+                stage.count(frames=len(keyframes))
+            results['keyframes'] = keyframes
+            
+            if progress_callback:
+                progress_callback("🎵 Extracting audio from video...", 0.45)
+            
+            with span("extract_audio"):
+                audio_path = extract_audio_from_video(video_path, output_dir)
+            
+            if audio_path:
+                if progress_callback:
+                    progress_callback("🎵 Analyzing audio properties...", 0.50)
+                
+                with span("analyze_audio"):
+                    audio_properties = analyze_audio_properties(audio_path)
+                results['audio_properties'] = audio_properties
+                
+                if progress_callback:
+                    progress_callback("📊 Generating audio waveform...", 0.55)
+                
+                with span("audio_waveform"):
+                    waveform_path = create_audio_waveform(audio_path)
+                results['waveform_path'] = waveform_path
+                add_audio_envelope(results, output_dir, audio_path)
+            
+            if progress_callback:
+                lang_display = 'Auto-Detecting' if target_language == 'auto' else target_language
+                progress_callback(f"🎤 Transcribing speech ({lang_display})...", 0.60)
+            
+            with span("transcribe", language=target_language) as stage:
+                if audio_path:
+                    transcription = transcribe_audio_advanced(audio_path, target_language)
+                else:
+                    transcription = {
+                        'text': 'No audio detected in video.',
+                        'word_count': 0,
+                        'status': 'no_audio',
+                        'language': 'en-US',
+                        'detected_language': 'English'
+                    }
+                stage.count(tokens=transcription.get('word_count', 0))
+            results['transcription'] = transcription
+            
+            # Get detected language for content moderation
+            detected_lang = transcription.get('language', 'en-US')
+            
+            if progress_callback:
+                progress_callback("📝 Generating intelligent summary...", 0.75)
+            
+            with span("summarize") as stage:
+                summary = generate_text_summary(transcription.get('text', ''))
+                stage.count(tokens=summary.get('word_count', 0))
+            results['summary'] = summary
+            
+            if progress_callback:
+                progress_callback("🛡️ Running multi-language content moderation...", 0.85)
+            
+            with span("moderate") as stage:
+                content_moderation = detect_content_issues(
+                    transcription.get('text', ''), 
+                    keyframes,
+                    detected_lang
+                )
+                stage.count(tokens=transcription.get('word_count', 0), frames=min(5, len(keyframes)))
+            results['content_moderation'] = content_moderation
+            
+            if progress_callback:
+                progress_callback("📈 Analyzing video quality...", 0.92)
+            
+            with span("analyze_quality") as stage:
+                quality_analysis = analyze_video_quality(video_path, video_info, scenes)
+                stage.count(frames=quality_analysis.get('frames_sampled', 0))
+            results['quality_analysis'] = quality_analysis
+        
+        if progress_callback:
+            progress_callback("💾 Saving results...", 0.97)
+        
+        results['profile'] = tracer.summary()
+        results['profile']['chrome_trace'] = tracer.export_chrome_trace(os.path.join(output_dir, "trace.json"))
+        
+        analysis_path = os.path.join(output_dir, "analysis.json")
+        with open(analysis_path, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2, ensure_ascii=False, default=str)
+        
+        summary_path = os.path.join(output_dir, "summary.txt")
+        with open(summary_path, 'w', encoding='utf-8') as f:
+            f.write("=== VIDEO ANALYSIS SUMMARY ===\n\n")
+            f.write(f"Language: {transcription.get('detected_language', 'Unknown')}\n")
+            f.write(f"Transcription:\n{transcription.get('text', 'No speech detected')}\n\n")
+            f.write(f"Summary:\n{summary.get('summary', 'N/A')}\n\n")
+            f.write(f"Sentiment: {summary.get('sentiment', 'neutral')}\n")
+            f.write(f"Content Rating: {content_moderation.get('rating', 'Unknown')}\n")
+        
+        results['success'] = True
+        results['processing_time'] = time.time() - start_time
+        
+        if progress_callback:
+            progress_callback("✅ Analysis complete!", 1.0)
+        
+    except Exception as e:
+        results['error'] = str(e)
+        results['success'] = False
+    
+    return results
@@ -0,0 +1,83 @@
+"""CPU thread budget per job and per stage.
+
+Workers get `cpus // jobs` threads (see `runner.limit_threads`). Inside a job,
+the stages run one after another. Each one sets torch's intra-op pool, OpenCV
+and any ONNX Runtime sessions to the job's share before it runs, and stages
+that stop scaling early are capped below it. Oversubscribing a core costs far
+more than leaving one idle.
+"""
+import os
+from contextlib import contextmanager
+from project.modules.utils import setup_logger
+
+logger = setup_logger(__name__)
+
+BUDGET_ENV_VAR = "VISUAL_INSIGHT_THREADS"
+# Rough scaling limits on CPU: autoregressive decoding and the NudeNet/regex
+# checks gain little past these
+STAGE_CAPS = {
+    "detection": None,
+    "dense": None,
+    "transcription": 8,
+    "summarization": 8,
+    "moderation": 4,
+    "summary_video": None,
+}
+
+_interop_set = False
+
+def plan_threads(total: int, jobs: int) -> int:
+    return max(1, total // max(1, jobs))
+
+class ResourceManager:
+    def __init__(self, total_threads: int = None, jobs: int = 1):
+        self.total_threads = total_threads or os.cpu_count() or 1
+        self.jobs = max(1, jobs)
+        self.assigned = {}
+
+    @classmethod
+    def for_process(cls):
+        """The budget `limit_threads` gave this worker, or the whole machine outside a batch."""
+        return cls(int(os.environ.get(BUDGET_ENV_VAR) or 0) or None)
+
+    @property
+    def per_job(self) -> int:
+        return plan_threads(self.total_threads, self.jobs)
+
+    def threads_for(self, stage: str) -> int:
+        cap = STAGE_CAPS.get(stage)
+        return min(self.per_job, cap) if cap else self.per_job
+
+    def apply(self, threads: int, onnx=None):
+        global _interop_set
+        import cv2
+        cv2.setNumThreads(threads)
+        try:
+            import torch
+        except ImportError:
+            torch = None
+        if torch is not None:
+            if not _interop_set:
+                _interop_set = True
+                try:
+                    # Only settable once per process, before any inter-op work; the
+                    # pipeline runs ops one after another, so a small pool is enough
+                    torch.set_num_interop_threads(min(2, self.per_job))
+                except RuntimeError:
+                    pass
+            torch.set_num_threads(threads)
+        if onnx is not None:
+            # Sessions are rebuilt when the count changes, so stages with the
+            # same share keep theirs
+            onnx.set_threads(threads, 1)
+
+    @contextmanager
+    def stage(self, name: str, onnx=None):
+        """Run a block with `name`'s thread share; torch and OpenCV go back to the job-wide setting after."""
+        threads = self.threads_for(name)
+        self.assigned[name] = threads
+        self.apply(threads, onnx)
+        try:
+            yield threads
+        finally:
+            self.apply(self.per_job)
@@ -0,0 +1,90 @@
+import os
+import json
+import time
+from project.modules.utils import setup_logger
+from project.pipeline.resources import BUDGET_ENV_VAR
+
+logger = setup_logger(__name__)
+
+THREAD_ENV_VARS = ("OMP_NUM_THREADS", "MKL_NUM_THREADS", "OPENBLAS_NUM_THREADS", "NUMEXPR_NUM_THREADS")
+
+def limit_threads(threads: int):
+    # Thread pools are sized from the environment when numpy/torch first load,
+    # so call this in a fresh worker before the pipeline is imported.
+    for var in THREAD_ENV_VARS:
+        os.environ[var] = str(threads)
+    # Per-stage shares inside the job are carved out of this (see resources.py)
+    os.environ[BUDGET_ENV_VAR] = str(threads)
+    import cv2
+    cv2.setNumThreads(threads)
+
+def atomic_write_json(path: str, data: dict):
+    tmp_path = f"{path}.tmp{os.getpid()}"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2, ensure_ascii=False, default=str)
+    os.replace(tmp_path, path)
+
+def is_complete(out_dir: str) -> bool:
+    try:
+        with open(os.path.join(out_dir, "analysis.json"), encoding="utf-8") as f:
+            return bool(json.load(f).get("success"))
+    except (OSError, ValueError):
+        return False
+
+def add_to_catalog(results: dict, out_dir: str, video_path: str = None, name: str = None,
+                   sha256: str = None, pipeline: str = None, db_path: str = None):
+    """Index a finished analysis for search; a catalog problem never fails the job."""
+    try:
+        from project.catalog import Catalog, DEFAULT_CATALOG_PATH
+        Catalog(db_path or DEFAULT_CATALOG_PATH).add(results, out_dir, video_path, name, sha256, pipeline)
+    except Exception as e:
+        logger.warning("Could not add %s to the catalog: %s", out_dir, e)
+
+def run_video(pipeline: str, video_path: str, out_dir: str, options: dict = None, progress_callback=None,
+              components: dict = None) -> dict:
+    """Run one video through the chosen pipeline and write its final analysis.json."""
+    options = options or {}
+    skip = set(options.get("skip") or [])
+    start = time.time()
+    if options.get("reuse") and is_complete(out_dir):
+        # Content-addressed output dirs: the same bytes with the same settings
+        # were already analysed
+        if progress_callback:
+            progress_callback("Reused cached analysis", 1.0)
+        return {"video": video_path, "output_dir": out_dir, "success": True, "error": None,
+                "seconds": 0.0, "cached": True}
+    os.makedirs(out_dir, exist_ok=True)
+    if pipeline == "advanced":
+        from project.pipeline.advanced import process_video_advanced
+        results = process_video_advanced(
+            video_path, out_dir, options.get("scene_threshold", 27.0), options.get("use_gpu", False),
+            "detection" not in skip, "transcription" not in skip, "summarization" not in skip,
+            "moderation" not in skip, options.get("summary_video", False),
+            progress_callback=progress_callback, components=components, dense_fps=options.get("dense_fps", 0.0),
+            sampling=options.get("sampling", "fixed"), sample_budget=options.get("sample_budget", 240),
+            backend=options.get("backend"), quantize=options.get("quantize"),
+            caption_mode=options.get("captions", "blip"), caption_budget=options.get("caption_budget"))
+    elif pipeline == "live":
+        from project.pipeline.live import process_video_live
+        results = process_video_live(
+            video_path, out_dir, options.get("scene_threshold", 27.0), options.get("use_gpu", False),
+            "detection" not in skip, "transcription" not in skip, "summarization" not in skip,
+            "moderation" not in skip, idle_timeout=options.get("idle_timeout", 15.0),
+            progress_callback=progress_callback, components=components)
+        if options.get("discard_source"):
+            # Tail-mode uploads read the ingest partial file; the stored copy is a hard link
+            from project.modules.ingest import remove_partial
+            remove_partial(video_path)
+    else:
+        from project.pipeline.pro import process_video_pro
+        results = process_video_pro(video_path, out_dir, options.get("scene_threshold", 27.0),
+                                    target_language=options.get("language", "auto"),
+                                    progress_callback=progress_callback)
+    results["source_path"] = os.path.abspath(video_path)
+    # The pipelines write analysis.json before they know the outcome; the final
+    # results replace it atomically so a crash never leaves a "complete" marker.
+    atomic_write_json(os.path.join(out_dir, "analysis.json"), results)
+    if results.get("success") and options.get("catalog", True):
+        add_to_catalog(results, out_dir, video_path, options.get("name"), options.get("sha256"), pipeline)
+    return {"video": video_path, "output_dir": out_dir, "success": bool(results.get("success")),
+            "error": results.get("error"), "seconds": round(time.time() - start, 2)}
@@ -0,0 +1,7 @@
+"""Keyframe embedding store and library-wide text-to-scene search."""
+from project.search.store import save_video_embeddings, load_video_embeddings
+from project.search.index import EmbeddingIndex, DEFAULT_INDEX_DIR
+from project.search.scenes import SceneSearch
+
+__all__ = ["save_video_embeddings", "load_video_embeddings", "EmbeddingIndex", "DEFAULT_INDEX_DIR",
+           "SceneSearch"]
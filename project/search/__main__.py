@@ -0,0 +1,54 @@
+"""Build and query the library-wide scene index.
+
+    python -m project.search build                 # every video in the catalog
+    python -m project.search build outputs/ --nlist 1024
+    python -m project.search query "dog running on a beach" --k 5 --nprobe 16
+"""
+import os
+import sys
+import argparse
+from project.search.index import EmbeddingIndex, DEFAULT_INDEX_DIR
+from project.search.store import VECTORS_FILE
+
+def find_output_dirs(roots: list) -> list:
+    found = []
+    for root in roots:
+        for folder, _, files in os.walk(root):
+            if VECTORS_FILE in files:
+                found.append(folder)
+    return sorted(found)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Text-to-scene search over every analysed video.")
+    parser.add_argument("--index", default=DEFAULT_INDEX_DIR, help="Index directory")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    build = sub.add_parser("build", help="Rebuild the index from per-video embeddings")
+    build.add_argument("roots", nargs="*", help="Folders to scan (default: everything in the catalog)")
+    build.add_argument("--nlist", type=int, default=0,
+                       help="IVF lists for approximate search; about sqrt(N) is a good start, 0 for exact only")
+
+    query = sub.add_parser("query", help="Find the scenes that best match a text description")
+    query.add_argument("text")
+    query.add_argument("--k", type=int, default=10)
+    query.add_argument("--nprobe", type=int, default=None, help="Lists to scan (IVF); default is exact search")
+    query.add_argument("--gpu", action="store_true")
+    args = parser.parse_args(argv)
+
+    if args.command == "build":
+        if args.roots:
+            dirs = find_output_dirs(args.roots)
+        else:
+            from project.catalog import Catalog
+            dirs = [d for d in Catalog().output_dirs() if os.path.exists(os.path.join(d, VECTORS_FILE))]
+        stats = EmbeddingIndex(args.index).build(dirs, nlist=args.nlist)
+        print(f"indexed {stats['vectors']} scenes from {stats['videos']} videos"
+              + (f" into {stats['nlist']} lists" if stats["nlist"] else ""))
+    else:
+        from project.search.scenes import SceneSearch
+        for hit in SceneSearch(args.index, use_gpu=args.gpu).search(args.text, args.k, args.nprobe):
+            print(f"{hit['score']:.3f}  {hit['timestamp'] or 0:8.2f}s  scene {hit['scene_idx']:3d}  {hit['output_dir']}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
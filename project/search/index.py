@@ -0,0 +1,209 @@
+import os
+import json
+import tempfile
+from functools import lru_cache
+import numpy as np
+from project.modules.utils import setup_logger
+from project.search.store import load_video_embeddings, normalize
+
+logger = setup_logger(__name__)
+
+DEFAULT_INDEX_DIR = os.environ.get("VISUAL_INSIGHT_INDEX",
+                                   os.path.join(tempfile.gettempdir(), "visual_insight", "scene_index"))
+BLOCK_ROWS = 65536
+
+def _merge_topk(best_scores, best_ids, scores, ids, k):
+    """Keep the k highest scores per query row across blocks."""
+    scores = np.concatenate([best_scores, scores], axis=1)
+    ids = np.concatenate([best_ids, ids], axis=1)
+    if scores.shape[1] > k:
+        keep = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        scores = np.take_along_axis(scores, keep, axis=1)
+        ids = np.take_along_axis(ids, keep, axis=1)
+    return scores, ids
+
+def _block_topk(block, queries, offset, k):
+    scores = np.asarray(block, dtype=np.float32) @ queries.T   # (rows, Q)
+    scores = scores.T
+    take = min(k, scores.shape[1])
+    part = np.argpartition(-scores, take - 1, axis=1)[:, :take]
+    return np.take_along_axis(scores, part, axis=1), part.astype(np.int64) + offset
+
+def train_kmeans(sample: np.ndarray, nlist: int, iterations: int = 10, seed: int = 0) -> np.ndarray:
+    """Spherical k-means (cosine) on a sample; returns unit-norm centroids."""
+    rng = np.random.default_rng(seed)
+    sample = normalize(sample)
+    centroids = sample[rng.choice(len(sample), nlist, replace=False)].copy()
+    for _ in range(iterations):
+        labels = assign(sample, centroids)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, labels, sample)
+        empty = np.bincount(labels, minlength=nlist) == 0
+        # Re-seed empty lists from random points so every list stays in use
+        sums[empty] = sample[rng.choice(len(sample), int(empty.sum()), replace=False)]
+        centroids = normalize(sums)
+    return centroids
+
+def assign(vectors, centroids: np.ndarray, block_rows: int = 16384) -> np.ndarray:
+    labels = np.empty(len(vectors), dtype=np.int32)
+    for start in range(0, len(vectors), block_rows):
+        block = np.asarray(vectors[start:start + block_rows], dtype=np.float32)
+        labels[start:start + block_rows] = np.argmax(block @ centroids.T, axis=1)
+    return labels
+
+class EmbeddingIndex:
+    """Library-wide index of keyframe CLIP embeddings.
+
+    All vectors live in one float16 matrix that is memory-mapped at search time.
+    Exact search streams it through batched matmuls; with `nlist` set at build
+    time the rows are grouped by k-means list (IVF) and a query only scans the
+    `nprobe` lists whose centroids are closest.
+    """
+
+    def __init__(self, index_dir: str = DEFAULT_INDEX_DIR):
+        self.index_dir = index_dir
+        self.vectors = None
+        self.owners = None
+        self.rows = None
+        self.videos = []
+        self.centroids = None
+        self.offsets = None
+        if os.path.exists(self._path("videos.json")):
+            self.load()
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.index_dir, name)
+
+    def __len__(self):
+        return 0 if self.vectors is None else len(self.vectors)
+
+    def load(self):
+        self.vectors = np.load(self._path("vectors.npy"), mmap_mode="r")
+        self.owners = np.load(self._path("owners.npy"), mmap_mode="r")
+        self.rows = np.load(self._path("rows.npy"), mmap_mode="r")
+        with open(self._path("videos.json"), encoding="utf-8") as f:
+            self.videos = json.load(f)
+        ivf = os.path.exists(self._path("centroids.npy"))
+        self.centroids = np.load(self._path("centroids.npy")) if ivf else None
+        self.offsets = np.load(self._path("offsets.npy")) if ivf else None
+        _rows_for.cache_clear()
+        return self
+
+    def build(self, output_dirs: list, nlist: int = 0, **kwargs) -> dict:
+        """Rebuild from the per-video embedding files of the given analysis folders."""
+        sources = []
+        for out_dir in output_dirs:
+            matrix, _ = load_video_embeddings(out_dir)
+            if matrix is not None and len(matrix):
+                sources.append((os.path.abspath(out_dir), matrix))
+        if not sources:
+            raise ValueError("no analysis folders with embeddings to index")
+        total, dim = sum(len(m) for _, m in sources), sources[0][1].shape[1]
+        os.makedirs(self.index_dir, exist_ok=True)
+        staging = self._path("staging.npy")
+        vectors = np.lib.format.open_memmap(staging, mode="w+", dtype=np.float16, shape=(total, dim))
+        owners = np.empty(total, dtype=np.int32)
+        rows = np.empty(total, dtype=np.int32)
+        start = 0
+        for video_idx, (_, matrix) in enumerate(sources):
+            end = start + len(matrix)
+            vectors[start:end] = matrix
+            owners[start:end] = video_idx
+            rows[start:end] = np.arange(len(matrix))
+            start = end
+        try:
+            return self.build_arrays(vectors, owners, rows, [d for d, _ in sources], nlist, **kwargs)
+        finally:
+            del vectors
+            os.remove(staging)
+
+    def build_arrays(self, vectors, owners, rows, videos: list, nlist: int = 0, sample: int = 100_000,
+                     iterations: int = 10, seed: int = 0) -> dict:
+        """Write the index from unit-norm float16 rows; `vectors` may itself be a memmap."""
+        os.makedirs(self.index_dir, exist_ok=True)
+        total, dim = vectors.shape
+        order = None
+        offsets = None
+        if nlist:
+            nlist = min(nlist, total)
+            rng = np.random.default_rng(seed)
+            picks = np.sort(rng.choice(total, min(sample, total), replace=False))
+            centroids = train_kmeans(np.asarray(vectors[picks], dtype=np.float32), nlist, iterations, seed)
+            labels = assign(vectors, centroids)
+            order = np.argsort(labels, kind="stable")
+            offsets = np.searchsorted(labels[order], np.arange(nlist + 1)).astype(np.int64)
+
+        tmp = self._path("vectors.npy.tmp")
+        out = np.lib.format.open_memmap(tmp, mode="w+", dtype=np.float16, shape=(total, dim))
+        for start in range(0, total, BLOCK_ROWS):
+            take = slice(start, start + BLOCK_ROWS)
+            out[take] = vectors[order[take]] if order is not None else vectors[take]
+        out.flush()
+        del out
+        # Nothing is visible to readers until the manifest is swapped in last
+        for name in ("centroids.npy", "offsets.npy"):
+            if os.path.exists(self._path(name)):
+                os.remove(self._path(name))
+        os.replace(tmp, self._path("vectors.npy"))
+        np.save(self._path("owners.npy"), np.asarray(owners if order is None else owners[order], dtype=np.int32))
+        np.save(self._path("rows.npy"), np.asarray(rows if order is None else rows[order], dtype=np.int32))
+        if nlist:
+            np.save(self._path("centroids.npy"), centroids.astype(np.float32))
+            np.save(self._path("offsets.npy"), offsets)
+        manifest = self._path("videos.json.tmp")
+        with open(manifest, "w", encoding="utf-8") as f:
+            json.dump(list(videos), f)
+        os.replace(manifest, self._path("videos.json"))
+        self.load()
+        stats = {"vectors": int(total), "dim": int(dim), "videos": len(videos), "nlist": int(nlist or 0)}
+        logger.info("Built scene index %s", stats)
+        return stats
+
+    def search(self, queries: np.ndarray, k: int = 10, nprobe: int = None):
+        """Top-k (scores, row ids) per query; IVF when built with lists and `nprobe` is given."""
+        if self.vectors is None or not len(self.vectors):
+            return np.zeros((len(queries), 0), np.float32), np.zeros((len(queries), 0), np.int64)
+        queries = normalize(np.atleast_2d(queries))
+        k = min(k, len(self.vectors))
+        if nprobe and self.centroids is not None:
+            return self._search_ivf(queries, k, nprobe)
+        best_scores = np.full((len(queries), 0), -np.inf, dtype=np.float32)
+        best_ids = np.zeros((len(queries), 0), dtype=np.int64)
+        for start in range(0, len(self.vectors), BLOCK_ROWS):
+            scores, ids = _block_topk(self.vectors[start:start + BLOCK_ROWS], queries, start, k)
+            best_scores, best_ids = _merge_topk(best_scores, best_ids, scores, ids, k)
+        return self._sorted(best_scores, best_ids)
+
+    def _search_ivf(self, queries, k, nprobe):
+        nprobe = min(nprobe, len(self.centroids))
+        probe = np.argpartition(-(queries @ self.centroids.T), nprobe - 1, axis=1)[:, :nprobe]
+        best_scores = np.full((len(queries), k), -np.inf, dtype=np.float32)
+        best_ids = np.zeros((len(queries), k), dtype=np.int64)
+        # Scan each probed list once for every query that chose it, so a batch
+        # shares the float16 -> float32 conversion like exact search does
+        for lst in np.unique(probe):
+            start, end = int(self.offsets[lst]), int(self.offsets[lst + 1])
+            if end <= start:
+                continue
+            members = np.nonzero((probe == lst).any(axis=1))[0]
+            scores, ids = _block_topk(self.vectors[start:end], queries[members], start, k)
+            best_scores[members], best_ids[members] = _merge_topk(best_scores[members], best_ids[members],
+                                                                  scores, ids, k)
+        return self._sorted(best_scores, best_ids)
+
+    @staticmethod
+    def _sorted(scores, ids):
+        order = np.argsort(-scores, axis=1)
+        return np.take_along_axis(scores, order, axis=1), np.take_along_axis(ids, order, axis=1)
+
+    def resolve(self, row_id: int) -> dict:
+        """Scene metadata for one index row."""
+        out_dir = self.videos[int(self.owners[row_id])]
+        meta = dict(_rows_for(out_dir)[int(self.rows[row_id])])
+        meta["output_dir"] = out_dir
+        return meta
+
+@lru_cache(maxsize=256)
+def _rows_for(out_dir: str) -> list:
+    with open(os.path.join(out_dir, "clip_embeddings.json"), encoding="utf-8") as f:
+        return json.load(f)
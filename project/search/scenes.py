@@ -0,0 +1,38 @@
+import time
+from project.modules.utils import setup_logger
+from project.modules.tracing import current_span
+from project.search.index import EmbeddingIndex, DEFAULT_INDEX_DIR
+
+logger = setup_logger(__name__)
+
+class SceneSearch:
+    """Text-to-scene search: the query goes through CLIP's text tower and is matched
+    against every indexed keyframe embedding."""
+
+    def __init__(self, index_dir: str = DEFAULT_INDEX_DIR, encoder=None, use_gpu: bool = False):
+        self.index = EmbeddingIndex(index_dir)
+        self.encoder = encoder
+        self.use_gpu = use_gpu
+
+    def _encoder(self):
+        if self.encoder is None:
+            from project.modules.detection_captioning import DetectorCaptioner
+            self.encoder = DetectorCaptioner(use_gpu=self.use_gpu)
+        return self.encoder
+
+    def search(self, query: str, k: int = 10, nprobe: int = None) -> list:
+        start = time.perf_counter()
+        vector = self._encoder().encode_text([query])
+        encoded = time.perf_counter()
+        scores, ids = self.index.search(vector, k, nprobe)
+        current_span().count(queries=1, vectors=len(self.index))
+        hits = []
+        for score, row_id in zip(scores[0], ids[0]):
+            if score == float("-inf"):
+                continue
+            hit = self.index.resolve(row_id)
+            hit["score"] = round(float(score), 4)
+            hits.append(hit)
+        logger.debug("Scene search %r: encode %.1f ms, search %.1f ms", query,
+                     (encoded - start) * 1000, (time.perf_counter() - encoded) * 1000)
+        return hits
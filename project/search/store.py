@@ -0,0 +1,50 @@
+import os
+import json
+import numpy as np
+from project.modules.utils import setup_logger
+
+logger = setup_logger(__name__)
+
+VECTORS_FILE = "clip_embeddings.npy"
+ROWS_FILE = "clip_embeddings.json"
+
+def normalize(vectors: np.ndarray) -> np.ndarray:
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return vectors / np.maximum(norms, 1e-12)
+
+def save_video_embeddings(output_dir: str, items: list, key: str = "clip_embedding") -> dict:
+    """Move per-keyframe embeddings out of `items` into a float16 .npy next to analysis.json.
+
+    Vectors are L2-normalised so a dot product is the cosine similarity. The
+    returned reference replaces the inline float lists in the results.
+    """
+    rows, vectors = [], []
+    for item in items:
+        vector = item.pop(key, None)
+        if vector is None:
+            continue
+        vectors.append(vector)
+        rows.append({"scene_idx": item.get("scene_idx"), "timestamp": item.get("timestamp"),
+                     "frame_path": item.get("frame_path")})
+    if not vectors:
+        return {}
+    matrix = normalize(np.stack([np.asarray(v, dtype=np.float32).ravel() for v in vectors]))
+    path = os.path.join(output_dir, VECTORS_FILE)
+    out = np.lib.format.open_memmap(path, mode="w+", dtype=np.float16, shape=matrix.shape)
+    out[:] = matrix
+    out.flush()
+    del out
+    with open(os.path.join(output_dir, ROWS_FILE), "w", encoding="utf-8") as f:
+        json.dump(rows, f)
+    return {"path": VECTORS_FILE, "rows": ROWS_FILE, "count": int(matrix.shape[0]),
+            "dim": int(matrix.shape[1]), "dtype": "float16", "normalized": True}
+
+def load_video_embeddings(output_dir: str):
+    """(memory-mapped float16 matrix, row metadata) for one analysed video, or (None, [])."""
+    path = os.path.join(output_dir, VECTORS_FILE)
+    if not os.path.exists(path):
+        return None, []
+    with open(os.path.join(output_dir, ROWS_FILE), encoding="utf-8") as f:
+        rows = json.load(f)
+    return np.load(path, mmap_mode="r"), rows
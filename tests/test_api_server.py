@@ -0,0 +1,65 @@
+import asyncio
+import json
+
+from project.api.server import ApiServer
+
+BOUNDARY = "testboundary"
+
+def _upload_parts(payload: bytes):
+    head = (f"--{BOUNDARY}\r\nContent-Disposition: form-data; name=\"pipeline\"\r\n\r\npro\r\n"
+            f"--{BOUNDARY}\r\nContent-Disposition: form-data; name=\"video\"; filename=\"clip.mp4\"\r\n"
+            "Content-Type: video/mp4\r\n\r\n").encode("latin-1") + payload
+    tail = f"\r\n--{BOUNDARY}--\r\n".encode("latin-1")
+    return head, tail
+
+async def _read_response(reader):
+    status_line = await reader.readline()
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b""):
+            break
+        key, _, value = line.decode("latin-1").partition(":")
+        headers[key.strip().lower()] = value.strip()
+    body = await reader.readexactly(int(headers.get("content-length", 0)))
+    return int(status_line.split()[1]), json.loads(body or b"{}")
+
+async def _start_upload(port: int, head: bytes, tail: bytes):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    request = (f"POST /jobs HTTP/1.1\r\nHost: test\r\nConnection: close\r\n"
+               f"Content-Type: multipart/form-data; boundary={BOUNDARY}\r\n"
+               f"Content-Length: {len(head) + len(tail)}\r\n\r\n").encode("latin-1")
+    # Everything but the closing boundary, so accepted uploads stay in progress
+    writer.write(request + head)
+    await writer.drain()
+    return reader, writer
+
+def test_concurrent_uploads_beyond_limit_get_one_429(tmp_path):
+    max_uploads = 3
+
+    async def scenario():
+        server = ApiServer(str(tmp_path / "data"), db_path=str(tmp_path / "jobs.db"), max_uploads=max_uploads)
+        _, port = await server.start("127.0.0.1", 0)
+        try:
+            head, tail = _upload_parts(b"\0" * 1024)
+            connections = await asyncio.gather(*[_start_upload(port, head, tail) for _ in range(max_uploads + 1)])
+            # The rejected upload is answered at once; accepted ones wait for the rest of their body
+            pending = {asyncio.ensure_future(_read_response(reader)): writer for reader, writer in connections}
+            await asyncio.wait(pending, timeout=10, return_when=asyncio.FIRST_COMPLETED)
+            await asyncio.sleep(0.2)
+            done = {task for task in pending if task.done()}
+            assert [task.result()[0] for task in done] == [429]
+            for task, writer in pending.items():
+                if task not in done:
+                    writer.write(tail)
+            statuses = sorted([status for status, _ in await asyncio.wait_for(asyncio.gather(*pending), 10)])
+            for writer in pending.values():
+                writer.close()
+            return statuses, server.queue.counts()["queued"], server._uploads
+        finally:
+            await server.close()
+
+    statuses, queued, uploads = asyncio.run(scenario())
+    assert statuses == [202] * max_uploads + [429]
+    assert queued == max_uploads
+    assert uploads == 0
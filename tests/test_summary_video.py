@@ -0,0 +1,46 @@
+import os
+import subprocess
+
+import pytest
+
+from project.modules.utils import find_executable
+from project.modules.summarizer_video import VideoSummarizer
+from project.modules.video_probe import decode_errors, probe_keyframes
+
+FFMPEG = find_executable("ffmpeg")
+
+def _make_source(path: str, duration: float = 6.0, gop: int = 25):
+    subprocess.run([FFMPEG, "-y", "-v", "error",
+                    "-f", "lavfi", "-i", "testsrc2=size=320x240:rate=25",
+                    "-f", "lavfi", "-i", "sine=frequency=440:sample_rate=44100",
+                    "-t", str(duration), "-c:v", "libx264", "-preset", "medium", "-profile:v", "main",
+                    "-g", str(gop), "-pix_fmt", "yuv420p", "-c:a", "aac", path], check=True)
+
+def _remuxes_mpegts(source: str, tmp_path) -> bool:
+    """Smart mode joins MPEG-TS parts; some static ffmpeg builds crash reading them back."""
+    ts = str(tmp_path / "probe.ts")
+    subprocess.run([FFMPEG, "-y", "-v", "error", "-i", source, "-t", "1", "-c", "copy", "-f", "mpegts", ts], check=False)
+    proc = subprocess.run([FFMPEG, "-y", "-v", "error", "-i", ts, "-c", "copy", str(tmp_path / "probe.mp4")],
+                          stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=False)
+    return proc.returncode == 0
+
+@pytest.mark.skipif(not FFMPEG or not find_executable("ffprobe"), reason="needs ffmpeg and ffprobe")
+def test_smart_summary_decodes_across_copied_and_reencoded_parts(tmp_path):
+    source = str(tmp_path / "source.mp4")
+    _make_source(source)
+    if not probe_keyframes(source):
+        pytest.skip("ffprobe reported no keyframes")
+    if not _remuxes_mpegts(source, tmp_path):
+        pytest.skip("this ffmpeg cannot remux MPEG-TS")
+
+    summarizer = VideoSummarizer(str(tmp_path / "out"), mode="smart")
+    # Cuts off the 1 s GOP grid, so each scene has re-encoded edges around copied GOPs
+    scenes = [(0.37, 2.6), (3.37, 5.6)]
+    out = summarizer.create_summary_video(source, scenes, [], target_duration=6.0)
+    assembly = summarizer.last_assembly
+
+    assert out and os.path.exists(out)
+    assert assembly["method"] == "smart"
+    assert 0 < assembly["reencoded"] < assembly["parts"]
+    assert assembly["inband_headers"]
+    assert decode_errors(out) == []